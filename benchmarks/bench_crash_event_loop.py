@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Benchmark: get_bpftrace_info latency while crash is busy.
+
+Starts a crash session against the fake crash utility from the test suite,
+keeps it saturated with slow ``foreach bt`` commands, and measures how long
+``get_bpftrace_info`` takes to answer in the meantime.  With crash commands
+running on the session worker thread the p99 should stay in the millisecond
+range; when they blocked the event loop it was the full command duration.
+
+Usage:
+    python benchmarks/bench_crash_event_loop.py [--duration 10] [--slow 2]
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+
+FAKE_CRASH = ROOT / "tests" / "crash" / "fake_crash.py"
+
+
+def _install_fake_crash(tmpdir: Path):
+    """Put the fake crash utility on PATH and return a (dump, kernel) pair."""
+    wrapper = tmpdir / "crash"
+    wrapper.write_text(f'#!/bin/sh\nexec "{sys.executable}" "{FAKE_CRASH}" "$@"\n')
+    wrapper.chmod(0o755)
+    os.environ["PATH"] = f"{tmpdir}{os.pathsep}{os.environ.get('PATH', '')}"
+
+    dump = tmpdir / "vmcore"
+    dump.write_bytes(b"fake vmcore")
+    kernel = tmpdir / "vmlinux"
+    kernel.write_bytes(b"fake vmlinux")
+    return (
+        SimpleNamespace(name=dump.name, path=dump),
+        SimpleNamespace(name=kernel.name, path=kernel),
+    )
+
+
+def _percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def run_benchmark(duration: float, interval: float):
+    from dynamic_mcp.server import DynamicMCPServer
+
+    server = DynamicMCPServer()
+    with tempfile.TemporaryDirectory() as tmp:
+        crash_dump, kernel_file = _install_fake_crash(Path(tmp))
+        manager = server.crash_session_manager
+        if not await manager.start_session_async(crash_dump, kernel_file, timeout=30):
+            raise RuntimeError("Could not start fake crash session")
+
+        stop = time.monotonic() + duration
+        crash_commands = 0
+
+        async def crash_workload():
+            nonlocal crash_commands
+            while time.monotonic() < stop:
+                await server._handle_crash_command({"command": "foreach bt", "timeout": 60})
+                crash_commands += 1
+
+        workload = asyncio.ensure_future(crash_workload())
+        latencies = []
+        try:
+            while time.monotonic() < stop:
+                started = time.perf_counter()
+                await server._handle_get_bpftrace_info({})
+                latencies.append((time.perf_counter() - started) * 1000)
+                await asyncio.sleep(interval)
+        finally:
+            await workload
+            await manager.close_session_async()
+
+    print(f"crash commands completed: {crash_commands}")
+    print(f"get_bpftrace_info samples: {len(latencies)}")
+    print(f"  p50: {statistics.median(latencies):8.2f} ms")
+    print(f"  p99: {_percentile(latencies, 99):8.2f} ms")
+    print(f"  max: {max(latencies):8.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--duration", type=float, default=10.0, help="Benchmark duration in seconds")
+    parser.add_argument("--slow", type=float, default=2.0, help="Seconds each foreach bt takes")
+    parser.add_argument("--interval", type=float, default=0.01, help="Delay between info probes")
+    args = parser.parse_args()
+
+    os.environ["FAKE_CRASH_SLOW_SECONDS"] = str(args.slow)
+    asyncio.run(run_benchmark(args.duration, args.interval))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Benchmark: structured parser throughput on multi-MB crash output.
+
+Generates synthetic ``ps``, ``bt -a``, ``log`` and ``mod`` output of the
+requested size, feeds it to the matching parser in 64 KB chunks (as the
+server does with streamed output) and reports MB/s together with the size
+of the resulting compact JSON relative to the text.
+
+Usage:
+    python benchmarks/bench_crash_parsers.py [--mb 16] [--chunk-kb 64]
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+
+from dynamic_mcp.crash_parsers import get_parser  # noqa: E402
+
+
+def _ps_lines():
+    yield "   PID    PPID  CPU       TASK        ST  %MEM     VSZ    RSS  COMM\n"
+    pid = 0
+    while True:
+        yield f"  {pid:5d}      1   {pid % 64:2d}  ffff8881{pid:08x}  IN   0.1  193700   6804  kworker/{pid % 64}:1\n"
+        pid += 1
+
+
+def _bt_lines():
+    pid = 0
+    while True:
+        yield f'PID: {pid}   TASK: ffff8881{pid:08x}  CPU: {pid % 64}   COMMAND: "kworker/{pid % 64}:1"\n'
+        for level, function in enumerate(("__schedule", "schedule", "worker_thread", "kthread", "ret_from_fork")):
+            yield f" #{level} [ffffc900{pid:04x}{level:04x}] {function} at ffffffff81a8{level:04x}\n"
+        yield "\n"
+        pid += 1
+
+
+def _log_lines():
+    seconds = 0.0
+    while True:
+        yield f"[{seconds:12.6f}] eth0: link up, 10000 Mbps, full duplex, flow control rx/tx\n"
+        seconds += 0.001
+
+
+def _mod_lines():
+    yield "     MODULE       NAME                      TEXT_BASE         SIZE  OBJECT FILE\n"
+    index = 0
+    while True:
+        yield f"ffffffffc{index:07x}  mod_{index:<16} ffffffffc{index:07x}    262144  (not loaded)  [CONFIG_KALLSYMS]\n"
+        index += 1
+
+
+SAMPLES = {
+    "ps": _ps_lines,
+    "bt -a": _bt_lines,
+    "log": _log_lines,
+    "mod": _mod_lines,
+}
+
+
+def _generate(lines, size: int) -> str:
+    parts = []
+    total = 0
+    for line in lines():
+        parts.append(line)
+        total += len(line)
+        if total >= size:
+            break
+    return "".join(parts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--mb", type=float, default=16.0, help="Size of each sample output in MB")
+    parser.add_argument("--chunk-kb", type=int, default=64, help="Chunk size fed to the parser")
+    args = parser.parse_args()
+
+    size = int(args.mb * 1024 * 1024)
+    chunk = args.chunk_kb * 1024
+    print(f"{'command':<8} {'MB':>8} {'seconds':>9} {'MB/s':>8} {'json/text':>10}")
+    for command, lines in SAMPLES.items():
+        text = _generate(lines, size)
+        output_parser = get_parser(command)
+        started = time.perf_counter()
+        for start in range(0, len(text), chunk):
+            output_parser.feed_text(text[start:start + chunk])
+        encoded = json.dumps(output_parser.result(), separators=(",", ":"))
+        elapsed = time.perf_counter() - started
+        megabytes = len(text) / (1024 * 1024)
+        print(f"{command:<8} {megabytes:8.1f} {elapsed:9.2f} {megabytes / elapsed:8.1f} "
+              f"{len(encoded) / len(text):10.2f}")
+
+
+if __name__ == "__main__":
+    main()
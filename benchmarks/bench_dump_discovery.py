@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Benchmark: finding the newest crash dumps among many files.
+
+Creates a synthetic crash dump tree (100k empty files with random mtimes by
+default, 100 per directory) and compares the previous approach -- walk the
+tree, build a CrashDump for every file, sort them all and slice -- with the
+catalog: one initial scan, then heap selection over raw mtimes that builds
+CrashDump objects only for the dumps returned.
+
+Usage:
+    python benchmarks/bench_dump_discovery.py [--files 100000] [--top 10] [--dir PATH]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+
+from dynamic_mcp.crash_discovery import CrashDump, CrashDumpDiscovery  # noqa: E402
+
+
+def _build_tree(root: Path, files: int, per_dir: int = 100):
+    rng = random.Random(42)
+    now = time.time()
+    for index in range(files):
+        directory = root / f"127.0.0.1-{index // per_dir:06d}"
+        if index % per_dir == 0:
+            directory.mkdir()
+        path = directory / f"vmcore.{index % per_dir}"
+        path.touch()
+        # Old enough that the catalog does not treat them as still growing
+        stamp = now - 3600 - rng.uniform(0, 365 * 86400)
+        os.utime(path, (stamp, stamp))
+
+
+def _full_sort(discovery: CrashDumpDiscovery, top: int):
+    """The previous find_crash_dumps: build every CrashDump, sort, slice."""
+    dumps = []
+    for root, dirs, files in os.walk(discovery.crash_dump_path):
+        root_path = Path(root)
+        for file in files:
+            file_path = root_path / file
+            if any(file_path.match(pattern) for pattern in discovery.dump_patterns):
+                stat = file_path.stat()
+                dumps.append(CrashDump(file, file_path, stat.st_size, datetime.fromtimestamp(stat.st_mtime)))
+        if len(str(root_path).split(os.sep)) - len(str(discovery.crash_dump_path).split(os.sep)) > 2:
+            dirs.clear()
+    dumps.sort(key=lambda dump: dump.timestamp, reverse=True)
+    return dumps[:top]
+
+
+def _time(function, repeat=1):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        result = function()
+    return (time.perf_counter() - started) / repeat, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--files", type=int, default=100000, help="Number of synthetic dump files")
+    parser.add_argument("--top", type=int, default=10, help="Number of newest dumps to return")
+    parser.add_argument("--dir", help="Reuse or create the tree here instead of a temp directory")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        root = Path(args.dir or temp_dir)
+        root.mkdir(parents=True, exist_ok=True)
+        if not any(root.iterdir()):
+            print(f"Creating {args.files} files under {root}...")
+            _build_tree(root, args.files)
+
+        discovery = CrashDumpDiscovery(str(root))
+        full_sort, expected = _time(lambda: _full_sort(discovery, args.top))
+        cold, _ = _time(lambda: discovery.find_crash_dumps(args.top))
+        warm, newest = _time(lambda: discovery.find_crash_dumps(args.top), repeat=10)
+        latest, _ = _time(discovery.get_latest_crash_dump, repeat=10)
+        catalog = discovery.catalog
+        sort_all, _ = _time(lambda: sorted(catalog.all(), key=lambda dump: dump.timestamp, reverse=True)[:args.top])
+        heap, _ = _time(lambda: catalog.newest(args.top), repeat=10)
+        assert [dump.path for dump in newest] == [dump.path for dump in expected]
+
+        print(f"{'walk + build all + sort (previous)':<40} {full_sort * 1000:10.1f} ms")
+        print(f"{'catalog: first scan + top-K':<40} {cold * 1000:10.1f} ms")
+        print(f"{'catalog: refresh + top-K':<40} {warm * 1000:10.1f} ms")
+        print(f"{'catalog: refresh + latest':<40} {latest * 1000:10.1f} ms")
+        print(f"{'index only: build all + sort':<40} {sort_all * 1000:10.1f} ms")
+        print(f"{'index only: heap top-K':<40} {heap * 1000:10.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
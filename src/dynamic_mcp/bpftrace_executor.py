@@ -3,24 +3,266 @@
 import asyncio
 import logging
 import os
+import signal
 import subprocess
 import tempfile
+import time
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from dynamic_mcp.bpftrace_parsers import BPFtraceJSONParser
+from dynamic_mcp.bpftrace_scheduler import BPFtraceQueueFull, BPFtraceScheduler, BPFtraceSlot
 
 logger = logging.getLogger(__name__)
 
+# Exit code reported when a script is stopped at its timeout, as timeout(1) does
+TIMEOUT_EXIT_CODE = 124
+# Seconds a process gets to exit after SIGTERM before it is killed
+TERMINATE_GRACE_SECONDS = 2
+# Seconds bpftrace gets to print its maps after SIGINT before it is terminated
+INTERRUPT_GRACE_SECONDS = 10
+# Execution modes: "timeout" stops a script that overruns as an error,
+# "duration" ends it at the deadline like Ctrl-C, keeping its final maps
+EXECUTION_MODES = ("timeout", "duration")
+# stderr kept per run; bpftrace errors come first, the rest is dropped
+STDERR_LIMIT = 64 * 1024
+_STREAM_END = object()
+
+
+class BPFtraceStream:
+    """Output of one bpftrace run, delivered in chunks as it is produced.
+
+    Iterate with ``async for`` to receive text chunks of whole lines (a
+    line longer than ``chunk_size`` is split).  Chunks pass through a
+    bounded queue: when the consumer falls behind, stdout is no longer read
+    and bpftrace blocks on the pipe, so memory stays bounded by
+    ``max_pending_chunks * chunk_size`` however fast the probes print (the
+    kernel drops events bpftrace cannot keep up with and bpftrace reports
+    them as lost).  stderr is drained alongside.  At ``timeout`` the process
+    is terminated (exit code 124), or with ``interrupt`` sent SIGINT so
+    bpftrace prints its maps and exits normally, as a fixed-duration trace
+    does.  ``return_code`` and ``error`` are set once the iteration is
+    finished.  A consumer that stops iterating early terminates the process.
+    The scheduler ``slot`` the run holds is released when the process exits.
+    """
+
+    def __init__(self, process: asyncio.subprocess.Process, script_path: str, timeout: int,
+                 chunk_size: int = 16 * 1024, max_pending_chunks: int = 8, interrupt: bool = False,
+                 slot: Optional[BPFtraceSlot] = None):
+        self.process = process
+        self.script_path = script_path
+        self.slot = slot
+        self.queue_wait = slot.queue_wait if slot else 0.0
+        self.timeout = timeout
+        self.interrupt = interrupt
+        self.interrupted = False
+        self.chunk_size = chunk_size
+        self.return_code: Optional[int] = None
+        self.error = ""
+        self.bytes_read = 0
+        self.lines = 0
+        self.timed_out = False
+        self.cancelled = False
+        self.started = time.monotonic()
+        self.first_byte_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._stderr: List[bytes] = []
+        self._stderr_bytes = 0
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_pending_chunks)
+        loop = asyncio.get_running_loop()
+        self._deadline = loop.call_later(timeout, self._on_deadline)
+        self._kill_handle: Optional[asyncio.TimerHandle] = None
+        self._task = asyncio.ensure_future(self._run())
+
+    @property
+    def time_to_first_byte(self) -> Optional[float]:
+        """Seconds from starting bpftrace to its first output byte."""
+        if self.first_byte_at is None:
+            return None
+        return self.first_byte_at - self.started
+
+    @property
+    def duration(self) -> Optional[float]:
+        """Seconds from starting bpftrace to its exit."""
+        if self.finished_at is None:
+            return None
+        return self.finished_at - self.started
+
+    def _on_deadline(self):
+        if self.interrupt:
+            logger.info(f"BPFtrace trace duration of {self.timeout}s reached, sending SIGINT")
+            self.stop()
+            return
+        logger.info(f"BPFtrace script execution timeout after {self.timeout}s, terminating process")
+        self.timed_out = True
+        self._terminate()
+
+    def stop(self):
+        """End the script like Ctrl-C: bpftrace gets SIGINT, prints its maps and exits.
+
+        The output keeps being read; if bpftrace has not exited after a
+        grace period it is terminated.
+        """
+        if self.process.returncode is not None or self.interrupted:
+            return
+        self.interrupted = True
+        try:
+            self.process.send_signal(signal.SIGINT)
+        except ProcessLookupError:
+            return
+        self._deadline.cancel()
+        self._deadline = asyncio.get_running_loop().call_later(
+            INTERRUPT_GRACE_SECONDS, self._on_interrupt_expired)
+
+    def _on_interrupt_expired(self):
+        logger.warning(f"BPFtrace did not exit {INTERRUPT_GRACE_SECONDS}s after SIGINT, terminating process")
+        self.timed_out = True
+        self._terminate()
+
+    def _terminate(self):
+        """SIGTERM the process, and SIGKILL it if it is still running after a grace period."""
+        if self.process.returncode is not None:
+            return
+        try:
+            self.process.terminate()
+        except ProcessLookupError:
+            return
+        if self._kill_handle is None:
+            self._kill_handle = asyncio.get_running_loop().call_later(TERMINATE_GRACE_SECONDS, self._kill)
+
+    def _kill(self):
+        if self.process.returncode is None:
+            logger.warning("Graceful termination failed, force killing process")
+            try:
+                self.process.kill()
+            except ProcessLookupError:
+                pass
+
+    async def _put(self, data: bytes):
+        if self.cancelled:
+            return
+        self.lines += data.count(b"\n")
+        await self._queue.put(data.decode('utf-8', errors='ignore'))
+
+    async def _pump_stdout(self):
+        # pending holds the start of an unfinished line, never more than a chunk
+        pending = b""
+        while True:
+            data = await self.process.stdout.read(self.chunk_size - len(pending))
+            if not data:
+                break
+            if self.first_byte_at is None:
+                self.first_byte_at = time.monotonic()
+            self.bytes_read += len(data)
+            pending += data
+            end = pending.rfind(b"\n") + 1
+            if end == 0 and len(pending) < self.chunk_size:
+                continue
+            if end == 0:
+                end = len(pending)
+            await self._put(pending[:end])
+            pending = pending[end:]
+        if pending:
+            await self._put(pending)
+
+    async def _pump_stderr(self):
+        while True:
+            data = await self.process.stderr.read(self.chunk_size)
+            if not data:
+                break
+            if self._stderr_bytes < STDERR_LIMIT:
+                self._stderr.append(data[:STDERR_LIMIT - self._stderr_bytes])
+            self._stderr_bytes += len(data)
+
+    async def _run(self):
+        try:
+            await asyncio.gather(self._pump_stdout(), self._pump_stderr())
+            await self.process.wait()
+            self._deadline.cancel()
+            if self._kill_handle is not None:
+                self._kill_handle.cancel()
+            error = b"".join(self._stderr).decode('utf-8', errors='ignore')
+            if self._stderr_bytes > STDERR_LIMIT:
+                error += f"\n[{self._stderr_bytes - STDERR_LIMIT:,} more bytes of stderr dropped]"
+            if self.timed_out:
+                self.return_code = TIMEOUT_EXIT_CODE
+                error = f"{error}\nScript execution timed out after {self.timeout}s".lstrip()
+            else:
+                self.return_code = self.process.returncode
+            self.error = error
+        except Exception as e:
+            logger.error(f"Error reading BPFtrace output: {e}")
+            self._terminate()
+            self.return_code = 1
+            self.error = str(e)
+        finally:
+            self.finished_at = time.monotonic()
+            if self.slot is not None:
+                self.slot.release()
+            try:
+                os.unlink(self.script_path)
+            except OSError as e:
+                logger.warning(f"Could not delete temp script: {e}")
+            if not self.cancelled:
+                await self._queue.put(_STREAM_END)
+
+    def cancel(self):
+        """Stop the script and discard the rest of its output."""
+        if self.return_code is None:
+            self.cancelled = True
+            self._terminate()
+            # Unblock the reader if it waits for room in the queue
+            while not self._queue.empty():
+                self._queue.get_nowait()
+
+    async def __aiter__(self) -> AsyncIterator[str]:
+        try:
+            while True:
+                item = await self._queue.get()
+                if item is _STREAM_END:
+                    return
+                yield item
+        finally:
+            if self.return_code is None:
+                self.cancel()
+
+    async def wait(self):
+        """Wait for the process to exit and its output to be read."""
+        await asyncio.shield(self._task)
+
+    async def read_all(self) -> str:
+        """Collect the whole output (unbounded; for small outputs only)."""
+        return "".join([chunk async for chunk in self])
+
+    def to_dict(self) -> dict:
+        """Timing and size of the run, for metrics."""
+        return {
+            "queue_wait": round(self.queue_wait, 4),
+            "bytes": self.bytes_read,
+            "lines": self.lines,
+            "time_to_first_byte": round(self.time_to_first_byte, 4) if self.time_to_first_byte is not None else None,
+            "duration": round(self.duration, 4) if self.duration is not None else None,
+            "interrupted": self.interrupted,
+            "return_code": self.return_code
+        }
+
 
 class BPFtraceExecutor:
     """Executes BPFtrace scripts with proper permission handling."""
 
-    def __init__(self, timeout: int = 30):
+    def __init__(self, timeout: int = 30, max_concurrent: int = 2, max_queued: int = 16,
+                 max_per_client: int = 1, queue_timeout: float = 30):
         """Initialize BPFtrace executor.
         
         Args:
             timeout: Default timeout for script execution in seconds
+            max_concurrent: Scripts running at once; further runs are queued
+            max_queued: Runs allowed to wait for a slot; beyond it runs are rejected
+            max_per_client: Running scripts one client may have (0 for no limit)
+            queue_timeout: Seconds a run may wait for a slot before it is rejected
         """
         self.timeout = timeout
+        self.scheduler = BPFtraceScheduler(max_concurrent, max_queued, max_per_client, queue_timeout)
         self.bpftrace_path = self._find_bpftrace()
 
     def _find_bpftrace(self) -> Optional[str]:
@@ -66,7 +308,10 @@ class BPFtraceExecutor:
         self,
         script: str,
         timeout: Optional[int] = None,
-        use_sudo: bool = True
+        use_sudo: bool = True,
+        mode: str = "timeout",
+        client: str = "default",
+        priority: int = 0
     ) -> Tuple[str, str, int]:
         """Execute a BPFtrace script.
         
@@ -74,16 +319,97 @@ class BPFtraceExecutor:
             script: BPFtrace script content
             timeout: Execution timeout in seconds (uses default if None)
             use_sudo: Whether to use sudo for execution
+            mode: "timeout" to stop an overrunning script (exit code 124), or
+                "duration" to end it with SIGINT after timeout seconds and
+                keep the maps bpftrace prints on exit
+            client: Who runs the script, for the per-client limit
+            priority: Queue priority when all slots are busy (higher runs first)
             
         Returns:
-            Tuple of (stdout, stderr, return_code)
+            Tuple of (stdout, stderr, return_code); stdout holds everything
+            printed before the script ended, also on timeout
+        """
+        stream, error = await self.stream_script(script, timeout, use_sudo, mode=mode,
+                                                 client=client, priority=priority)
+        if stream is None:
+            return "", error, 1
+        stdout = await stream.read_all()
+        return stdout, stream.error, stream.return_code
+
+    async def execute_script_structured(
+        self,
+        script: str,
+        timeout: Optional[int] = None,
+        use_sudo: bool = True,
+        mode: str = "timeout",
+        client: str = "default",
+        priority: int = 0
+    ) -> Tuple[Dict[str, Any], str, int]:
+        """Execute a BPFtrace script with JSON output and merge its records.
+
+        The ``-f json`` records are decoded as they are read, so the raw
+        output is never held in full.  Arguments are as for execute_script.
+
+        Returns:
+            Tuple of (result, stderr, return_code); result holds printf lines,
+            maps, histograms (bucket rows) and stats, see BPFtraceJSONParser
+        """
+        stream, error = await self.stream_script(script, timeout, use_sudo, mode=mode, output_format="json",
+                                                 client=client, priority=priority)
+        if stream is None:
+            return {}, error, 1
+        parser = BPFtraceJSONParser()
+        async for chunk in stream:
+            parser.feed_text(chunk)
+        return parser.result(), stream.error, stream.return_code
+
+    async def stream_script(
+        self,
+        script: str,
+        timeout: Optional[int] = None,
+        use_sudo: bool = True,
+        chunk_size: int = 16 * 1024,
+        max_pending_chunks: int = 8,
+        mode: str = "timeout",
+        output_format: str = "text",
+        client: str = "default",
+        priority: int = 0
+    ) -> Tuple[Optional[BPFtraceStream], str]:
+        """Start a BPFtrace script and stream its output.
+
+        The script waits for a scheduler slot first; the timeout counts from
+        when it starts.
+
+        Args:
+            script: BPFtrace script content
+            timeout: Execution timeout in seconds (uses default if None)
+            use_sudo: Whether to use sudo for execution
+            chunk_size: Largest chunk handed to the consumer, in bytes
+            max_pending_chunks: Chunks buffered before bpftrace is left blocked on its output
+            mode: "timeout" or "duration", as for execute_script
+            output_format: "text", or "json" for bpftrace's line-delimited JSON records
+            client: Who runs the script, for the per-client limit
+            priority: Queue priority when all slots are busy (higher runs first)
+
+        Returns:
+            Tuple of (stream, error); stream is None if the script could not be
+            started or was rejected by the scheduler
         """
         if not self.bpftrace_path:
-            return "", "BPFtrace not available on system", 1
+            return None, "BPFtrace not available on system"
+        if mode not in EXECUTION_MODES:
+            return None, f"Unknown execution mode '{mode}' (available: {', '.join(EXECUTION_MODES)})"
+        if output_format not in ("text", "json"):
+            return None, f"Unknown output format '{output_format}' (available: text, json)"
 
-        timeout = timeout or self.timeout
+        try:
+            slot = await self.scheduler.acquire(client, priority)
+        except BPFtraceQueueFull as e:
+            logger.warning(f"Rejected bpftrace run for {client}: {e}")
+            return None, str(e)
 
-        # Write script to temporary file
+        timeout = timeout or self.timeout
+        script_path = None
         try:
             with tempfile.NamedTemporaryFile(
                 mode='w',
@@ -93,81 +419,30 @@ class BPFtraceExecutor:
                 f.write(script)
                 script_path = f.name
 
-            return await self._execute_script_file(
-                script_path,
-                timeout,
-                use_sudo
-            )
-        finally:
-            # Clean up temporary file
-            try:
-                os.unlink(script_path)
-            except Exception as e:
-                logger.warning(f"Could not delete temp script: {e}")
-
-    async def _execute_script_file(
-        self,
-        script_path: str,
-        timeout: int,
-        use_sudo: bool
-    ) -> Tuple[str, str, int]:
-        """Execute a BPFtrace script from file."""
-        cmd = [self.bpftrace_path, script_path]
-
-        if use_sudo:
-            cmd = ["sudo", "-n"] + cmd
+            cmd = [self.bpftrace_path, script_path]
+            if output_format == "json":
+                cmd = [self.bpftrace_path, "-f", "json", script_path]
+            if use_sudo:
+                cmd = ["sudo", "-n"] + cmd
 
-        try:
             process = await asyncio.create_subprocess_exec(
                 *cmd,
                 stdout=asyncio.subprocess.PIPE,
                 stderr=asyncio.subprocess.PIPE
             )
-
-            try:
-                stdout, stderr = await asyncio.wait_for(
-                    process.communicate(),
-                    timeout=timeout
-                )
-                return (
-                    stdout.decode('utf-8', errors='ignore'),
-                    stderr.decode('utf-8', errors='ignore'),
-                    process.returncode
-                )
-            except asyncio.TimeoutError:
-                logger.info(f"BPFtrace script execution timeout after {timeout}s, terminating process")
-
-                # Try graceful termination first with SIGTERM
-                process.terminate()
-                logger.debug("Sent SIGTERM to process")
-                try:
-                    # Wait for graceful termination with a short timeout
-                    logger.debug("Waiting for graceful termination...")
-                    await asyncio.wait_for(process.wait(), timeout=2)
-                    logger.debug("Process terminated gracefully")
-                except asyncio.TimeoutError:
-                    # If graceful termination fails, force kill
-                    logger.warning("Graceful termination failed, force killing process")
-                    process.kill()
-                    logger.debug("Sent SIGKILL to process")
-                    try:
-                        logger.debug("Waiting for process to be killed...")
-                        await asyncio.wait_for(process.wait(), timeout=1)
-                        logger.debug("Process killed successfully")
-                    except asyncio.TimeoutError:
-                        logger.error("Process did not respond to SIGKILL")
-
-                # Capture any partial output that was produced before timeout
-                # Don't try to read from streams as they may block
-                stdout_text = ""
-                stderr_text = f"Script execution timed out after {timeout}s"
-
-                logger.debug(f"Returning timeout result: exit_code=124")
-                return stdout_text, stderr_text, 124
-
-        except Exception as e:
+        except BaseException as e:
+            slot.release()
+            if script_path:
+                os.unlink(script_path)
+            if not isinstance(e, Exception):
+                raise
             logger.error(f"Error executing BPFtrace script: {e}")
-            return "", str(e), 1
+            return None, str(e)
+
+        logger.debug(f"Streaming BPFtrace script {script_path} for {client} (pid {process.pid}, "
+                     f"queued {slot.queue_wait:.3f}s)")
+        return BPFtraceStream(process, script_path, timeout, chunk_size, max_pending_chunks,
+                              interrupt=mode == "duration", slot=slot), ""
 
     def validate_script(self, script: str) -> Tuple[bool, str]:
         """Validate BPFtrace script syntax.
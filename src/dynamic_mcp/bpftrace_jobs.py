@@ -0,0 +1,256 @@
+"""Background bpftrace jobs.
+
+A job runs a script without holding an MCP request open: the start call
+returns a job id at once, the client polls for the output printed since its
+last cursor, and stopping the job ends the script like Ctrl-C so its final
+maps are collected.  Short requests keep long traces working through
+proxies and tunnels that time out long-lived requests.
+
+Each job's output goes into a ring buffer of fixed size: the job always
+drains bpftrace, and once the buffer is full the oldest output is dropped,
+so a job's memory stays flat however long it runs.  A poll that falls
+behind the buffer is told how much it missed.
+"""
+
+import asyncio
+import logging
+import secrets
+import time
+from collections import deque
+from typing import Deque, Dict, Optional, Tuple
+
+from dynamic_mcp.bpftrace_executor import (
+    INTERRUPT_GRACE_SECONDS, TERMINATE_GRACE_SECONDS, BPFtraceExecutor, BPFtraceStream
+)
+
+
+logger = logging.getLogger(__name__)
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_FINISHED = "finished"
+JOB_FAILED = "failed"
+# Jobs hold scheduler slots under "<client>/job", a per-client quota of
+# their own, so a running job does not hold up its client's other scripts
+JOB_CLIENT_SUFFIX = "/job"
+
+
+class OutputRing:
+    """The last ``max_chars`` characters of a text stream.
+
+    Positions are character offsets from the start of the stream, so a
+    reader's cursor stays valid while older text is dropped.
+    """
+
+    def __init__(self, max_chars: int):
+        self.max_chars = max_chars
+        self._chunks: Deque[Tuple[int, str]] = deque()
+        self.start = 0
+        self.end = 0
+
+    def write(self, text: str):
+        if not text:
+            return
+        if len(text) > self.max_chars:
+            self.end += len(text) - self.max_chars
+            text = text[-self.max_chars:]
+        self._chunks.append((self.end, text))
+        self.end += len(text)
+        while self.end - self._chunks[0][0] > self.max_chars:
+            offset, chunk = self._chunks.popleft()
+            excess = self.end - self.max_chars - offset
+            if excess < len(chunk):
+                self._chunks.appendleft((offset + excess, chunk[excess:]))
+        self.start = self._chunks[0][0]
+
+    def read(self, cursor: int, max_chars: int) -> Tuple[str, int, int]:
+        """Read from cursor.
+
+        Returns:
+            Tuple of (text, next cursor, characters dropped before the text)
+        """
+        dropped = max(0, self.start - cursor)
+        cursor = min(max(cursor, self.start), self.end)
+        parts = []
+        wanted = max_chars
+        for offset, chunk in self._chunks:
+            if wanted <= 0:
+                break
+            if offset + len(chunk) <= cursor:
+                continue
+            part = chunk[max(0, cursor - offset):][:wanted]
+            parts.append(part)
+            wanted -= len(part)
+        text = "".join(parts)
+        return text, cursor + len(text), dropped
+
+
+class BPFtraceJob:
+    """One script running in the background."""
+
+    def __init__(self, job_id: str, client: str, timeout: int, buffer_chars: int):
+        self.job_id = job_id
+        self.client = client
+        self.timeout = timeout
+        self.output = OutputRing(buffer_chars)
+        self.status = JOB_QUEUED
+        self.return_code: Optional[int] = None
+        self.error = ""
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.stream: Optional[BPFtraceStream] = None
+        self.stop_requested = False
+        self.task: Optional[asyncio.Task] = None
+
+    @property
+    def done(self) -> bool:
+        return self.status in (JOB_FINISHED, JOB_FAILED)
+
+    def to_dict(self) -> dict:
+        return {
+            "job_id": self.job_id,
+            "status": self.status,
+            "return_code": self.return_code,
+            "error": self.error,
+            "created_at": self.created_at,
+            "elapsed": round((self.finished_at or time.time()) - self.created_at, 3),
+            "output_chars": self.output.end,
+            "stopped": self.stop_requested or bool(self.stream and self.stream.interrupted)
+        }
+
+
+class BPFtraceJobManager:
+    """Starts, polls and stops background bpftrace jobs.
+
+    Jobs run in duration mode: at ``timeout`` they end with SIGINT as if
+    stopped.  They go through the executor's scheduler like any other run,
+    so a started job may be queued first, but under a per-client quota
+    separate from the client's execute_bpftrace_script runs.  Finished jobs are kept for
+    ``retention`` seconds after they end, and at most ``max_jobs`` jobs
+    are tracked.
+    """
+
+    def __init__(self, executor: BPFtraceExecutor, max_jobs: int = 32, buffer_chars: int = 1024 * 1024,
+                 retention: int = 600):
+        self.executor = executor
+        self.max_jobs = max_jobs
+        self.buffer_chars = buffer_chars
+        self.retention = retention
+        self.jobs: Dict[str, BPFtraceJob] = {}
+        self.stats = {"started": 0, "stopped": 0, "finished": 0, "failed": 0, "expired": 0}
+
+    def _expire(self):
+        now = time.time()
+        for job_id, job in list(self.jobs.items()):
+            if job.done and now - job.finished_at > self.retention:
+                del self.jobs[job_id]
+                self.stats["expired"] += 1
+
+    def start(self, script: str, timeout: int, use_sudo: bool = True, client: str = "default",
+              priority: int = 0) -> BPFtraceJob:
+        """Start a job in the background.
+
+        Raises:
+            RuntimeError: if max_jobs jobs are tracked and none can be dropped
+        """
+        self._expire()
+        if len(self.jobs) >= self.max_jobs:
+            finished = [job for job in self.jobs.values() if job.done]
+            if not finished:
+                raise RuntimeError(f"Too many bpftrace jobs ({len(self.jobs)} active); stop one first")
+            oldest = min(finished, key=lambda job: job.finished_at)
+            del self.jobs[oldest.job_id]
+            self.stats["expired"] += 1
+
+        job = BPFtraceJob(f"bt_{secrets.token_hex(6)}", client, timeout, self.buffer_chars)
+        self.jobs[job.job_id] = job
+        job.task = asyncio.ensure_future(self._run(job, script, use_sudo, priority))
+        self.stats["started"] += 1
+        logger.info(f"Started bpftrace job {job.job_id} for {client} (duration {timeout}s)")
+        return job
+
+    async def _run(self, job: BPFtraceJob, script: str, use_sudo: bool, priority: int):
+        try:
+            stream, error = await self.executor.stream_script(
+                script, job.timeout, use_sudo, mode="duration", client=job.client + JOB_CLIENT_SUFFIX,
+                priority=priority)
+            if stream is None:
+                job.status = JOB_FAILED
+                job.return_code = 1
+                job.error = error
+                return
+            job.stream = stream
+            job.status = JOB_RUNNING
+            if job.stop_requested:
+                stream.stop()
+            async for chunk in stream:
+                job.output.write(chunk)
+            job.return_code = stream.return_code
+            job.error = stream.error
+            job.status = JOB_FINISHED if stream.return_code == 0 else JOB_FAILED
+        except asyncio.CancelledError:
+            job.status = JOB_FAILED
+            job.return_code = 1
+            job.error = job.error or "Job cancelled"
+            raise
+        except Exception as e:
+            logger.error(f"Error running bpftrace job {job.job_id}: {e}")
+            job.status = JOB_FAILED
+            job.return_code = 1
+            job.error = str(e)
+        finally:
+            job.finished_at = time.time()
+            self.stats["finished" if job.status == JOB_FINISHED else "failed"] += 1
+            logger.info(f"bpftrace job {job.job_id} {job.status} (exit code: {job.return_code})")
+
+    def get(self, job_id: str) -> Optional[BPFtraceJob]:
+        self._expire()
+        return self.jobs.get(job_id)
+
+    def poll(self, job: BPFtraceJob, cursor: int = 0, max_chars: int = 64 * 1024) -> dict:
+        """Job status plus the output from cursor on."""
+        text, next_cursor, dropped = job.output.read(cursor, max_chars)
+        return {
+            **job.to_dict(),
+            "output": text,
+            "cursor": next_cursor,
+            "dropped": dropped,
+            "more": next_cursor < job.output.end
+        }
+
+    async def stop(self, job: BPFtraceJob) -> BPFtraceJob:
+        """End a job like Ctrl-C and wait for its final output."""
+        if not job.done:
+            job.stop_requested = True
+            self.stats["stopped"] += 1
+            if job.stream is not None:
+                job.stream.stop()
+                try:
+                    await asyncio.wait_for(asyncio.shield(job.task),
+                                           INTERRUPT_GRACE_SECONDS + TERMINATE_GRACE_SECONDS + 5)
+                except asyncio.TimeoutError:
+                    logger.warning(f"bpftrace job {job.job_id} did not finish after being stopped")
+            else:
+                # Still waiting for a scheduler slot
+                job.error = "Stopped before it started"
+                job.task.cancel()
+                await asyncio.gather(job.task, return_exceptions=True)
+        return job
+
+    def get_stats(self) -> dict:
+        """Job counters, reported by get_bpftrace_info."""
+        self._expire()
+        return {
+            **self.stats,
+            "jobs": [job.to_dict() for job in self.jobs.values()],
+            "buffer_chars": self.buffer_chars,
+            "retention": self.retention
+        }
+
+    def close(self):
+        """Terminate the running jobs (server shutdown)."""
+        for job in self.jobs.values():
+            if job.stream is not None and not job.done:
+                job.stream.cancel()
+            if job.task is not None and not job.task.done():
+                job.task.cancel()
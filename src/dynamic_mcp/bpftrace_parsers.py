@@ -0,0 +1,118 @@
+"""Parser turning bpftrace ``-f json`` output into structured data.
+
+With ``-f json`` bpftrace writes one JSON record per line (``printf``
+output, ``map``/``hist``/``stats`` dumps, ``lost_events``, ...).  The
+parser decodes the records as they are streamed and merges them into one
+compact result: scalar and keyed maps as plain JSON values, histograms as
+bucket rows instead of the ASCII bars of the text output.  A map printed
+more than once (``print()`` in an interval probe, then again at exit)
+keeps its latest value.
+"""
+
+import json
+from typing import Any, Dict, List, Optional
+
+from dynamic_mcp.crash_parsers import CrashOutputParser
+
+
+# printf lines (and undecodable lines) kept in the result; the rest are counted
+MAX_PRINTF_LINES = 1000
+
+HISTOGRAM_COLUMNS = ["min", "max", "count"]
+
+
+def _buckets(buckets: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """[{"min": 2, "max": 3, "count": 5}, ...] -> compact rows with a total.
+
+    The first and last buckets of a histogram may lack ``min`` or ``max``
+    (values below or above the range); those are left as None.
+    """
+    rows = [[bucket.get("min"), bucket.get("max"), bucket.get("count", 0)] for bucket in buckets]
+    return {"columns": HISTOGRAM_COLUMNS, "buckets": rows, "total": sum(row[2] for row in rows)}
+
+
+class BPFtraceJSONParser(CrashOutputParser):
+    """Merges the line-delimited JSON records of one bpftrace run."""
+
+    command = "bpftrace"
+
+    def __init__(self, max_lines: int = MAX_PRINTF_LINES):
+        super().__init__()
+        self.max_lines = max_lines
+        self.printf: List[str] = []
+        self.printf_lines = 0
+        self._printf_partial = ""
+        self.maps: Dict[str, Any] = {}
+        self.histograms: Dict[str, Any] = {}
+        self.stats: Dict[str, Any] = {}
+        self.lost_events = 0
+        self.attached_probes: Optional[int] = None
+        self.other: List[Any] = []
+        self.records = 0
+
+    def feed(self, line: str):
+        line = line.strip()
+        if not line:
+            return
+        try:
+            record = json.loads(line)
+            record_type = record["type"]
+            data = record.get("data")
+        except (ValueError, KeyError, TypeError):
+            self._keep(self.other, line)
+            return
+        self.records += 1
+
+        if record_type == "printf":
+            self._printf(str(data))
+        elif record_type == "map":
+            self.maps.update(data)
+        elif record_type == "hist":
+            for name, value in data.items():
+                if isinstance(value, dict):
+                    # Keyed histogram: @lat[comm] = hist(...)
+                    self.histograms[name] = {key: _buckets(buckets) for key, buckets in value.items()}
+                else:
+                    self.histograms[name] = _buckets(value)
+        elif record_type == "stats":
+            self.stats.update(data)
+        elif record_type == "lost_events":
+            self.lost_events += data.get("events", 0)
+        elif record_type == "attached_probes":
+            self.attached_probes = data.get("probes")
+        else:
+            self._keep(self.other, record)
+
+    def _printf(self, text: str):
+        """printf output may span or split lines; keep it line by line."""
+        lines = (self._printf_partial + text).split("\n")
+        self._printf_partial = lines.pop()
+        for line in lines:
+            self._keep(self.printf, line)
+            self.printf_lines += 1
+
+    def _keep(self, items: list, item):
+        if len(items) < self.max_lines:
+            items.append(item)
+
+    def _result(self) -> Dict[str, Any]:
+        if self._printf_partial:
+            self._keep(self.printf, self._printf_partial)
+            self.printf_lines += 1
+            self._printf_partial = ""
+        result: Dict[str, Any] = {"attached_probes": self.attached_probes}
+        if self.printf_lines:
+            result["printf"] = self.printf
+            if self.printf_lines > len(self.printf):
+                result["printf_omitted"] = self.printf_lines - len(self.printf)
+        if self.maps:
+            result["maps"] = self.maps
+        if self.histograms:
+            result["histograms"] = self.histograms
+        if self.stats:
+            result["stats"] = self.stats
+        if self.lost_events:
+            result["lost_events"] = self.lost_events
+        if self.other:
+            result["other"] = self.other
+        return result
@@ -0,0 +1,174 @@
+"""Admission control for bpftrace runs.
+
+Every bpftrace run loads BPF programs into the traced kernel, so the number
+running at once is capped.  Requests over the cap wait in a queue ordered
+by priority (higher first), then arrival; each client may only hold a few
+running slots, so one agent launching many scripts cannot starve the
+others.  When the queue is full, or a request has waited too long, it is
+rejected at once instead of piling more load onto the host.
+"""
+
+import asyncio
+import itertools
+import logging
+import time
+from typing import Dict, List
+
+
+logger = logging.getLogger(__name__)
+
+
+class BPFtraceQueueFull(RuntimeError):
+    """A bpftrace run was rejected by admission control."""
+
+
+class _Waiter:
+    """A queued request for a slot."""
+
+    __slots__ = ("client", "priority", "sequence", "queued_at", "future")
+
+    def __init__(self, client: str, priority: int, sequence: int, future: asyncio.Future):
+        self.client = client
+        self.priority = priority
+        self.sequence = sequence
+        self.queued_at = time.monotonic()
+        self.future = future
+
+    def order(self):
+        return (-self.priority, self.sequence)
+
+
+class BPFtraceSlot:
+    """A running slot; release it when the run is over (idempotent)."""
+
+    def __init__(self, scheduler: "BPFtraceScheduler", client: str, queue_wait: float):
+        self.scheduler = scheduler
+        self.client = client
+        self.queue_wait = queue_wait
+        self.released = False
+
+    def release(self):
+        if not self.released:
+            self.released = True
+            self.scheduler._release(self.client)
+
+
+class BPFtraceScheduler:
+    """Limits concurrent bpftrace runs, queueing or rejecting the excess.
+
+    Args:
+        max_concurrent: bpftrace processes running at once
+        max_queued: requests allowed to wait; beyond it requests are rejected
+        max_per_client: running slots one client may hold (0 for no limit)
+        queue_timeout: seconds a request may wait before it is rejected
+    """
+
+    def __init__(self, max_concurrent: int = 2, max_queued: int = 16, max_per_client: int = 1,
+                 queue_timeout: float = 30):
+        self.max_concurrent = max(1, max_concurrent)
+        self.max_queued = max_queued
+        self.max_per_client = max_per_client
+        self.queue_timeout = queue_timeout
+        self.running = 0
+        self.running_by_client: Dict[str, int] = {}
+        # Small (bounded by max_queued), so picking the next waiter is a scan
+        # that can skip clients at their quota
+        self._queue: List[_Waiter] = []
+        self._sequence = itertools.count()
+        self.stats = {
+            "submitted": 0,
+            "started": 0,
+            "queued": 0,
+            "rejected_queue_full": 0,
+            "rejected_timeout": 0,
+            "queue_wait_total": 0.0,
+            "queue_wait_max": 0.0
+        }
+
+    def _eligible(self, client: str) -> bool:
+        return not self.max_per_client or self.running_by_client.get(client, 0) < self.max_per_client
+
+    def _grant(self, client: str):
+        self.running += 1
+        self.running_by_client[client] = self.running_by_client.get(client, 0) + 1
+
+    def _dispatch(self):
+        """Hand free slots to the best eligible waiters."""
+        while self.running < self.max_concurrent:
+            waiters = [waiter for waiter in self._queue if self._eligible(waiter.client)]
+            if not waiters:
+                return
+            waiter = min(waiters, key=_Waiter.order)
+            self._queue.remove(waiter)
+            self._grant(waiter.client)
+            waiter.future.set_result(None)
+
+    def _release(self, client: str):
+        self.running -= 1
+        self.running_by_client[client] -= 1
+        if not self.running_by_client[client]:
+            del self.running_by_client[client]
+        self._dispatch()
+
+    def _record_wait(self, waited: float):
+        self.stats["started"] += 1
+        self.stats["queue_wait_total"] = round(self.stats["queue_wait_total"] + waited, 4)
+        self.stats["queue_wait_max"] = round(max(self.stats["queue_wait_max"], waited), 4)
+
+    async def acquire(self, client: str = "default", priority: int = 0) -> BPFtraceSlot:
+        """Wait for a slot to run a script.
+
+        Raises:
+            BPFtraceQueueFull: if the queue is full or the wait exceeds queue_timeout
+        """
+        self.stats["submitted"] += 1
+        waiter = _Waiter(client, priority, next(self._sequence), asyncio.get_running_loop().create_future())
+        self._queue.append(waiter)
+        self._dispatch()
+        if not waiter.future.done():
+            if len(self._queue) > self.max_queued:
+                self._queue.remove(waiter)
+                self.stats["rejected_queue_full"] += 1
+                raise BPFtraceQueueFull(
+                    f"Too many bpftrace runs: {self.running} running, {len(self._queue)} queued; "
+                    f"try again later")
+            self.stats["queued"] += 1
+            logger.debug(f"bpftrace run for {client} queued ({len(self._queue)} waiting)")
+            try:
+                await asyncio.wait_for(asyncio.shield(waiter.future), self.queue_timeout)
+            except asyncio.TimeoutError:
+                if not waiter.future.done():
+                    self._queue.remove(waiter)
+                    waiter.future.cancel()
+                    self.stats["rejected_timeout"] += 1
+                    reason = (f"{client} is at its limit of {self.max_per_client} running"
+                              if not self._eligible(client) else f"{self.running} running")
+                    raise BPFtraceQueueFull(
+                        f"Waited {self.queue_timeout}s for a bpftrace slot ({reason}); "
+                        f"try again later")
+            except asyncio.CancelledError:
+                if waiter.future.done():
+                    # Granted as the caller went away: hand the slot on
+                    self._release(client)
+                else:
+                    self._queue.remove(waiter)
+                    waiter.future.cancel()
+                raise
+        waited = time.monotonic() - waiter.queued_at
+        self._record_wait(waited)
+        return BPFtraceSlot(self, client, waited)
+
+    def get_stats(self) -> dict:
+        """Occupancy and queue-wait counters, reported by get_bpftrace_info."""
+        started = self.stats["started"]
+        return {
+            **self.stats,
+            "queue_wait_avg": round(self.stats["queue_wait_total"] / started, 4) if started else 0.0,
+            "running": self.running,
+            "waiting": len(self._queue),
+            "running_by_client": dict(self.running_by_client),
+            "max_concurrent": self.max_concurrent,
+            "max_queued": self.max_queued,
+            "max_per_client": self.max_per_client,
+            "queue_timeout": self.queue_timeout
+        }
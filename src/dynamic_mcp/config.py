@@ -19,6 +19,44 @@ class Config:
         self.crash_timeout = int(os.getenv("CRASH_TIMEOUT", "360"))
         self.max_crash_dumps = int(os.getenv("MAX_CRASH_DUMPS", "10"))
         self.session_init_timeout = int(os.getenv("SESSION_INIT_TIMEOUT", "1024"))
+        self.max_crash_sessions = int(os.getenv("MAX_CRASH_SESSIONS", "4"))
+        self.crash_session_idle_timeout = int(os.getenv("CRASH_SESSION_IDLE_TIMEOUT", "3600"))
+        self.crash_session_max_rss_mb = int(os.getenv("CRASH_SESSION_MAX_RSS_MB", "0"))
+        self.prewarm_crash_sessions = os.getenv("PREWARM_CRASH_SESSIONS", "false").lower() == "true"
+        self.prewarm_max_concurrent = int(os.getenv("PREWARM_MAX_CONCURRENT", "1"))
+        self.prewarm_scan_interval = int(os.getenv("PREWARM_SCAN_INTERVAL", "30"))
+        self.crash_cache_max_mb = int(os.getenv("CRASH_CACHE_MAX_MB", "64"))
+        self.crash_cache_dir = os.getenv("CRASH_CACHE_DIR", "")
+        self.crash_cache_disk_max_mb = int(os.getenv("CRASH_CACHE_DISK_MAX_MB", "1024"))
+        self.crash_stream_chunk_kb = int(os.getenv("CRASH_STREAM_CHUNK_KB", "64"))
+        self.crash_output_dir = os.getenv("CRASH_OUTPUT_DIR", "")
+        self.crash_output_page_kb = int(os.getenv("CRASH_OUTPUT_PAGE_KB", "64"))
+        self.crash_output_ttl = int(os.getenv("CRASH_OUTPUT_TTL", "1800"))
+        self.crash_output_max_mb = int(os.getenv("CRASH_OUTPUT_MAX_MB", "4096"))
+        self.crash_fanout_replicas = int(os.getenv("CRASH_FANOUT_REPLICAS", "4"))
+        self.crash_catalog_db = os.getenv("CRASH_CATALOG_DB", "")
+        self.crash_catalog_refresh_interval = float(os.getenv("CRASH_CATALOG_REFRESH_INTERVAL", "2"))
+        self.watch_crash_dumps = os.getenv("WATCH_CRASH_DUMPS", "true").lower() == "true"
+        self.kernel_index_db = os.getenv("KERNEL_INDEX_DB", "")
+        self.debuginfod_urls = os.getenv("DEBUGINFOD_URLS", "").split()
+        self.debuginfod_cache_dir = os.getenv(
+            "DEBUGINFOD_CACHE_DIR", os.path.expanduser("~/.cache/dynamic-mcp/debuginfod"))
+        self.debuginfod_cache_max_mb = int(os.getenv("DEBUGINFOD_CACHE_MAX_MB", "16384"))
+        self.debuginfod_timeout = int(os.getenv("DEBUGINFOD_TIMEOUT", "60"))
+        self.crash_decompress_dir = os.getenv("CRASH_DECOMPRESS_DIR", "")
+        self.crash_decompress_max_mb = int(os.getenv("CRASH_DECOMPRESS_MAX_MB", "65536"))
+        self.crash_decompress_workers = int(os.getenv("CRASH_DECOMPRESS_WORKERS", "2"))
+        self.crash_snapshot_dir = os.getenv("CRASH_SNAPSHOT_DIR", "")
+        self.crash_snapshot_max_mb = int(os.getenv("CRASH_SNAPSHOT_MAX_MB", "64"))
+        self.bpftrace_stream_chunk_kb = int(os.getenv("BPFTRACE_STREAM_CHUNK_KB", "16"))
+        self.bpftrace_max_concurrent = int(os.getenv("BPFTRACE_MAX_CONCURRENT", "2"))
+        self.bpftrace_max_queued = int(os.getenv("BPFTRACE_MAX_QUEUED", "16"))
+        self.bpftrace_max_per_client = int(os.getenv("BPFTRACE_MAX_PER_CLIENT", "1"))
+        self.bpftrace_queue_timeout = float(os.getenv("BPFTRACE_QUEUE_TIMEOUT", "30"))
+        self.bpftrace_job_buffer_kb = int(os.getenv("BPFTRACE_JOB_BUFFER_KB", "1024"))
+        self.bpftrace_job_max_duration = int(os.getenv("BPFTRACE_JOB_MAX_DURATION", "3600"))
+        self.bpftrace_job_retention = int(os.getenv("BPFTRACE_JOB_RETENTION", "600"))
+        self.bpftrace_max_jobs = int(os.getenv("BPFTRACE_MAX_JOBS", "32"))
 
 
 def setup_logging():
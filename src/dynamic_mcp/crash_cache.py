@@ -0,0 +1,237 @@
+"""Result cache for deterministic crash commands."""
+
+import gzip
+import hashlib
+import logging
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+# Commands that change the session state (context, loaded symbols, memory)
+# or whose output is not a pure function of the dump.  Their results are
+# never cached, and running one makes the session's later output differ
+# from a fresh session, so caching is bypassed for that session from then on.
+STATEFUL_COMMANDS = {
+    "set", "extend", "wr", "gdb", "alias", "repeat", "!", "q", "quit", "exit",
+}
+STATEFUL_SUBCOMMANDS = {
+    "mod": {"-s", "-S", "-d", "-D", "-r", "-R"},
+}
+
+# Bytes hashed from each end of a file to identify it
+IDENTITY_SAMPLE_BYTES = 64 * 1024
+# File identities remembered; the least recently used are forgotten first
+MAX_IDENTITIES = 256
+
+
+def normalize_command(command: str) -> str:
+    """Collapse whitespace so equivalent spellings share a cache entry."""
+    return " ".join(command.split())
+
+
+def is_stateful_command(command: str) -> bool:
+    """Check whether a command changes session state."""
+    normalized = normalize_command(command)
+    if not normalized:
+        return False
+    if normalized.startswith("!"):
+        return True
+    words = normalized.split(" ")
+    if words[0] in STATEFUL_COMMANDS:
+        return True
+    flags = STATEFUL_SUBCOMMANDS.get(words[0])
+    if flags and flags.intersection(words[1:]):
+        return True
+    # Output redirected to a file has a side effect outside the session
+    return ">" in normalized
+
+
+class CrashResultCache:
+    """Content-addressed cache of crash command output.
+
+    Entries are keyed by a hash of the dump identity, the kernel identity and
+    the normalized command.  Identities are derived from the file size and
+    sampled content, so a dump keeps its cache entries when it is moved or
+    renamed.  The in-memory tier is an LRU bounded by ``max_bytes``; the
+    optional on-disk tier under ``cache_dir`` survives restarts and is
+    bounded by ``max_disk_bytes``.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, cache_dir: Optional[str] = None,
+                 max_disk_bytes: int = 1024 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.max_disk_bytes = max_disk_bytes
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        self._bytes = 0
+        self._identities: "OrderedDict[Tuple[str, int, int], str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._disk_bytes = 0
+        if self.cache_dir:
+            try:
+                self.cache_dir.mkdir(parents=True, exist_ok=True)
+                self._disk_bytes = sum(f.stat().st_size for f in self.cache_dir.glob("*/*.gz"))
+            except OSError as e:
+                logger.warning(f"Disabling on-disk crash result cache at {self.cache_dir}: {e}")
+                self.cache_dir = None
+
+    def is_enabled(self) -> bool:
+        """Check whether any cache tier is enabled."""
+        return self.max_bytes > 0 or self.cache_dir is not None
+
+    def file_identity(self, path: str) -> str:
+        """Identify a file by its size and sampled head and tail content."""
+        stat = os.stat(path)
+        memo_key = (path, stat.st_size, stat.st_mtime_ns)
+        with self._lock:
+            identity = self._identities.get(memo_key)
+            if identity is not None:
+                self._identities.move_to_end(memo_key)
+                return identity
+        digest = hashlib.sha256(str(stat.st_size).encode())
+        with open(path, "rb") as f:
+            digest.update(f.read(IDENTITY_SAMPLE_BYTES))
+            if stat.st_size > IDENTITY_SAMPLE_BYTES:
+                f.seek(max(IDENTITY_SAMPLE_BYTES, stat.st_size - IDENTITY_SAMPLE_BYTES))
+                digest.update(f.read(IDENTITY_SAMPLE_BYTES))
+        identity = digest.hexdigest()
+        with self._lock:
+            self._identities[memo_key] = identity
+            while len(self._identities) > MAX_IDENTITIES:
+                self._identities.popitem(last=False)
+        return identity
+
+    def make_key(self, dump_path: str, kernel_path: str, command: str) -> str:
+        """Build the cache key for a command against a dump and kernel."""
+        parts = [
+            self.file_identity(dump_path),
+            self.file_identity(kernel_path),
+            normalize_command(command),
+        ]
+        return hashlib.sha256("\0".join(parts).encode()).hexdigest()
+
+    def _disk_path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.gz"
+
+    def get(self, key: str) -> Optional[str]:
+        """Look up cached output, promoting disk hits into memory."""
+        with self._lock:
+            output = self._entries.get(key)
+            if output is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return output
+
+        if self.cache_dir:
+            path = self._disk_path(key)
+            try:
+                with gzip.open(path, "rt", encoding="utf-8") as f:
+                    output = f.read()
+                os.utime(path)
+            except FileNotFoundError:
+                output = None
+            except (OSError, EOFError) as e:
+                logger.warning(f"Ignoring unreadable cache entry {path}: {e}")
+                output = None
+            if output is not None:
+                with self._lock:
+                    self.hits += 1
+                    self.disk_hits += 1
+                    self._store_in_memory(key, output)
+                return output
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: str, output: str):
+        """Cache command output in memory and, if enabled, on disk."""
+        with self._lock:
+            self._store_in_memory(key, output)
+        if self.cache_dir:
+            self._store_on_disk(key, output)
+
+    def _store_in_memory(self, key: str, output: str):
+        size = len(output.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._bytes -= self._sizes[key]
+        self._entries[key] = output
+        self._entries.move_to_end(key)
+        self._sizes[key] = size
+        self._bytes += size
+        while self._bytes > self.max_bytes:
+            old_key, _ = self._entries.popitem(last=False)
+            self._bytes -= self._sizes.pop(old_key)
+            self.evictions += 1
+
+    def _store_on_disk(self, key: str, output: str):
+        path = self._disk_path(key)
+        if path.exists():
+            return
+        try:
+            path.parent.mkdir(exist_ok=True)
+            tmp_path = path.with_suffix(f".tmp{os.getpid()}.{threading.get_ident()}")
+            with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+                f.write(output)
+            os.replace(tmp_path, path)
+            with self._lock:
+                self._disk_bytes += path.stat().st_size
+                over_limit = self._disk_bytes > self.max_disk_bytes
+            if over_limit:
+                self._evict_disk()
+        except OSError as e:
+            logger.warning(f"Could not write cache entry {path}: {e}")
+
+    def _evict_disk(self):
+        """Drop least recently used disk entries down to 90% of the limit."""
+        entries = []
+        for path in self.cache_dir.glob("*/*.gz"):
+            try:
+                stat = path.stat()
+                entries.append((stat.st_mtime, stat.st_size, path))
+            except OSError:
+                continue
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+        target = self.max_disk_bytes * 0.9
+        for _, size, path in entries:
+            if total <= target:
+                break
+            try:
+                path.unlink()
+                total -= size
+                self.evictions += 1
+            except OSError:
+                continue
+        with self._lock:
+            self._disk_bytes = total
+
+    def get_stats(self) -> dict:
+        """Hit/miss counters and occupancy, reported by get_crash_info."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "memory_bytes": self._bytes,
+                "max_memory_bytes": self.max_bytes,
+                "disk_bytes": self._disk_bytes if self.cache_dir else None,
+                "cache_dir": str(self.cache_dir) if self.cache_dir else None
+            }
@@ -0,0 +1,285 @@
+"""Decompressed copies of compressed crash dumps.
+
+crash reads ELF and kdump-compressed vmcores in place, but not a
+``vmcore.gz``/``.xz``/``.zst`` or a makedumpfile flattened file (the
+format ``makedumpfile -F`` writes for transfer over a pipe).  Such dumps
+are streamed once into a cache directory: compressed input is
+decompressed, flattened records are written back to their offsets (what
+``makedumpfile -R`` does), and crash is started on the result.  The work
+runs in worker processes, so the server's event loop and GIL stay free.
+"""
+
+import asyncio
+import bz2
+import gzip
+import hashlib
+import logging
+import lzma
+import multiprocessing
+import os
+import shutil
+import struct
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from dynamic_mcp.crash_discovery import CrashDump
+from dynamic_mcp.dump_metadata import FLATTENED_HEADER_SIZE, FLATTENED_SIGNATURE
+
+
+logger = logging.getLogger(__name__)
+
+COMPRESSED_SUFFIXES = (".gz", ".xz", ".bz2", ".zst")
+COPY_BUFFER_BYTES = 1024 * 1024
+FLATTENED_RECORD = struct.Struct(">qq")
+
+
+def _open_dump(path: str):
+    """Open a dump for reading, decompressing by suffix."""
+    if path.endswith(".gz"):
+        return gzip.open(path, "rb")
+    if path.endswith(".xz"):
+        return lzma.open(path, "rb")
+    if path.endswith(".bz2"):
+        return bz2.open(path, "rb")
+    if path.endswith(".zst"):
+        try:
+            import zstandard
+        except ImportError:
+            raise RuntimeError("zstandard is not installed (pip install zstandard)")
+        raw = open(path, "rb")
+        return zstandard.ZstdDecompressor().stream_reader(raw, closefd=True)
+    return open(path, "rb")
+
+
+def _read_upto(source, size: int) -> bytes:
+    """Read size bytes, fewer only at the end of the stream."""
+    data = b""
+    while len(data) < size:
+        chunk = source.read(size - len(data))
+        if not chunk:
+            break
+        data += chunk
+    return data
+
+
+def _read_exactly(source, size: int) -> bytes:
+    data = _read_upto(source, size)
+    if len(data) < size:
+        raise EOFError(f"dump ends {size - len(data)} bytes early")
+    return data
+
+
+def _unflatten(source, target):
+    """Write the records of a flattened dump to their offsets in target."""
+    end = 0
+    while True:
+        offset, size = FLATTENED_RECORD.unpack(_read_exactly(source, FLATTENED_RECORD.size))
+        if offset < 0 or size <= 0:
+            # End marker
+            break
+        target.seek(offset)
+        remaining = size
+        while remaining:
+            chunk = _read_exactly(source, min(remaining, COPY_BUFFER_BYTES))
+            target.write(chunk)
+            remaining -= len(chunk)
+        end = max(end, offset + size)
+    target.truncate(end)
+
+
+def decompress_dump(source: str, target: str) -> int:
+    """Write the crash-readable form of a dump to target.
+
+    Runs in a worker process.  Output goes to a temporary file that is
+    renamed into place when complete.
+
+    Returns:
+        Bytes written
+    """
+    partial = f"{target}.{os.getpid()}.tmp"
+    try:
+        with _open_dump(source) as src, open(partial, "wb") as dst:
+            header = _read_upto(src, FLATTENED_HEADER_SIZE)
+            if header.startswith(FLATTENED_SIGNATURE):
+                _unflatten(src, dst)
+            else:
+                dst.write(header)
+                shutil.copyfileobj(src, dst, COPY_BUFFER_BYTES)
+        os.replace(partial, target)
+    except BaseException:
+        try:
+            os.unlink(partial)
+        except OSError:
+            pass
+        raise
+    return os.stat(target).st_size
+
+
+def needs_decompression(path) -> bool:
+    """Whether crash needs a decompressed copy of this dump."""
+    path = Path(path)
+    if path.name.endswith(COMPRESSED_SUFFIXES):
+        return True
+    try:
+        with open(path, "rb") as f:
+            return f.read(len(FLATTENED_SIGNATURE)) == FLATTENED_SIGNATURE
+    except OSError:
+        return False
+
+
+class CrashDumpDecompressor:
+    """Cache of decompressed dumps, filled by a process pool.
+
+    Each dump is decompressed once per version (path, size, mtime); later
+    sessions reuse the copy until it is evicted.  Concurrent requests for
+    the same dump wait for one decompression, and at most
+    ``max_concurrent`` run at a time.  The cache is an LRU on file mtime
+    bounded by ``max_bytes`` of disk usage.  Without ``cache_dir`` a
+    temporary directory is used and removed on close.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None, max_bytes: int = 64 * 1024 * 1024 * 1024,
+                 max_concurrent: int = 2):
+        if cache_dir:
+            self.cache_dir = Path(cache_dir)
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            self._owns_dir = False
+        else:
+            self.cache_dir = Path(tempfile.mkdtemp(prefix="dynamic-mcp-vmcores-"))
+            self._owns_dir = True
+        self.max_bytes = max_bytes
+        self.max_concurrent = max(1, max_concurrent)
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pending: Dict[Path, asyncio.Future] = {}
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "decompressed": 0, "failures": 0, "bytes_written": 0,
+                      "seconds": 0.0, "evictions": 0}
+
+    def cached_path(self, dump: CrashDump) -> Path:
+        """Where the decompressed copy of this version of the dump goes."""
+        stat = os.stat(dump.path)
+        identity = f"{os.path.realpath(dump.path)}\0{stat.st_size}\0{stat.st_mtime_ns}"
+        key = hashlib.sha256(identity.encode()).hexdigest()
+        name = dump.name
+        for suffix in COMPRESSED_SUFFIXES:
+            if name.endswith(suffix):
+                name = name[:-len(suffix)]
+        return self.cache_dir / key[:32] / (name or "vmcore")
+
+    def _locate(self, dump: CrashDump) -> Tuple[Optional[Path], bool]:
+        """Where the copy of a dump goes, and whether it is already there.
+
+        Returns (None, False) for dumps crash reads in place.  A copy that
+        exists is touched, so it stays recent for eviction.
+        """
+        if not needs_decompression(dump.path):
+            return None, False
+        target = self.cached_path(dump)
+        try:
+            os.utime(target)
+            return target, True
+        except OSError:
+            return target, False
+
+    async def prepare(self, dump: CrashDump) -> CrashDump:
+        """The dump crash should open: the dump itself, or its decompressed copy.
+
+        Raises:
+            RuntimeError: if the dump cannot be decompressed
+        """
+        target, cached = await asyncio.to_thread(self._locate, dump)
+        if target is None:
+            return dump
+        if cached:
+            self.stats["hits"] += 1
+            return dump._replace(path=target)
+
+        pending = self._pending.get(target)
+        if pending is None:
+            pending = asyncio.ensure_future(self._decompress(dump, target))
+            self._pending[target] = pending
+            pending.add_done_callback(lambda future: self._forget(target, future))
+        # shield: a cancelled caller must not abort the work for everyone else
+        await asyncio.shield(pending)
+        return dump._replace(path=target)
+
+    def _forget(self, target: Path, future: asyncio.Future):
+        self._pending.pop(target, None)
+        # Retrieve the error: every caller that would have may be cancelled
+        if not future.cancelled():
+            future.exception()
+
+    async def _decompress(self, dump: CrashDump, target: Path):
+        logger.info(f"Decompressing crash dump {dump.path} into {target}")
+        started = time.monotonic()
+        try:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            size = await asyncio.get_running_loop().run_in_executor(
+                self._get_pool(), decompress_dump, str(dump.path), str(target))
+        except Exception as e:
+            self.stats["failures"] += 1
+            shutil.rmtree(target.parent, ignore_errors=True)
+            raise RuntimeError(f"Cannot decompress {dump.path}: {e}") from e
+        elapsed = time.monotonic() - started
+        self.stats["decompressed"] += 1
+        self.stats["bytes_written"] += size
+        self.stats["seconds"] = round(self.stats["seconds"] + elapsed, 3)
+        logger.info(f"Decompressed {dump.path} ({size} bytes) in {elapsed:.1f}s")
+        await asyncio.to_thread(self.evict, target)
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                # spawn: forking the threaded server is unsafe
+                self._pool = ProcessPoolExecutor(max_workers=self.max_concurrent,
+                                                 mp_context=multiprocessing.get_context("spawn"))
+            return self._pool
+
+    def evict(self, keep: Optional[Path] = None):
+        """Drop least recently used copies down to 90% of the limit."""
+        entries = []
+        for path in self.cache_dir.glob("*/*"):
+            if path.name.endswith(".tmp"):
+                continue
+            try:
+                stat = path.stat()
+                entries.append((stat.st_mtime, stat.st_blocks * 512, path))
+            except OSError:
+                continue
+        total = sum(size for _, size, _ in entries)
+        if total <= self.max_bytes:
+            return
+        entries.sort()
+        target = self.max_bytes * 0.9
+        for _, size, path in entries:
+            if total <= target:
+                break
+            if path == keep:
+                continue
+            # Sessions that already opened the file keep reading it
+            shutil.rmtree(path.parent, ignore_errors=True)
+            total -= size
+            self.stats["evictions"] += 1
+            logger.info(f"Evicted decompressed dump {path}")
+
+    def get_stats(self) -> dict:
+        """Cache and worker counters, reported by get_crash_info."""
+        return {
+            **self.stats,
+            "cache_dir": str(self.cache_dir),
+            "in_progress": len(self._pending),
+            "max_concurrent": self.max_concurrent
+        }
+
+    def close(self):
+        """Stop the worker processes; remove the cache if it is temporary."""
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+        if self._owns_dir:
+            shutil.rmtree(self.cache_dir, ignore_errors=True)
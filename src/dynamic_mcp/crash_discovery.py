@@ -1,14 +1,31 @@
 """Crash dump discovery functionality."""
 
+import bisect
+import heapq
+import json
 import logging
 import os
+import sqlite3
+import threading
+import time
+from fnmatch import fnmatchcase
 from pathlib import Path
-from typing import List, NamedTuple, Optional
+from operator import itemgetter
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
 from datetime import datetime
 
+from dynamic_mcp.dump_metadata import DumpMetadata, read_dump_metadata
 
 logger = logging.getLogger(__name__)
 
+# Dumps modified this recently may still be written by kdump, which grows
+# the file without touching its directory, so they are re-stat'ed on refresh
+ACTIVE_WINDOW = 300
+# A directory modified this close to its last scan may have changed again
+# within the filesystem's timestamp granularity (coarse on NFS); rescan it
+RACY_WINDOW = 2.0
+
+
 
 class CrashDump(NamedTuple):
     """Represents a crash dump file."""
@@ -35,10 +52,472 @@ class CrashDump(NamedTuple):
         }
 
 
+# Catalog entry for one dump: (name, size, st_mtime).  CrashDump objects,
+# with their Path and datetime, are only built for dumps a query returns
+_Entry = Tuple[str, int, float]
+
+
+class _Directory:
+    """Catalog state for one scanned directory."""
+
+    __slots__ = ("mtime_ns", "depth", "scanned_at", "dumps", "subdirs")
+
+    def __init__(self, mtime_ns: int, depth: int, scanned_at: float):
+        self.mtime_ns = mtime_ns
+        self.depth = depth
+        self.scanned_at = scanned_at
+        self.dumps: Set[str] = set()
+        self.subdirs: Set[str] = set()
+
+    def is_racy(self) -> bool:
+        return self.scanned_at - self.mtime_ns / 1e9 < RACY_WINDOW
+
+
+class CrashDumpCatalog:
+    """Index of crash dumps kept fresh by directory mtime checks.
+
+    The first refresh walks the tree (down to ``max_depth`` directory levels
+    below ``root``); later refreshes only stat the known directories and
+    rescan the ones whose mtime changed, plus re-stat dumps that are still
+    being written.  Lookups by path or name are dictionary hits.  With
+    ``db_path`` the index is also kept in SQLite, so a restart validates the
+    stored directories instead of walking the tree again.  Dumps are kept
+    as raw (name, size, mtime) entries and turned into CrashDump objects
+    only when returned.  Header metadata is read once per dump version and
+    kept alongside.
+
+    While ``live`` is set, a watcher reports changes through
+    ``mark_stale`` and refreshes touch only what it reported.
+    """
+
+    def __init__(self, root: Path, patterns: List[str], max_depth: int = 3,
+                 db_path: Optional[str] = None, refresh_interval: float = 0.0,
+                 metadata_reader: Callable[[str], DumpMetadata] = read_dump_metadata):
+        self.root = Path(root)
+        self.patterns = patterns
+        self.max_depth = max_depth
+        self.db_path = db_path
+        self.refresh_interval = refresh_interval
+        self.metadata_reader = metadata_reader
+        self.dumps: Dict[str, _Entry] = {}
+        self._by_name: Dict[str, Set[str]] = {}
+        # Sorted file names for prefix and glob queries, rebuilt on demand
+        self._sorted_names: Optional[List[str]] = None
+        self._dirs: Dict[str, _Directory] = {}
+        # Path -> (entry the metadata was read for, metadata)
+        self._metadata: Dict[str, Tuple[_Entry, DumpMetadata]] = {}
+        self._dirty: Set[str] = set()
+        self._removed: Set[str] = set()
+        self.live = False
+        self._stale_dirs: Set[str] = set()
+        self._stale_files: Set[str] = set()
+        self._lock = threading.RLock()
+        self._last_refresh: Optional[float] = None
+        self.stats = {"full_scans": 0, "directory_rescans": 0, "refreshes": 0, "loaded_from_db": 0,
+                      "metadata_reads": 0, "metadata_hits": 0}
+        if db_path:
+            self._load()
+
+    def refresh(self, force: bool = False) -> bool:
+        """Bring the index up to date with the filesystem.
+
+        Returns:
+            True if any dump was added, removed or changed
+        """
+        with self._lock:
+            now = time.monotonic()
+            if (not force and not self.live and self._last_refresh is not None
+                    and now - self._last_refresh < self.refresh_interval):
+                return False
+            self._last_refresh = now
+            self.stats["refreshes"] += 1
+
+            root = str(self.root)
+            if root not in self._dirs:
+                if not self.root.is_dir():
+                    return False
+                self.stats["full_scans"] += 1
+                self._scan_dir(root, 0)
+                changed = True
+            elif self.live:
+                changed = self._apply_stale()
+            else:
+                changed = False
+                for path, directory in list(self._dirs.items()):
+                    if path not in self._dirs:
+                        # Dropped with its parent earlier in this pass
+                        continue
+                    try:
+                        mtime_ns = os.stat(path).st_mtime_ns
+                    except OSError:
+                        self._drop_dir(path)
+                        changed = True
+                        continue
+                    if mtime_ns != directory.mtime_ns or directory.is_racy():
+                        changed |= self._scan_dir(path, directory.depth)
+                changed |= self._restat_active()
+
+            if self.db_path and (self._dirty or self._removed):
+                self._save()
+            return changed
+
+    def _scan_dir(self, path: str, depth: int) -> bool:
+        """(Re)scan one directory, recursing into new subdirectories."""
+        self.stats["directory_rescans"] += 1
+        try:
+            mtime_ns = os.stat(path).st_mtime_ns
+            entries = list(os.scandir(path))
+        except OSError as e:
+            logger.warning(f"Cannot scan crash dump directory {path}: {e}")
+            return False
+
+        old = self._dirs.get(path)
+        directory = _Directory(mtime_ns, depth, time.time())
+        self._dirs[path] = directory
+        self._dirty.add(path)
+        changed = False
+
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    if depth < self.max_depth:
+                        directory.subdirs.add(entry.path)
+                    continue
+                if not entry.is_file() or not self._matches(entry.name):
+                    continue
+                stat = entry.stat()
+            except OSError as e:
+                logger.warning(f"Cannot access dump file {entry.path}: {e}")
+                continue
+            directory.dumps.add(entry.path)
+            changed |= self._put(entry.path, (entry.name, stat.st_size, stat.st_mtime))
+
+        if old:
+            for dump_path in old.dumps - directory.dumps:
+                self._forget(dump_path)
+                changed = True
+            for subdir in old.subdirs - directory.subdirs:
+                self._drop_dir(subdir)
+                changed = True
+        for subdir in directory.subdirs - (old.subdirs if old else set()):
+            if subdir not in self._dirs:
+                changed |= self._scan_dir(subdir, depth + 1)
+        return changed
+
+    def _drop_dir(self, path: str):
+        """Remove a directory and everything below it from the index."""
+        directory = self._dirs.pop(path, None)
+        if directory is None:
+            return
+        self._dirty.discard(path)
+        self._removed.add(path)
+        for dump_path in directory.dumps:
+            self._forget(dump_path)
+        for subdir in directory.subdirs:
+            self._drop_dir(subdir)
+
+    def _restat_active(self) -> bool:
+        """Pick up size changes of dumps that may still be growing."""
+        changed = False
+        cutoff = time.time() - ACTIVE_WINDOW
+        for path in [path for path, entry in self.dumps.items() if entry[2] > cutoff]:
+            changed |= self._restat(path)
+        return changed
+
+    def _restat(self, path: str) -> bool:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return False
+        if not self._put(path, (self.dumps[path][0], stat.st_size, stat.st_mtime)):
+            return False
+        self._dirty.add(os.path.dirname(path))
+        return True
+
+    def mark_stale(self, path: str, is_dir: bool):
+        """Record a change reported by a watcher, applied on the next refresh."""
+        with self._lock:
+            (self._stale_dirs if is_dir else self._stale_files).add(path)
+
+    def _apply_stale(self) -> bool:
+        """Rescan the directories and re-stat the dumps marked stale."""
+        changed = False
+        stale_dirs, self._stale_dirs = self._stale_dirs, set()
+        # Parents first, so a dropped parent takes its children with it
+        for path in sorted(stale_dirs):
+            directory = self._dirs.get(path)
+            if directory is None:
+                continue
+            if not os.path.isdir(path):
+                self._drop_dir(path)
+                changed = True
+                continue
+            changed |= self._scan_dir(path, directory.depth)
+        stale_files, self._stale_files = self._stale_files, set()
+        for path in stale_files:
+            if path in self.dumps:
+                changed |= self._restat(path)
+        return changed
+
+    def directories(self) -> List[str]:
+        """Every indexed directory."""
+        with self._lock:
+            return list(self._dirs)
+
+    def _matches(self, name: str) -> bool:
+        return any(fnmatchcase(name, pattern) for pattern in self.patterns)
+
+    def _put(self, path: str, entry: _Entry) -> bool:
+        previous = self.dumps.get(path)
+        self.dumps[path] = entry
+        name = entry[0]
+        if name not in self._by_name:
+            self._by_name[name] = set()
+            self._sorted_names = None
+        self._by_name[name].add(path)
+        return previous != entry
+
+    def _forget(self, path: str):
+        entry = self.dumps.pop(path, None)
+        if entry is None:
+            return
+        self._metadata.pop(path, None)
+        same_name = self._by_name.get(entry[0], set())
+        same_name.discard(path)
+        if not same_name:
+            self._by_name.pop(entry[0], None)
+            self._sorted_names = None
+
+    def _dump(self, path: str) -> CrashDump:
+        name, size, mtime = self.dumps[path]
+        return CrashDump(name, Path(path), size, datetime.fromtimestamp(mtime))
+
+    def _newest_first(self, paths: Iterable[str]) -> List[CrashDump]:
+        """CrashDumps for paths, sorted by raw mtime before they are built."""
+        return [self._dump(path) for _, path in sorted(((self.dumps[path][2], path) for path in paths),
+                                                        reverse=True)]
+
+    def get(self, path) -> Optional[CrashDump]:
+        """Look up a dump by path."""
+        with self._lock:
+            return self._dump(str(path)) if str(path) in self.dumps else None
+
+    def metadata(self, path) -> Optional[DumpMetadata]:
+        """Header metadata of an indexed dump, read again only if it changed."""
+        key = str(path)
+        with self._lock:
+            entry = self.dumps.get(key)
+            if entry is None:
+                return None
+            cached = self._metadata.get(key)
+            if cached and cached[0] == entry:
+                self.stats["metadata_hits"] += 1
+                return cached[1]
+        metadata = self.metadata_reader(key)
+        with self._lock:
+            if self.dumps.get(key) != entry:
+                # Changed while being read; the next call reads it again
+                return metadata
+            self._metadata[key] = (entry, metadata)
+            self.stats["metadata_reads"] += 1
+            if self.db_path:
+                self._save_metadata(key, entry, metadata)
+        return metadata
+
+    def newest(self, count: int) -> List[CrashDump]:
+        """The ``count`` most recently modified dumps, newest first."""
+        with self._lock:
+            # (mtime, path) pairs straight from the dict, without a lookup per dump
+            keyed = zip(map(itemgetter(2), self.dumps.values()), self.dumps)
+            chosen = [max(keyed)] if count == 1 and self.dumps else heapq.nlargest(count, keyed)
+            return [self._dump(path) for _, path in chosen]
+
+    def find_by_name(self, name: str) -> List[CrashDump]:
+        """All dumps with this file name, newest first."""
+        with self._lock:
+            return self._newest_first(self._by_name.get(name, ()))
+
+    def find_by_prefix(self, prefix: str) -> List[CrashDump]:
+        """All dumps whose file name starts with prefix, newest first."""
+        with self._lock:
+            return self._newest_first(path for name in self._names_with_prefix(prefix)
+                                      for path in self._by_name[name])
+
+    def lookup(self, query: str) -> List[CrashDump]:
+        """Dumps matching a name, path or glob, newest first.
+
+        An absolute path selects that dump; a relative path such as
+        ``127.0.0.1-2024-05-01-10:00:00/vmcore`` selects the dumps whose path
+        ends with it, which tells apart the many files kdump names
+        ``vmcore``.  A glob is matched against the file name, or against
+        the path below the root when it contains a "/".  Anything else is
+        an exact file name.
+        """
+        query = query.strip()
+        if not query:
+            return []
+        if any(char in query for char in "*?["):
+            return self._glob(query)
+        if os.path.isabs(query):
+            dump = self.get(os.path.normpath(query))
+            return [dump] if dump else []
+        query = os.path.normpath(query)
+        if "/" not in query:
+            return self.find_by_name(query)
+        suffix = os.sep + query
+        with self._lock:
+            return self._newest_first(path for path in self._by_name.get(os.path.basename(query), ())
+                                      if path.endswith(suffix))
+
+    def _glob(self, pattern: str) -> List[CrashDump]:
+        name_pattern = os.path.basename(pattern)
+        # Only names sharing the pattern's literal prefix can match
+        prefix = name_pattern
+        for index, char in enumerate(name_pattern):
+            if char in "*?[":
+                prefix = name_pattern[:index]
+                break
+        if "/" in pattern and not os.path.isabs(pattern):
+            pattern = os.path.join(str(self.root), pattern)
+        with self._lock:
+            candidates = [path for name in self._names_with_prefix(prefix)
+                          if fnmatchcase(name, name_pattern)
+                          for path in self._by_name[name]]
+            if "/" in pattern:
+                candidates = [path for path in candidates if fnmatchcase(path, pattern)]
+            return self._newest_first(candidates)
+
+    def _names_with_prefix(self, prefix: str) -> List[str]:
+        if self._sorted_names is None:
+            self._sorted_names = sorted(self._by_name)
+        start = bisect.bisect_left(self._sorted_names, prefix)
+        end = start
+        while end < len(self._sorted_names) and self._sorted_names[end].startswith(prefix):
+            end += 1
+        return self._sorted_names[start:end]
+
+    def all(self) -> List[CrashDump]:
+        """Every indexed dump, in no particular order."""
+        with self._lock:
+            return [self._dump(path) for path in self.dumps]
+
+    def _connect(self) -> sqlite3.Connection:
+        db = sqlite3.connect(self.db_path)
+        db.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        db.execute("CREATE TABLE IF NOT EXISTS dirs (path TEXT PRIMARY KEY, mtime_ns INTEGER, "
+                   "depth INTEGER, scanned_at REAL)")
+        db.execute("CREATE TABLE IF NOT EXISTS dumps (path TEXT PRIMARY KEY, dir TEXT, name TEXT, "
+                   "size INTEGER, mtime REAL)")
+        db.execute("CREATE INDEX IF NOT EXISTS dumps_dir ON dumps (dir)")
+        db.execute("CREATE TABLE IF NOT EXISTS dump_metadata (path TEXT PRIMARY KEY, size INTEGER, "
+                   "mtime REAL, metadata TEXT)")
+        return db
+
+    def _load(self):
+        """Restore the index from SQLite; refresh() then only validates it."""
+        try:
+            db = self._connect()
+            with db:
+                dirs, params = self._subtree("path")
+                dumps = self._subtree("dir")[0]
+                config = f"{self.max_depth}|{','.join(self.patterns)}"
+                row = db.execute("SELECT value FROM meta WHERE key = ?", (f"root:{self.root}",)).fetchone()
+                if row is None or row[0] != config:
+                    # Built with another configuration: start over
+                    db.execute(f"DELETE FROM dirs WHERE {dirs}", params)
+                    db.execute(f"DELETE FROM dump_metadata WHERE {dirs}", params)
+                    db.execute(f"DELETE FROM dumps WHERE {dumps}", params)
+                    db.execute("INSERT OR REPLACE INTO meta VALUES (?, ?)", (f"root:{self.root}", config))
+                    return
+                for path, mtime_ns, depth, scanned_at in db.execute(f"SELECT * FROM dirs WHERE {dirs}", params):
+                    self._dirs[path] = _Directory(mtime_ns, depth, scanned_at)
+                for path in self._dirs:
+                    parent = os.path.dirname(path)
+                    if parent in self._dirs and path != parent:
+                        self._dirs[parent].subdirs.add(path)
+                for path, dir_path, name, size, mtime in db.execute(f"SELECT * FROM dumps WHERE {dumps}", params):
+                    if dir_path in self._dirs:
+                        self._dirs[dir_path].dumps.add(path)
+                        self._put(path, (name, size, mtime))
+                stale = []
+                for path, size, mtime, metadata in db.execute(f"SELECT * FROM dump_metadata WHERE {dirs}", params):
+                    entry = self.dumps.get(path)
+                    if entry and entry[1:] == (size, mtime):
+                        self._metadata[path] = (entry, DumpMetadata(**json.loads(metadata)))
+                    else:
+                        stale.append((path,))
+                db.executemany("DELETE FROM dump_metadata WHERE path = ?", stale)
+            db.close()
+            self.stats["loaded_from_db"] = len(self.dumps)
+            logger.info(f"Loaded {len(self.dumps)} files under {self.root} in {len(self._dirs)} directories "
+                        f"from {self.db_path}")
+        except sqlite3.Error as e:
+            logger.warning(f"Ignoring crash dump catalog {self.db_path}: {e}")
+            self._dirs.clear()
+            self.dumps.clear()
+            self._by_name.clear()
+            self._metadata.clear()
+
+    def _subtree(self, column: str) -> Tuple[str, tuple]:
+        """SQL condition selecting rows under this catalog's root.
+
+        Catalogs of different roots can share one database this way.
+        """
+        root = str(self.root)
+        prefix = root.rstrip(os.sep) + os.sep
+        return f"({column} = ? OR substr({column}, 1, ?) = ?)", (root, len(prefix), prefix)
+
+    def _save(self):
+        """Write changed directories to SQLite."""
+        try:
+            db = self._connect()
+            with db:
+                for path in self._removed:
+                    db.execute("DELETE FROM dirs WHERE path = ?", (path,))
+                    db.execute("DELETE FROM dump_metadata WHERE path IN (SELECT path FROM dumps WHERE dir = ?)",
+                               (path,))
+                    db.execute("DELETE FROM dumps WHERE dir = ?", (path,))
+                for path in self._dirty:
+                    directory = self._dirs[path]
+                    db.execute("INSERT OR REPLACE INTO dirs VALUES (?, ?, ?, ?)",
+                               (path, directory.mtime_ns, directory.depth, directory.scanned_at))
+                    db.execute("DELETE FROM dumps WHERE dir = ?", (path,))
+                    db.executemany(
+                        "INSERT OR REPLACE INTO dumps VALUES (?, ?, ?, ?, ?)",
+                        [(dump_path, path, *self.dumps[dump_path])
+                         for dump_path in directory.dumps if dump_path in self.dumps]
+                    )
+            db.close()
+        except sqlite3.Error as e:
+            logger.warning(f"Could not save crash dump catalog {self.db_path}: {e}")
+        self._dirty.clear()
+        self._removed.clear()
+
+    def _save_metadata(self, path: str, entry: _Entry, metadata: DumpMetadata):
+        try:
+            db = self._connect()
+            with db:
+                db.execute("INSERT OR REPLACE INTO dump_metadata VALUES (?, ?, ?, ?)",
+                           (path, entry[1], entry[2], json.dumps(metadata._asdict())))
+            db.close()
+        except sqlite3.Error as e:
+            logger.warning(f"Could not save dump metadata to {self.db_path}: {e}")
+
+    def get_stats(self) -> dict:
+        """Index size and refresh counters, reported by get_crash_info."""
+        return {
+            "dumps": len(self.dumps),
+            "directories": len(self._dirs),
+            "database": self.db_path,
+            **self.stats
+        }
+
+
 class CrashDumpDiscovery:
     """Discovers crash dump files in the system."""
     
-    def __init__(self, crash_dump_path: str):
+    def __init__(self, crash_dump_path: str, catalog_db: Optional[str] = None,
+                 refresh_interval: float = 0.0):
         self.crash_dump_path = Path(crash_dump_path)
         self.dump_patterns = [
             "vmcore*",
@@ -46,48 +525,20 @@ class CrashDumpDiscovery:
             "crash*",
             "dump*"
         ]
+        # Files in directories up to three levels below crash_dump_path
+        self.catalog = CrashDumpCatalog(
+            self.crash_dump_path, self.dump_patterns, max_depth=3,
+            db_path=catalog_db, refresh_interval=refresh_interval
+        )
     
     def find_crash_dumps(self, max_dumps: int = 10) -> List[CrashDump]:
         """Find crash dump files in the system."""
-        dumps = []
-        
         if not self.crash_dump_path.exists():
             logger.warning(f"Crash dump path does not exist: {self.crash_dump_path}")
-            return dumps
-        
-        try:
-            # Search in main directory and subdirectories
-            for root, dirs, files in os.walk(self.crash_dump_path):
-                root_path = Path(root)
-                
-                for file in files:
-                    file_path = root_path / file
-                    
-                    # Check if file matches dump patterns
-                    if any(file_path.match(pattern) for pattern in self.dump_patterns):
-                        try:
-                            stat = file_path.stat()
-                            dump = CrashDump(
-                                name=file,
-                                path=file_path,
-                                size=stat.st_size,
-                                timestamp=datetime.fromtimestamp(stat.st_mtime)
-                            )
-                            dumps.append(dump)
-                        except (OSError, PermissionError) as e:
-                            logger.warning(f"Cannot access dump file {file_path}: {e}")
-                            continue
-                
-                # Limit search depth to avoid excessive recursion
-                if len(str(root_path).split(os.sep)) - len(str(self.crash_dump_path).split(os.sep)) > 2:
-                    dirs.clear()
-        
-        except PermissionError as e:
-            logger.error(f"Permission denied accessing crash dump directory: {e}")
-        
-        # Sort by timestamp (newest first) and limit results
-        dumps.sort(key=lambda x: x.timestamp, reverse=True)
-        return dumps[:max_dumps]
+            return []
+
+        self.catalog.refresh()
+        return self.catalog.newest(max_dumps)
     
     def get_dump_info(self, dump: CrashDump) -> dict:
         """Get detailed information about a crash dump."""
@@ -100,18 +551,37 @@ class CrashDumpDiscovery:
             "readable": os.access(dump.path, os.R_OK)
         }
 
+    def get_dump_metadata(self, dump: CrashDump, readable: Optional[CrashDump] = None) -> DumpMetadata:
+        """Kernel release, build-id, crash time and panic message of a dump.
+
+        Args:
+            dump: The dump
+            readable: Decompressed copy of a compressed dump; its headers
+                are read instead of the dump's
+        """
+        metadata = self.catalog.metadata(dump.path)
+        # Dumps outside the catalog (e.g. given by path) are read directly
+        if metadata is None:
+            metadata = read_dump_metadata(dump.path)
+        if readable is not None and readable.path != dump.path:
+            # The panic line is saved beside the original dump
+            metadata = read_dump_metadata(readable.path)._replace(panic=metadata.panic)
+        return metadata
+
     def get_latest_crash_dump(self) -> Optional[CrashDump]:
         """Get the most recent crash dump."""
         dumps = self.find_crash_dumps(max_dumps=1)
         return dumps[0] if dumps else None
 
     def get_crash_dump_by_name(self, name: str) -> Optional[CrashDump]:
-        """Get a crash dump by name."""
-        dumps = self.find_crash_dumps()
-        for dump in dumps:
-            if dump.name == name:
-                return dump
-        return None
+        """Get a crash dump by name or path (the newest one if several match)."""
+        dumps = self.search_crash_dumps(name)
+        return dumps[0] if dumps else None
+
+    def search_crash_dumps(self, query: str) -> List[CrashDump]:
+        """All dumps matching a name, path or glob, newest first."""
+        self.catalog.refresh()
+        return self.catalog.lookup(query)
 
     def is_valid_crash_dump(self, dump) -> bool:
         """Check if a file is a valid crash dump."""
@@ -0,0 +1,87 @@
+"""Sharding of whole-dump crash sweeps for parallel fan-out."""
+
+import re
+from typing import Callable, Dict, List, Tuple
+
+
+def parse_cpu_count(sys_output: str) -> int:
+    """Number of CPUs reported by ``sys`` (0 if not found)."""
+    match = re.search(r"^\s*CPUS:\s*(\d+)", sys_output, re.MULTILINE)
+    return int(match.group(1)) if match else 0
+
+
+def parse_pids(ps_output: str) -> List[int]:
+    """Distinct PIDs listed by ``ps``, in order."""
+    pids = []
+    seen = set()
+    for line in ps_output.splitlines():
+        fields = line.lstrip(">").split()
+        if not fields or not fields[0].isdigit():
+            continue
+        pid = int(fields[0])
+        if pid not in seen:
+            seen.add(pid)
+            pids.append(pid)
+    return pids
+
+
+def parse_slab_caches(kmem_output: str) -> List[str]:
+    """Slab cache names listed by ``kmem -s``, in order."""
+    caches = []
+    for line in kmem_output.splitlines():
+        fields = line.split()
+        # Data lines start with the kmem_cache address; the name is last
+        if len(fields) >= 2 and re.fullmatch(r"[0-9a-f]{8,16}", fields[0]):
+            caches.append(fields[-1])
+    return caches
+
+
+def _split(items: list, shards: int) -> List[list]:
+    """Split items into at most ``shards`` contiguous, similarly sized groups."""
+    shards = max(1, min(shards, len(items)))
+    size, extra = divmod(len(items), shards)
+    groups = []
+    start = 0
+    for index in range(shards):
+        end = start + size + (1 if index < extra else 0)
+        groups.append(items[start:end])
+        start = end
+    return [group for group in groups if group]
+
+
+def _bt_per_cpu(probe_output: str, shards: int) -> List[str]:
+    return [f"bt -c {cpu}" for cpu in range(parse_cpu_count(probe_output))]
+
+
+def _bt_per_pid(probe_output: str, shards: int) -> List[str]:
+    return ["bt " + " ".join(str(pid) for pid in group) for group in _split(parse_pids(probe_output), shards)]
+
+
+def _kmem_per_slab(probe_output: str, shards: int) -> List[str]:
+    return [f"kmem -S {cache}" for cache in parse_slab_caches(probe_output)]
+
+
+# Preset name -> (probe command, planner turning its output into shard commands)
+FANOUT_PRESETS: Dict[str, Tuple[str, Callable[[str, int], List[str]]]] = {
+    "bt_per_cpu": ("sys", _bt_per_cpu),
+    "bt_per_pid": ("ps", _bt_per_pid),
+    "kmem_per_slab": ("kmem -s", _kmem_per_slab),
+}
+
+
+def plan_fanout(preset: str, probe_output: str, shards: int) -> List[str]:
+    """Turn a preset's probe output into the commands to fan out.
+
+    Args:
+        preset: Name from FANOUT_PRESETS
+        probe_output: Output of the preset's probe command
+        shards: Number of commands to aim for where the split is free
+            (PID ranges); per-CPU and per-slab presets use one command each
+
+    Returns:
+        Commands whose outputs, concatenated in order, cover the sweep
+    """
+    if preset not in FANOUT_PRESETS:
+        raise ValueError(f"Unknown fan-out preset '{preset}' (available: {', '.join(FANOUT_PRESETS)})")
+    _, planner = FANOUT_PRESETS[preset]
+    return planner(probe_output, shards)
@@ -0,0 +1,451 @@
+"""Server-side filtering, storage and paginated retrieval of crash output."""
+
+import asyncio
+import logging
+import mmap
+import re
+import secrets
+import shutil
+import tempfile
+import threading
+import time
+from array import array
+from collections import deque
+from pathlib import Path
+from typing import Deque, Dict, List, Optional, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+# A line offset is recorded every this many lines; lines in between are
+# found by scanning forward from the nearest checkpoint
+LINES_PER_CHECKPOINT = 1024
+# Once spilled, output is written to disk in batches of about this many characters
+SPILL_BATCH_CHARS = 256 * 1024
+
+
+class StoredOutput:
+    """One command's output spilled to a temp file and read back via mmap.
+
+    ``kind`` records what produced it ("crash" or "bpftrace"), so each tool
+    only pages through its own outputs.
+    """
+
+    def __init__(self, handle: str, path: Path, command: str, session_id: Optional[str] = None,
+                 kind: str = "crash"):
+        self.handle = handle
+        self.path = path
+        self.command = command
+        self.session_id = session_id
+        self.kind = kind
+        self.size = 0
+        self.lines = 0
+        self.created = time.time()
+        self.last_access = self.created
+        self.complete = False
+        self._newlines = 0
+        self._last_byte = b""
+        self._checkpoints = array("Q", [0])
+        self._file = open(path, "wb")
+        self._mmap: Optional[mmap.mmap] = None
+        self._lock = threading.Lock()
+
+    def write(self, text: str):
+        """Append output, indexing line starts as it goes."""
+        data = text.encode("utf-8")
+        if not data:
+            return
+        pos = 0
+        while True:
+            needed = LINES_PER_CHECKPOINT - (self._newlines % LINES_PER_CHECKPOINT)
+            if data.count(b"\n", pos) < needed:
+                self._newlines += data.count(b"\n", pos)
+                break
+            for _ in range(needed):
+                pos = data.index(b"\n", pos) + 1
+            self._newlines += needed
+            self._checkpoints.append(self.size + pos)
+        self._file.write(data)
+        self.size += len(data)
+        self._last_byte = data[-1:]
+
+    def finish(self):
+        """Close the writer; the output becomes readable."""
+        self._file.close()
+        self.lines = self._newlines + (1 if self._last_byte not in (b"", b"\n") else 0)
+        self.complete = True
+
+    def _map(self) -> Optional[mmap.mmap]:
+        if self.size == 0:
+            return None
+        if self._mmap is None:
+            with open(self.path, "rb") as f:
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.last_access = time.time()
+        return self._mmap
+
+    def _line_offset(self, mm: mmap.mmap, line: int) -> int:
+        """Byte offset where 0-based ``line`` starts (size if past the end)."""
+        index = min(line // LINES_PER_CHECKPOINT, len(self._checkpoints) - 1)
+        offset = self._checkpoints[index]
+        for _ in range(line - index * LINES_PER_CHECKPOINT):
+            newline = mm.find(b"\n", offset)
+            if newline < 0:
+                return self.size
+            offset = newline + 1
+        return offset
+
+    def read_page(self, offset: int, length: int) -> Tuple[str, Optional[int]]:
+        """Read about ``length`` bytes from ``offset``, ending on a line boundary.
+
+        Returns:
+            Tuple of (text, next offset or None at the end)
+        """
+        with self._lock:
+            mm = self._map()
+            if mm is None or offset >= self.size:
+                return "", None
+            end = min(self.size, offset + max(1, length))
+            if end < self.size:
+                newline = mm.rfind(b"\n", offset, end)
+                if newline >= 0:
+                    end = newline + 1
+            text = mm[offset:end].decode("utf-8", errors="ignore")
+            return text, (end if end < self.size else None)
+
+    def read_lines(self, start: int, end: int) -> Tuple[str, Optional[int]]:
+        """Read 1-based lines ``start``..``end`` inclusive.
+
+        Returns:
+            Tuple of (text, next line number or None at the end)
+        """
+        with self._lock:
+            mm = self._map()
+            if mm is None or start > self.lines:
+                return "", None
+            begin = self._line_offset(mm, max(start, 1) - 1)
+            stop = self._line_offset(mm, end)
+            text = mm[begin:stop].decode("utf-8", errors="ignore")
+            return text, (end + 1 if end < self.lines else None)
+
+    def grep(self, pattern: str, start: int = 1, max_matches: int = 100) -> Tuple[List[Tuple[int, str]], Optional[int]]:
+        """Find lines matching a regex, starting at 1-based line ``start``.
+
+        Returns:
+            Tuple of ([(line number, line)], line to resume from or None)
+        """
+        regex = re.compile(pattern)
+        matches = []
+        with self._lock:
+            mm = self._map()
+            if mm is None:
+                return matches, None
+            offset = self._line_offset(mm, max(start, 1) - 1)
+            line_no = max(start, 1)
+            while offset < self.size:
+                newline = mm.find(b"\n", offset)
+                stop = self.size if newline < 0 else newline
+                line = mm[offset:stop].decode("utf-8", errors="ignore")
+                if regex.search(line):
+                    matches.append((line_no, line))
+                    if len(matches) >= max_matches:
+                        return matches, (line_no + 1 if stop < self.size else None)
+                offset = stop + 1
+                line_no += 1
+        return matches, None
+
+    def close(self):
+        """Release the mapping and delete the file."""
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+            if self._mmap is not None:
+                self._mmap.close()
+                self._mmap = None
+            try:
+                self.path.unlink()
+            except FileNotFoundError:
+                pass
+
+    def to_dict(self) -> dict:
+        """Describe the stored output."""
+        return {
+            "handle": self.handle,
+            "kind": self.kind,
+            "command": self.command,
+            "session_id": self.session_id,
+            "bytes": self.size,
+            "lines": self.lines,
+            "age_seconds": round(time.time() - self.created, 1)
+        }
+
+
+class CrashOutputStore:
+    """Keeps large crash outputs on disk so they can be read page by page.
+
+    Outputs are written to files under ``base_dir`` (a private temp
+    directory by default) and mapped into memory only for the pages being
+    read, so RSS stays flat regardless of output size.  Outputs not read for
+    ``ttl`` seconds are deleted, and the oldest ones go first when the store
+    exceeds ``max_bytes``.
+    """
+
+    def __init__(self, base_dir: Optional[str] = None, ttl: int = 1800,
+                 max_bytes: int = 4 * 1024 * 1024 * 1024):
+        if base_dir:
+            self.base_dir = Path(base_dir)
+            self.base_dir.mkdir(parents=True, exist_ok=True)
+            self._owns_dir = False
+        else:
+            self.base_dir = Path(tempfile.mkdtemp(prefix="dynamic-mcp-output-"))
+            self._owns_dir = True
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.outputs: Dict[str, StoredOutput] = {}
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+    def create(self, command: str, session_id: Optional[str] = None, kind: str = "crash") -> StoredOutput:
+        """Open a new output for writing."""
+        self.evict()
+        handle = f"out_{secrets.token_hex(8)}"
+        output = StoredOutput(handle, self.base_dir / f"{handle}.txt", command, session_id, kind)
+        with self._lock:
+            self.outputs[handle] = output
+        return output
+
+    def get(self, handle: str) -> Optional[StoredOutput]:
+        """Look up a completed output by handle."""
+        self.evict()
+        output = self.outputs.get(handle)
+        if output is None or not output.complete:
+            return None
+        output.last_access = time.time()
+        return output
+
+    def discard(self, handle: str):
+        """Delete an output."""
+        with self._lock:
+            output = self.outputs.pop(handle, None)
+        if output:
+            output.close()
+
+    def total_bytes(self) -> int:
+        """Bytes held on disk by all outputs."""
+        return sum(output.size for output in list(self.outputs.values()))
+
+    def evict(self):
+        """Drop expired outputs, then the least recently read over the size limit."""
+        now = time.time()
+        with self._lock:
+            done = [o for o in self.outputs.values() if o.complete]
+            expired = [o for o in done if self.ttl and now - o.last_access > self.ttl]
+            remaining = sorted((o for o in done if o not in expired), key=lambda o: o.last_access)
+            total = self.total_bytes() - sum(o.size for o in expired)
+            while remaining and total > self.max_bytes:
+                output = remaining.pop(0)
+                expired.append(output)
+                total -= output.size
+            for output in expired:
+                del self.outputs[output.handle]
+        for output in expired:
+            logger.info(f"Evicting stored crash output {output.handle} ({output.size:,} bytes)")
+            output.close()
+            self.evictions += 1
+
+    def close(self):
+        """Delete every stored output."""
+        for handle in list(self.outputs):
+            self.discard(handle)
+        if self._owns_dir:
+            shutil.rmtree(self.base_dir, ignore_errors=True)
+
+    def get_stats(self) -> dict:
+        """Occupancy of the store."""
+        return {
+            "outputs": len(self.outputs),
+            "bytes": self.total_bytes(),
+            "max_bytes": self.max_bytes,
+            "ttl": self.ttl,
+            "evictions": self.evictions,
+            "directory": str(self.base_dir)
+        }
+
+
+class OutputCollector:
+    """Collects streamed output, spilling to the store past one page.
+
+    Small outputs stay in memory and are returned inline as before; larger
+    ones are written to a StoredOutput and only the first page is kept.
+    Spilled chunks are buffered and written in batches; from the event loop
+    use ``write_async`` and ``finish_async``, which do the disk I/O in a
+    worker thread.
+    """
+
+    def __init__(self, store: CrashOutputStore, command: str, page_bytes: int,
+                 session_id: Optional[str] = None, kind: str = "crash"):
+        self.store = store
+        self.command = command
+        self.page_bytes = page_bytes
+        self.session_id = session_id
+        self.kind = kind
+        self.output: Optional[StoredOutput] = None
+        self._buffer: List[str] = []
+        self._buffered = 0
+        self._flushing: Optional[asyncio.Future] = None
+
+    def _needs_flush(self) -> bool:
+        limit = self.page_bytes if self.output is None else SPILL_BATCH_CHARS
+        return self._buffered > limit
+
+    def _flush(self):
+        """Write the buffered chunks out, creating the stored output on first use."""
+        if self.output is None:
+            self.output = self.store.create(self.command, self.session_id, self.kind)
+        chunks, self._buffer, self._buffered = self._buffer, [], 0
+        self.output.write("".join(chunks))
+
+    def write(self, text: str):
+        """Add a chunk of output."""
+        self._buffer.append(text)
+        self._buffered += len(text)
+        if self._needs_flush():
+            self._flush()
+
+    async def write_async(self, text: str):
+        """Add a chunk of output without blocking the event loop on disk writes."""
+        self._buffer.append(text)
+        self._buffered += len(text)
+        if self._needs_flush():
+            self._flushing = asyncio.ensure_future(asyncio.to_thread(self._flush))
+            # Shielded so a cancelled caller's abort() waits for the writer
+            await asyncio.shield(self._flushing)
+
+    def finish(self) -> Tuple[str, Optional[StoredOutput]]:
+        """Finish collecting.
+
+        Returns:
+            Tuple of (whole output, None) for small outputs, or
+            (first page, StoredOutput) once the output was spilled
+        """
+        if self.output is None:
+            return "".join(self._buffer), None
+        self._flush()
+        self.output.finish()
+        page, _ = self.output.read_page(0, self.page_bytes)
+        return page, self.output
+
+    async def finish_async(self) -> Tuple[str, Optional[StoredOutput]]:
+        """Finish collecting, flushing and mapping a spilled output in a worker thread."""
+        if self.output is None:
+            return self.finish()
+        return await asyncio.to_thread(self.finish)
+
+    def _abort_after_flush(self, future: asyncio.Future):
+        if not future.cancelled() and future.exception():
+            logger.warning(f"Writing output of {self.command} failed: {future.exception()}")
+        self.abort()
+
+    def abort(self):
+        """Throw away a partially written output."""
+        if self._flushing is not None and not self._flushing.done():
+            self._flushing.add_done_callback(self._abort_after_flush)
+            return
+        self._buffer = []
+        self._buffered = 0
+        if self.output is not None:
+            self.output.finish()
+            self.store.discard(self.output.handle)
+            self.output = None
+
+
+class OutputFilter:
+    """Line filter applied to output as it is read.
+
+    Lines are matched against ``pattern`` (a regex) as chunks arrive, then
+    limited to the first ``head`` or last ``tail`` matching lines and to
+    ``max_bytes`` of text.  Only kept lines are ever joined, and ``tail``
+    holds at most ``tail`` lines, so memory does not grow with the output.
+    """
+
+    def __init__(self, pattern: Optional[str] = None, head: Optional[int] = None,
+                 tail: Optional[int] = None, max_bytes: Optional[int] = None):
+        if head is not None and tail is not None:
+            raise ValueError("head and tail cannot be combined")
+        for name, value in (("head", head), ("tail", tail), ("max_bytes", max_bytes)):
+            if value is not None and value < 0:
+                raise ValueError(f"{name} must not be negative")
+        self.regex = re.compile(pattern) if pattern else None
+        self.head = head
+        self.tail = tail
+        self.max_bytes = max_bytes
+        self.lines_read = 0
+        self.lines_matched = 0
+        self.bytes_kept = 0
+        self.truncated = False
+        self._partial = ""
+        self._tail_lines: Deque[str] = deque(maxlen=tail) if tail is not None else deque()
+
+    @property
+    def done(self) -> bool:
+        """True once no further output can be kept."""
+        if self.truncated:
+            return True
+        return self.head is not None and self.lines_matched >= self.head
+
+    def feed(self, chunk: str) -> str:
+        """Filter a chunk, returning the text to keep now."""
+        lines = (self._partial + chunk).split("\n")
+        self._partial = lines.pop()
+        return self._keep(lines)
+
+    def flush(self) -> str:
+        """Filter the last unterminated line and release tail lines."""
+        lines = [self._partial] if self._partial else []
+        self._partial = ""
+        kept = self._keep(lines)
+        if self.tail is not None:
+            lines = list(self._tail_lines)
+            self._tail_lines.clear()
+            kept += self._limit(lines)
+        return kept
+
+    def _keep(self, lines: List[str]) -> str:
+        matched = []
+        for line in lines:
+            if self.done:
+                break
+            self.lines_read += 1
+            if self.regex and not self.regex.search(line):
+                continue
+            self.lines_matched += 1
+            matched.append(line)
+        if self.tail is not None:
+            self._tail_lines.extend(matched)
+            return ""
+        return self._limit(matched)
+
+    def _limit(self, lines: List[str]) -> str:
+        """Join lines, stopping at the byte budget."""
+        kept = []
+        for line in lines:
+            size = len(line.encode("utf-8")) + 1
+            if self.max_bytes is not None and self.bytes_kept + size > self.max_bytes:
+                self.truncated = True
+                break
+            kept.append(line + "\n")
+            self.bytes_kept += size
+        return "".join(kept)
+
+    def describe(self) -> str:
+        """One-line account of what the filter dropped."""
+        parts = []
+        if self.regex:
+            parts.append(f"{self.lines_matched:,} of {self.lines_read:,} lines matched")
+        if self.head is not None and self.lines_matched >= self.head:
+            parts.append(f"stopped after {self.head} lines")
+        if self.tail is not None and self.lines_matched > self.tail:
+            parts.append(f"last {self.tail} lines kept")
+        if self.truncated:
+            parts.append(f"truncated at {self.max_bytes:,} bytes")
+        return f"[Filtered: {'; '.join(parts)}]" if parts else ""
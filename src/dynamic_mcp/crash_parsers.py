@@ -0,0 +1,275 @@
+"""Parsers turning crash command output into structured data.
+
+Each parser consumes output line by line, so it can be fed streamed chunks
+as crash produces them and never needs the whole text at once.  Parsers
+are registered per command; ``get_parser`` returns a fresh parser for a
+command line, or None when the command (or one of its flags) changes the
+output format to something no parser understands.
+"""
+
+import re
+from typing import Any, Dict, List, Optional, Set, Type
+
+from dynamic_mcp.crash_cache import normalize_command
+
+
+PARSERS: Dict[str, Type["CrashOutputParser"]] = {}
+
+
+def register_parser(command: str):
+    """Class decorator registering a parser for a command (e.g. "ps", "kmem -i")."""
+    def decorator(cls):
+        cls.command = command
+        PARSERS[command] = cls
+        return cls
+    return decorator
+
+
+def get_parser(command: str) -> Optional["CrashOutputParser"]:
+    """Create the parser for a command line, if its output format is supported."""
+    words = normalize_command(command).split(" ")
+    for length in (2, 1):
+        cls = PARSERS.get(" ".join(words[:length]))
+        if cls is None:
+            continue
+        flags = {word for word in words[length:] if word.startswith("-")}
+        if flags <= cls.allowed_flags:
+            return cls()
+        return None
+    return None
+
+
+class CrashOutputParser:
+    """Base class for incremental parsers of one command's output."""
+
+    command = ""
+    # Flags that keep the output in the format the parser understands
+    allowed_flags: Set[str] = set()
+
+    def __init__(self):
+        self._partial = ""
+
+    def feed_text(self, chunk: str):
+        """Feed a chunk of output, which may end mid-line."""
+        lines = (self._partial + chunk).split("\n")
+        self._partial = lines.pop()
+        for line in lines:
+            self.feed(line)
+
+    def feed(self, line: str):
+        """Feed one complete line."""
+        raise NotImplementedError
+
+    def result(self) -> Dict[str, Any]:
+        """Finish parsing and return the structured output."""
+        if self._partial:
+            partial, self._partial = self._partial, ""
+            self.feed(partial)
+        return self._result()
+
+    def _result(self) -> Dict[str, Any]:
+        raise NotImplementedError
+
+
+def _number(text: str):
+    """Convert a numeric field, leaving anything else as text."""
+    try:
+        return int(text)
+    except ValueError:
+        try:
+            return float(text)
+        except ValueError:
+            return text
+
+
+def _key(label: str) -> str:
+    """"LOAD AVERAGE" -> "load_average"."""
+    return re.sub(r"[^a-z0-9]+", "_", label.strip().lower()).strip("_")
+
+
+@register_parser("ps")
+class PsParser(CrashOutputParser):
+    """Task table from ``ps``, one row per task."""
+
+    allowed_flags = {"-k", "-u", "-G", "-y"}
+    COLUMNS = ["pid", "ppid", "cpu", "task", "state", "mem_pct", "vsz", "rss", "comm", "active"]
+
+    def __init__(self):
+        super().__init__()
+        self.rows: List[list] = []
+
+    def feed(self, line: str):
+        active = line.startswith(">")
+        fields = line.lstrip(">").split(None, 8)
+        if len(fields) < 9 or not fields[0].isdigit():
+            return
+        pid, ppid, cpu, task, state, mem, vsz, rss, comm = fields
+        self.rows.append([
+            int(pid), _number(ppid), _number(cpu), task, state,
+            _number(mem), _number(vsz), _number(rss), comm.strip(), active
+        ])
+
+    def _result(self) -> Dict[str, Any]:
+        return {"columns": self.COLUMNS, "tasks": self.rows, "count": len(self.rows)}
+
+
+@register_parser("bt")
+class BtParser(CrashOutputParser):
+    """Backtraces from ``bt``, one entry per task with its frames."""
+
+    allowed_flags = {"-a", "-c", "-s", "-x", "-g", "-p"}
+    TASK_RE = re.compile(
+        r'^PID:\s*(\d+)\s+TASK:\s*([0-9a-f]+)\s+CPU:\s*(\d+)\s+COMMAND:\s*"(.*)"'
+    )
+    FRAME_RE = re.compile(
+        r'^\s*#(\d+)\s+\[([0-9a-f]+)\]\s+(\S+)\s+at\s+([0-9a-f]+)(?:\s+\[(\S+)\])?'
+    )
+
+    def __init__(self):
+        super().__init__()
+        self.tasks: List[dict] = []
+
+    def feed(self, line: str):
+        match = self.FRAME_RE.match(line)
+        if match:
+            if not self.tasks:
+                self.tasks.append({"pid": None, "task": None, "cpu": None, "command": None, "frames": []})
+            level, sp, function, address, module = match.groups()
+            frame = [int(level), function, address, sp]
+            if module:
+                frame.append(module)
+            self.tasks[-1]["frames"].append(frame)
+            return
+        match = self.TASK_RE.match(line)
+        if match:
+            pid, task, cpu, command = match.groups()
+            self.tasks.append({"pid": int(pid), "task": task, "cpu": int(cpu), "command": command, "frames": []})
+        elif line.startswith("bt: "):
+            self.tasks.append({"error": line[4:].strip()})
+
+    def _result(self) -> Dict[str, Any]:
+        return {
+            "frame_columns": ["level", "function", "address", "stack_pointer", "module"],
+            "tasks": self.tasks
+        }
+
+
+@register_parser("kmem -i")
+class KmemInfoParser(CrashOutputParser):
+    """Memory summary from ``kmem -i``."""
+
+    LINE_RE = re.compile(
+        r'^\s*([A-Z][A-Z ]*?[A-Z])\s+(\d+)\s+([\d.]+\s*[KMGT]?B)\s*(.*)$'
+    )
+
+    def __init__(self):
+        super().__init__()
+        self.summary: Dict[str, dict] = {}
+
+    def feed(self, line: str):
+        match = self.LINE_RE.match(line)
+        if not match:
+            return
+        label, pages, total, percentage = match.groups()
+        entry = {"pages": int(pages), "total": total}
+        percent = re.match(r"(\d+)%", percentage.strip())
+        if percent:
+            entry["percent"] = int(percent.group(1))
+        self.summary[_key(label)] = entry
+
+    def _result(self) -> Dict[str, Any]:
+        return self.summary
+
+
+@register_parser("mod")
+class ModParser(CrashOutputParser):
+    """Module list from ``mod``."""
+
+    COLUMNS = ["name", "module", "size", "object_file"]
+
+    def __init__(self):
+        super().__init__()
+        self.rows: List[list] = []
+
+    def feed(self, line: str):
+        fields = line.split()
+        if len(fields) < 3 or not re.fullmatch(r"[0-9a-f]{8,16}", fields[0]):
+            return
+        address, name, rest = fields[0], fields[1], fields[2:]
+        # Newer crash prints TEXT_BASE before SIZE
+        if len(rest) > 1 and re.fullmatch(r"[0-9a-f]{8,16}", rest[0]) and rest[1].isdigit():
+            rest = rest[1:]
+        size = _number(rest[0])
+        self.rows.append([name, address, size, " ".join(rest[1:])])
+
+    def _result(self) -> Dict[str, Any]:
+        return {"columns": self.COLUMNS, "modules": self.rows, "count": len(self.rows)}
+
+
+@register_parser("sys")
+class SysParser(CrashOutputParser):
+    """System summary from ``sys`` as a key/value mapping."""
+
+    LINE_RE = re.compile(r'^\s*([A-Z][A-Z ]*):\s?(.*)$')
+
+    def __init__(self):
+        super().__init__()
+        self.fields: Dict[str, Any] = {}
+        self._last: Optional[str] = None
+
+    def feed(self, line: str):
+        match = self.LINE_RE.match(line)
+        if match:
+            key = _key(match.group(1))
+            value = match.group(2).strip()
+            if key == "panic":
+                value = value.strip('"')
+            elif key in ("cpus", "tasks"):
+                value = _number(value.split()[0]) if value else value
+            self.fields[key] = value
+            self._last = key
+        elif line.strip() and self._last:
+            # Continuation such as "[PARTIAL DUMP]" under DUMPFILE
+            self.fields[self._last] = f"{self.fields[self._last]} {line.strip()}"
+
+    def _result(self) -> Dict[str, Any]:
+        return self.fields
+
+
+@register_parser("log")
+class LogParser(CrashOutputParser):
+    """Kernel log from ``log`` as (timestamp, level, message) entries.
+
+    Lines that look like the start of an oops or panic are also collected
+    under ``highlights`` with their entry index.
+    """
+
+    allowed_flags = {"-m", "-T", "-t", "-a"}
+    LINE_RE = re.compile(r'^(?:<(\d)>)?\s*(?:\[\s*([^\]]+)\])?\s?(.*)$')
+    HIGHLIGHT_RE = re.compile(
+        r'Kernel panic|BUG:|Oops|general protection fault|Call Trace:|RIP:|'
+        r'watchdog:|hung_task|Out of memory|segfault|WARNING:'
+    )
+
+    def __init__(self):
+        super().__init__()
+        self.entries: List[list] = []
+        self.highlights: List[list] = []
+
+    def feed(self, line: str):
+        if not line:
+            return
+        level, timestamp, message = self.LINE_RE.match(line).groups()
+        if timestamp is not None:
+            timestamp = _number(timestamp.strip())
+        self.entries.append([timestamp, int(level) if level else None, message])
+        if self.HIGHLIGHT_RE.search(message):
+            self.highlights.append([len(self.entries) - 1, message])
+
+    def _result(self) -> Dict[str, Any]:
+        return {
+            "columns": ["timestamp", "level", "message"],
+            "entries": self.entries,
+            "count": len(self.entries),
+            "highlights": self.highlights
+        }
@@ -0,0 +1,141 @@
+"""Background pre-warming of crash sessions for newly discovered dumps."""
+
+import asyncio
+import logging
+from pathlib import Path
+from typing import Dict, Optional, Set
+
+from dynamic_mcp.crash_decompress import CrashDumpDecompressor
+from dynamic_mcp.crash_discovery import CrashDump, CrashDumpDiscovery
+from dynamic_mcp.crash_session import CrashSessionManager
+from dynamic_mcp.kernel_detection import KernelDetection
+
+
+logger = logging.getLogger(__name__)
+
+# kdump artifacts that match the dump patterns but are not dumps
+PREWARM_SKIP_PATTERNS = ["vmcore-dmesg*", "*.txt", "*-incomplete"]
+
+
+class CrashSessionPrewarmer:
+    """Starts crash sessions for new dumps before anyone asks for them.
+
+    The prewarmer rescans the crash dump directory periodically.  A dump is
+    only pre-warmed once its size stayed the same across two scans, so a
+    vmcore that kdump is still writing is not opened half-finished.  Dumps
+    that already exist when the prewarmer starts are not pre-warmed, except
+    the most recent one, which is what the first query will usually target.
+    """
+
+    def __init__(
+        self,
+        discovery: CrashDumpDiscovery,
+        session_manager: CrashSessionManager,
+        kernel_detection: KernelDetection,
+        decompressor: Optional[CrashDumpDecompressor] = None,
+        max_concurrent: int = 1,
+        scan_interval: int = 30,
+        timeout: int = 1024,
+        max_dumps: int = 10
+    ):
+        self.discovery = discovery
+        self.session_manager = session_manager
+        # Shared with the server, so its candidate cache and downloads are too
+        self.kernel_detection = kernel_detection
+        self.decompressor = decompressor
+        self.scan_interval = scan_interval
+        self.timeout = timeout
+        self.max_dumps = max_dumps
+        self._semaphore = asyncio.Semaphore(max(1, max_concurrent))
+        self._seen: Set[Path] = set()
+        # Path -> size seen on the previous scan, for dumps still settling
+        self._pending: Dict[Path, int] = {}
+        self._tasks: Set[asyncio.Task] = set()
+        self._initialized = False
+
+    def _should_prewarm(self, dump: CrashDump) -> bool:
+        """Skip kdump side files and anything that is not a valid dump."""
+        if any(Path(dump.name).match(pattern) for pattern in PREWARM_SKIP_PATTERNS):
+            return False
+        return self.discovery.is_valid_crash_dump(dump)
+
+    async def scan_once(self):
+        """Look for new dumps and schedule pre-warming for settled ones."""
+        dumps = await asyncio.to_thread(self.discovery.find_crash_dumps, self.max_dumps)
+        dumps = [dump for dump in dumps if self._should_prewarm(dump)]
+
+        if not self._initialized:
+            self._initialized = True
+            self._seen.update(dump.path for dump in dumps)
+            if dumps:
+                self.schedule(dumps[0])
+            return
+
+        for dump in dumps:
+            if dump.path in self._seen:
+                continue
+            if self._pending.get(dump.path) == dump.size:
+                # Size is stable since the last scan: kdump is done writing
+                del self._pending[dump.path]
+                self._seen.add(dump.path)
+                self.schedule(dump)
+            else:
+                self._pending[dump.path] = dump.size
+
+    def dump_completed(self, dump: CrashDump):
+        """Pre-warm a dump the watcher saw finish, without waiting for a scan."""
+        if dump.path in self._seen or not self._should_prewarm(dump):
+            return
+        self._pending.pop(dump.path, None)
+        self._seen.add(dump.path)
+        self.schedule(dump)
+
+    def schedule(self, dump: CrashDump) -> asyncio.Task:
+        """Pre-warm a session for the dump in the background."""
+        task = asyncio.ensure_future(self.prewarm(dump))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def prewarm(self, dump: CrashDump) -> bool:
+        """Resolve the kernel for a dump and start its crash session."""
+        async with self._semaphore:
+            try:
+                session_dump = await self.decompressor.prepare(dump) if self.decompressor else dump
+                metadata = await asyncio.to_thread(self.discovery.get_dump_metadata, dump, session_dump)
+                kernel = await asyncio.to_thread(self.kernel_detection.find_matching_kernel, dump, metadata)
+                kernel = kernel or await self.kernel_detection.fetch_kernel(metadata)
+                if not kernel:
+                    logger.warning(f"Not pre-warming {dump.path}: no matching kernel found")
+                    return False
+
+                logger.info(f"Pre-warming crash session for {dump.path} with {kernel.path}")
+                ready = await self.session_manager.prewarm_session_async(session_dump, kernel, self.timeout)
+                if not ready:
+                    logger.warning(f"Pre-warming crash session for {dump.path} failed")
+                return ready
+            except Exception as e:
+                logger.error(f"Error pre-warming crash session for {dump.path}: {e}")
+                return False
+
+    async def run(self):
+        """Rescan the dump directory until cancelled."""
+        logger.info(f"Crash session pre-warming enabled (scan interval: {self.scan_interval}s)")
+        try:
+            while True:
+                try:
+                    await self.scan_once()
+                except Exception as e:
+                    logger.error(f"Error scanning for crash dumps to pre-warm: {e}")
+                await asyncio.sleep(self.scan_interval)
+        finally:
+            for task in list(self._tasks):
+                task.cancel()
+
+    def get_stats(self) -> dict:
+        """Pre-warm progress, merged into get_crash_info."""
+        return {
+            "in_progress": len(self._tasks),
+            "settling": len(self._pending),
+            "scan_interval": self.scan_interval
+        }
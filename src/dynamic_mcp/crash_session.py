@@ -1,33 +1,263 @@
 """Crash session management."""
 
+import asyncio
+import codecs
+import itertools
 import logging
 import pexpect
+import psutil
 import subprocess
+import threading
 import time
-from typing import Optional, Tuple
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from dynamic_mcp.crash_cache import CrashResultCache, is_stateful_command, normalize_command
+from dynamic_mcp.crash_snapshot import CrashSessionSnapshots
 
 
 logger = logging.getLogger(__name__)
 
+# Disambiguates sessions started within the same second
+_session_counter = itertools.count(1)
+
+CRASH_PROMPT = b"crash>"
+# Bytes held back from each streamed chunk so a prompt split across two
+# reads is still recognized
+_PROMPT_HOLDBACK = len(CRASH_PROMPT) + 2
+_STREAM_END = object()
+
+
+class CrashCommandStream:
+    """Output of one crash command, delivered in chunks as it is read.
+
+    Iterate with ``async for`` to receive text chunks.  Chunks pass through a
+    bounded queue: when the consumer falls behind, the session worker stops
+    reading the pty and crash blocks on its output, so memory stays bounded
+    by ``max_pending_chunks * chunk_size`` whatever the output size.
+    ``return_code`` and ``error`` are set once the iteration is finished.
+    """
+
+    def __init__(self, command: str, chunk_size: int = 64 * 1024, max_pending_chunks: int = 8,
+                 capture_limit: int = 0):
+        self.command = command
+        self.chunk_size = chunk_size
+        self.return_code: Optional[int] = None
+        self.error = ""
+        self.bytes_read = 0
+        self.started = time.monotonic()
+        self.first_byte_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.cancelled = False
+        # Output kept for the result cache while it fits in capture_limit bytes
+        self.captured: Optional[List[str]] = [] if capture_limit > 0 else None
+        self._capture_limit = capture_limit
+        self._captured_bytes = 0
+        self._on_finish = []
+        self._max_pending_chunks = max_pending_chunks
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        # Task feeding a from_text stream, cancelled if the consumer stops early
+        self._feeder: Optional[asyncio.Task] = None
+
+    @classmethod
+    def from_text(cls, command: str, text: str, chunk_size: int = 64 * 1024,
+                  max_pending_chunks: int = 8) -> "CrashCommandStream":
+        """Stream already available output (e.g. a cache hit) in chunks."""
+        stream = cls(command, chunk_size, max_pending_chunks)
+        stream._bind(asyncio.get_running_loop())
+
+        async def feed():
+            stream.first_byte_at = time.monotonic()
+            for start in range(0, len(text), chunk_size):
+                if stream.cancelled:
+                    break
+                chunk = text[start:start + chunk_size]
+                stream.bytes_read += len(chunk.encode("utf-8"))
+                await stream._queue.put(chunk)
+            stream.return_code = 0
+            stream.finished_at = time.monotonic()
+            await stream._queue.put(_STREAM_END)
+
+        stream._feeder = asyncio.ensure_future(feed())
+        return stream
+
+    def add_done_callback(self, callback):
+        """Call ``callback(stream)`` when the command finishes (from the worker thread)."""
+        self._on_finish.append(callback)
+
+    @property
+    def time_to_first_byte(self) -> Optional[float]:
+        """Seconds from sending the command to the first output byte."""
+        if self.first_byte_at is None:
+            return None
+        return self.first_byte_at - self.started
+
+    @property
+    def duration(self) -> Optional[float]:
+        """Seconds from sending the command to the prompt coming back."""
+        if self.finished_at is None:
+            return None
+        return self.finished_at - self.started
+
+    def _bind(self, loop: asyncio.AbstractEventLoop):
+        self._loop = loop
+        self._queue = asyncio.Queue(maxsize=self._max_pending_chunks)
+
+    def _emit(self, item):
+        """Hand a chunk to the consumer from the worker thread, waiting for room."""
+        if self.captured is not None and item is not _STREAM_END:
+            self._captured_bytes += len(item)
+            if self._captured_bytes > self._capture_limit:
+                self.captured = None
+            else:
+                self.captured.append(item)
+        if self.cancelled or self._loop is None:
+            return
+        future = asyncio.run_coroutine_threadsafe(self._queue.put(item), self._loop)
+        while True:
+            try:
+                future.result(timeout=0.5)
+                return
+            except FutureTimeoutError:
+                if self.cancelled or self._loop.is_closed():
+                    future.cancel()
+                    return
+
+    def _finish(self, return_code: int, error: str = ""):
+        self.return_code = return_code
+        self.error = error
+        self.finished_at = time.monotonic()
+        for callback in self._on_finish:
+            try:
+                callback(self)
+            except Exception as e:
+                logger.error(f"Error in stream callback: {e}")
+        self._emit(_STREAM_END)
+
+    async def __aiter__(self) -> AsyncIterator[str]:
+        try:
+            while True:
+                item = await self._queue.get()
+                if item is _STREAM_END:
+                    return
+                yield item
+        finally:
+            if self.return_code is None:
+                # Consumer gave up: the worker keeps reading to the prompt
+                # so the pty stays in sync, but discards the output
+                self.cancelled = True
+            if self._feeder is not None and not self._feeder.done():
+                self._feeder.cancel()
+
+    async def read_all(self) -> str:
+        """Collect the whole output (unbounded; for small outputs only)."""
+        return "".join([chunk async for chunk in self])
+
+    def to_dict(self) -> dict:
+        """Timing and size of the stream, for metrics."""
+        return {
+            "command": self.command,
+            "bytes": self.bytes_read,
+            "time_to_first_byte": round(self.time_to_first_byte, 4) if self.time_to_first_byte is not None else None,
+            "duration": round(self.duration, 4) if self.duration is not None else None,
+            "return_code": self.return_code
+        }
+
 
 class CrashSession:
-    """Represents an active crash analysis session."""
+    """Represents an active crash analysis session.
+
+    The pexpect calls are blocking, so every interaction with the crash
+    process from async code goes through a dedicated single worker thread
+    owned by the session.  This keeps the event loop responsive while a long
+    command runs and serializes access to the pty.
+    """
 
     def __init__(self, dump_path: str, kernel_path: str):
         self.dump_path = dump_path
         self.kernel_path = kernel_path
         self.process = None
-        self.session_id = f"crash_{int(time.time())}"
+        self.session_id = f"crash_{int(time.time())}_{next(_session_counter)}"
         self.active = False
+        self.created_at = time.time()
+        self.last_used = self.created_at
+        # Started ahead of time and not yet claimed by a caller
+        self.prewarmed = False
+        # Set once a stateful command (set, mod -s, ...) ran in the session
+        self.context_modified = False
+        # Extra crash processes on the same dump and kernel for fan-out
+        self.replicas: List["CrashSession"] = []
+        # Restored from a snapshot: crash is started by the first command
+        # the snapshot cannot answer
+        self.deferred = False
+        self._start_timeout = 180
+        # Normalized command -> output of cacheable commands, for the snapshot
+        self.results: "OrderedDict[str, str]" = OrderedDict()
+        self.results_bytes = 0
+        self.snapshot_dirty = False
+        self._executor: Optional[ThreadPoolExecutor] = None
         self.prompt_patterns = [
             r'crash> ',           # Standard prompt with space
             r'crash>',            # Prompt without space
             r'crash>\s*',         # Prompt with optional whitespace
         ]
 
+    @property
+    def key(self) -> Tuple[str, str]:
+        """Pool key identifying the (dump path, kernel path) pair."""
+        return (self.dump_path, self.kernel_path)
+
     def is_active(self) -> bool:
         """Check if the session is active."""
-        return self.active
+        return self.active or self.deferred
+
+    def defer(self, timeout: int = 180):
+        """Hold off starting crash until a command needs it."""
+        self.deferred = True
+        self._start_timeout = timeout
+
+    def _start_deferred(self) -> bool:
+        """Start crash for a restored session; True if it is running."""
+        if not self.deferred:
+            return True
+        self.deferred = False
+        logger.info(f"Starting crash for restored session {self.session_id}")
+        return self.start(self._start_timeout)
+
+    def touch(self):
+        """Record that the session was just used."""
+        self.last_used = time.time()
+
+    def idle_seconds(self) -> float:
+        """Seconds since the session last ran a command."""
+        return time.time() - self.last_used
+
+    def get_rss(self) -> int:
+        """Resident set size of the crash process and its replicas in bytes (0 if unknown)."""
+        rss = sum(replica.get_rss() for replica in self.replicas)
+        if not self.process or not self.process.pid:
+            return rss
+        try:
+            return rss + psutil.Process(self.process.pid).memory_info().rss
+        except (psutil.Error, OSError):
+            return rss
+
+    def to_dict(self) -> dict:
+        """Convert session state to dictionary."""
+        return {
+            "session_id": self.session_id,
+            "active": self.active,
+            "dump_path": self.dump_path,
+            "kernel_path": self.kernel_path,
+            "idle_seconds": round(self.idle_seconds(), 1),
+            "rss_mb": round(self.get_rss() / (1024 * 1024), 2),
+            "prewarmed": self.prewarmed,
+            "deferred": self.deferred,
+            "snapshot_results": len(self.results),
+            "replicas": len(self.replicas)
+        }
 
     def start(self, timeout: int = 180) -> bool:
         """Start the crash session.
@@ -84,9 +314,12 @@ class CrashSession:
     
     def execute_command(self, command: str, timeout: int = 120) -> Tuple[str, str, int]:
         """Execute a command in the crash session."""
+        if not self._start_deferred():
+            return "", "Failed to start crash process", 1
         if not self.is_active() or not self.process:
             return "", "Session not active", 1
 
+        self.touch()
         try:
             logger.info(f"Executing crash command: {command}")
 
@@ -100,7 +333,7 @@ class CrashSession:
 
             if index < len(self.prompt_patterns):
                 # Successfully got prompt back
-                output = self.process.before.decode('utf-8', errors='ignore')
+                output = self.process.before.decode('utf-8', errors='ignore').replace('\r\n', '\n')
                 # Clean up the output by removing the command echo
                 lines = output.split('\n')
                 if lines and lines[0].strip() == command.strip():
@@ -109,6 +342,18 @@ class CrashSession:
             elif index == len(self.prompt_patterns):
                 # Error pattern matched
                 error_msg = self.process.after.decode('utf-8', errors='ignore')
+                if not error_msg.rstrip().endswith('crash>'):
+                    # Consume the rest up to the prompt, or the next command
+                    # would match this one's prompt and return nothing
+                    try:
+                        self.process.expect(self.prompt_patterns, timeout=timeout)
+                        error_msg += self.process.before.decode('utf-8', errors='ignore')
+                    except (pexpect.TIMEOUT, pexpect.EOF):
+                        pass
+                error_msg = error_msg.rstrip()
+                if error_msg.endswith('crash>'):
+                    error_msg = error_msg[:-len('crash>')]
+                error_msg = error_msg.replace('\r\n', '\n').strip()
                 return "", f"Crash error: {error_msg}", 1
             elif index == len(self.prompt_patterns) + 1:
                 # Timeout
@@ -122,8 +367,154 @@ class CrashSession:
             logger.error(f"Error executing command '{command}': {e}")
             return "", str(e), 1
     
+    def _pump_output(self, stream: CrashCommandStream, timeout: int):
+        """Send a command and pass its output to the stream as it arrives.
+
+        Runs on the worker thread.  Output is read straight from the pty in
+        ``stream.chunk_size`` reads; the command echo is dropped, CRLF line
+        endings are normalized to LF, and the output is stripped like
+        execute_command's, so it matches a cached result.
+        """
+        if not self._start_deferred():
+            stream._finish(1, "Failed to start crash process")
+            return
+        if not self.is_active() or not self.process:
+            stream._finish(1, "Session not active")
+            return
+
+        self.touch()
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="ignore")
+        deadline = time.monotonic() + timeout
+        echo = stream.command.strip().encode()
+        echo_checked = False
+        first_line = b""
+        # Trailing whitespace is held back until more text follows it
+        held = ""
+        emitted = False
+
+        def emit(data: bytes, final: bool = False):
+            nonlocal first_line, held, emitted
+            text = decoder.decode(data, final=final).replace("\r\n", "\n")
+            if not text:
+                return
+            if stream.first_byte_at is None:
+                stream.first_byte_at = time.monotonic()
+                first_line = data.split(b"\n", 1)[0]
+            stream.bytes_read += len(data)
+            if not emitted:
+                text = text.lstrip()
+            text = held + text
+            body = text.rstrip()
+            held = text[len(body):]
+            if body:
+                emitted = True
+                stream._emit(body)
+
+        try:
+            logger.info(f"Streaming crash command: {stream.command}")
+            # Anything pexpect already buffered belongs before this command
+            self.process.buffer = b""
+            self.process.sendline(stream.command)
+            buf = b""
+            while True:
+                trimmed = buf.rstrip(b" ")
+                if trimmed.endswith(CRASH_PROMPT):
+                    buf = trimmed[:-len(CRASH_PROMPT)]
+                    if not echo_checked and buf.split(b"\n", 1)[0].strip() == echo:
+                        buf = buf.split(b"\n", 1)[1] if b"\n" in buf else b""
+                    emit(buf)
+                    break
+
+                if not echo_checked and b"\n" in buf:
+                    line, rest = buf.split(b"\n", 1)
+                    if line.strip() == echo:
+                        buf = rest
+                    echo_checked = True
+
+                if echo_checked and len(buf) > _PROMPT_HOLDBACK:
+                    cut = len(buf) - _PROMPT_HOLDBACK
+                    if buf[cut - 1:cut] == b"\r":
+                        # Keep CRLF pairs together for the line ending rewrite
+                        cut -= 1
+                    emit(buf[:cut])
+                    buf = buf[cut:]
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise pexpect.TIMEOUT("deadline reached")
+                buf += self.process.read_nonblocking(stream.chunk_size, timeout=remaining)
+
+            emit(b"", final=True)
+            if first_line.strip().startswith(b"crash: "):
+                stream._finish(1, f"Crash error: {first_line.strip().decode('utf-8', errors='ignore')}")
+            else:
+                stream._finish(0)
+
+        except pexpect.TIMEOUT:
+            stream._finish(1, f"Command '{stream.command}' timed out after {timeout} seconds")
+        except pexpect.EOF:
+            self.active = False
+            stream._finish(1, "Crash process terminated unexpectedly")
+        except Exception as e:
+            logger.error(f"Error streaming command '{stream.command}': {e}")
+            stream._finish(1, str(e))
+
+    def stream_command(self, command: str, timeout: int = 120, chunk_size: int = 64 * 1024,
+                       max_pending_chunks: int = 8, capture_limit: int = 0,
+                       on_finish=None) -> CrashCommandStream:
+        """Run a command and return a stream of its output chunks.
+
+        Must be called from the event loop.  The command is queued on the
+        session's worker thread like any other command.
+        """
+        stream = CrashCommandStream(command, chunk_size, max_pending_chunks, capture_limit)
+        if on_finish:
+            stream.add_done_callback(on_finish)
+        stream._bind(asyncio.get_running_loop())
+        self.touch()
+        future = self._run_in_worker(self._pump_output, stream, timeout)
+        future.add_done_callback(lambda _: self.touch())
+        return stream
+
+    def _run_in_worker(self, func, *args):
+        """Run a blocking session call on the session's worker thread."""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=1,
+                thread_name_prefix=f"crash-worker-{self.session_id}"
+            )
+        loop = asyncio.get_running_loop()
+        return loop.run_in_executor(self._executor, func, *args)
+
+    async def start_async(self, timeout: int = 180) -> bool:
+        """Start the crash session without blocking the event loop."""
+        return await self._run_in_worker(self.start, timeout)
+
+    async def execute_command_async(self, command: str, timeout: int = 120) -> Tuple[str, str, int]:
+        """Execute a command without blocking the event loop.
+
+        Commands are queued on the session's worker thread, so concurrent
+        callers run one after another on the pty.
+        """
+        self.touch()
+        try:
+            return await self._run_in_worker(self.execute_command, command, timeout)
+        finally:
+            # Long commands must not count as idle time
+            self.touch()
+
+    async def close_async(self):
+        """Close the session once any queued command has finished."""
+        replicas, self.replicas = self.replicas, []
+        await asyncio.gather(*(replica.close_async() for replica in replicas))
+        if self._executor is None:
+            self.close()
+            return
+        await self._run_in_worker(self.close)
+
     def close(self):
-        """Close the crash session."""
+        """Close the crash session and its replicas."""
+        self._close_replicas()
         if self.process:
             try:
                 # Try to quit gracefully first
@@ -145,19 +536,249 @@ class CrashSession:
             finally:
                 self.process = None
         self.active = False
+        self.deferred = False
+        if self._executor is not None:
+            # Don't wait: close() may itself be running on the worker thread
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def _close_replicas(self):
+        """Close the replicas, each on its own worker after its queued commands."""
+        replicas, self.replicas = self.replicas, []
+        pending = []
+        for replica in replicas:
+            executor = replica._executor
+            if executor is not None:
+                try:
+                    pending.append(executor.submit(replica.close))
+                    continue
+                except RuntimeError:
+                    # Worker already shut down
+                    pass
+            replica.close()
+        for future in pending:
+            try:
+                future.result()
+            except Exception as e:
+                logger.error(f"Error closing replica session: {e}")
 
 
 class CrashSessionManager:
-    """Manages crash analysis sessions."""
-    
-    def __init__(self):
-        self.active_session: Optional[CrashSession] = None
-    
+    """Manages a pool of crash analysis sessions.
+
+    Sessions are keyed by (dump path, kernel path) so switching between
+    dumps reuses an already-loaded crash process instead of paying the
+    full startup again.  The pool is bounded by ``max_sessions`` (least
+    recently used sessions are evicted first), ``idle_timeout`` seconds
+    without a command, and ``max_rss_mb`` of total crash process memory.
+    A value of 0 disables the idle and memory limits.
+
+    If a ``result_cache`` is given, output of deterministic commands is served
+    from it instead of round-tripping through the crash pty.  With
+    ``snapshots``, those results are also saved when a session leaves the
+    pool, and a later start on the same dump and kernel restores them into
+    a session whose crash process is only started on a snapshot miss.
+
+    The most recently started or targeted session is the "current" one and
+    is used when a caller does not name a session.
+    """
+
+    def __init__(self, max_sessions: int = 4, idle_timeout: int = 3600, max_rss_mb: int = 0,
+                 result_cache: Optional[CrashResultCache] = None,
+                 snapshots: Optional[CrashSessionSnapshots] = None):
+        self.max_sessions = max(1, max_sessions)
+        self.idle_timeout = idle_timeout
+        self.max_rss_mb = max_rss_mb
+        self.result_cache = result_cache
+        self.snapshots = snapshots
+        # Fan-out workers record results of the same session concurrently
+        self._results_lock = threading.Lock()
+        # Snapshots are written by one background thread, so removing a
+        # session from the event loop does not wait for the gzip
+        self._snapshot_writer: Optional[ThreadPoolExecutor] = None
+        self._pending_saves: Dict[Tuple[str, str], Future] = {}
+        self.sessions: "OrderedDict[Tuple[str, str], CrashSession]" = OrderedDict()
+        self._current_key: Optional[Tuple[str, str]] = None
+        # In-flight starts by key, so concurrent callers for the same dump
+        # share one crash process while different dumps start in parallel
+        self._starting: Dict[Tuple[str, str], asyncio.Task] = {}
+        self.stream_stats = {
+            "streams": 0,
+            "bytes": 0,
+            "last_time_to_first_byte": None,
+            "max_time_to_first_byte": None
+        }
+        self.stats = {
+            "cold_starts": 0,
+            "warm_hits": 0,
+            "prewarm_joins": 0,
+            "prewarmed": 0,
+            "prewarm_failures": 0,
+            "fanouts": 0,
+            "replicas_started": 0,
+            "restored": 0,
+            "snapshot_hits": 0
+        }
+
+    @property
+    def active_session(self) -> Optional[CrashSession]:
+        """The current session, if any."""
+        if self._current_key is None:
+            return None
+        return self.sessions.get(self._current_key)
+
+    def get_session(self, session_id: Optional[str] = None) -> Optional[CrashSession]:
+        """Get a session by id, or the current session if no id is given."""
+        if session_id is None:
+            return self.active_session
+        for session in self.sessions.values():
+            if session.session_id == session_id:
+                return session
+        return None
+
+    def _use(self, session: CrashSession):
+        """Mark a session as most recently used and make it current."""
+        self.sessions.move_to_end(session.key)
+        self._current_key = session.key
+        session.touch()
+
+    def _remove(self, session: CrashSession) -> Optional[Future]:
+        """Drop a session from the pool without closing it, saving its snapshot.
+
+        Returns:
+            The future of the snapshot save queued on the writer thread, if any
+        """
+        self.sessions.pop(session.key, None)
+        if self._current_key == session.key:
+            self._current_key = None
+        if not (self.snapshots and session.snapshot_dirty):
+            return None
+        with self._results_lock:
+            session.snapshot_dirty = False
+            results = dict(session.results)
+        if self._snapshot_writer is None:
+            self._snapshot_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="crash-snapshot")
+        future = self._snapshot_writer.submit(self.snapshots.save, session.dump_path, session.kernel_path, results)
+        self._pending_saves = {key: pending for key, pending in self._pending_saves.items() if not pending.done()}
+        self._pending_saves[session.key] = future
+        return future
+
+    def _load_snapshot(self, session: CrashSession) -> bool:
+        """Fill a session's results from its pair's snapshot, if one was saved."""
+        pending = self._pending_saves.get(session.key)
+        if pending is not None:
+            # The pair was just removed: read what it saved
+            pending.result()
+        results = self.snapshots.load(session.dump_path, session.kernel_path) if self.snapshots else None
+        if results is None:
+            return False
+        for command, output in results.items():
+            self._remember(session, command, output)
+        session.snapshot_dirty = False
+        return True
+
+    def _restore(self, crash_dump, kernel_file, timeout: int) -> Optional[CrashSession]:
+        """A deferred session for the pair, if a snapshot of it was saved."""
+        session = CrashSession(str(crash_dump.path), str(kernel_file.path))
+        if not self._load_snapshot(session):
+            return None
+        session.defer(timeout)
+        self.stats["restored"] += 1
+        logger.info(f"Restored crash session {session.session_id} from its snapshot "
+                    f"({len(session.results)} results); crash starts on the first miss")
+        return session
+
+    def _remember(self, session: CrashSession, command: str, output: str):
+        """Keep a cacheable result for the session's snapshot."""
+        if not self.snapshots:
+            return
+        command = normalize_command(command)
+        with self._results_lock:
+            previous = session.results.pop(command, None)
+            if previous is None:
+                session.snapshot_dirty = True
+            else:
+                session.results_bytes -= len(previous)
+            session.results[command] = output
+            session.results_bytes += len(output)
+            while session.results_bytes > self.snapshots.max_bytes and len(session.results) > 1:
+                _, dropped = session.results.popitem(last=False)
+                session.results_bytes -= len(dropped)
+
+    def _cached_result(self, session: CrashSession, key: str, command: str) -> Optional[str]:
+        """A command's output from the result cache or the session's snapshot."""
+        cached = self.result_cache.get(key)
+        if cached is None and session.results:
+            with self._results_lock:
+                cached = session.results.get(normalize_command(command))
+                if cached is not None:
+                    self.stats["snapshot_hits"] += 1
+        if cached is not None:
+            self._remember(session, command, cached)
+        return cached
+
+    def _find_reusable(self, dump_path: str, kernel_path: str) -> Optional[CrashSession]:
+        """Return a live pooled session for the pair, dropping a dead one."""
+        session = self.sessions.get((dump_path, kernel_path))
+        if session is None:
+            return None
+        if session.is_active():
+            return session
+        self._remove(session)
+        return None
+
+    def _select_evictions(self, reserve: int = 0, keep: Optional[CrashSession] = None) -> List[CrashSession]:
+        """Remove and return the sessions that exceed the pool limits.
+
+        Args:
+            reserve: Number of slots to free for sessions about to be started
+            keep: Session spared by the count and memory limits (e.g. the one
+                just started); dead or idle sessions are always evicted
+        """
+        evicted = []
+        # Dead and idle sessions go first
+        for session in list(self.sessions.values()):
+            if not session.is_active() or (self.idle_timeout and session.idle_seconds() > self.idle_timeout):
+                evicted.append(session)
+                self._remove(session)
+
+        # Then least recently used until the count limit is met
+        candidates = [s for s in self.sessions.values() if s is not keep]
+        while candidates and len(self.sessions) + reserve > self.max_sessions:
+            session = candidates.pop(0)
+            evicted.append(session)
+            self._remove(session)
+
+        # Then least recently used until total crash RSS fits
+        if self.max_rss_mb:
+            limit = self.max_rss_mb * 1024 * 1024
+            rss = {session.key: session.get_rss() for session in self.sessions.values()}
+            while candidates and sum(rss.values()) > limit:
+                session = candidates.pop(0)
+                rss.pop(session.key, None)
+                evicted.append(session)
+                self._remove(session)
+
+        for session in evicted:
+            logger.info(f"Evicting crash session {session.session_id} ({session.dump_path})")
+        return evicted
+
     def start_session(self, crash_dump, kernel_file, timeout: int = 180) -> bool:
-        """Start a new crash analysis session."""
-        # Close existing session if any
-        if self.active_session:
-            self.close_session()
+        """Start (or reuse) a crash analysis session and make it current."""
+        existing = self._find_reusable(str(crash_dump.path), str(kernel_file.path))
+        if existing:
+            logger.info(f"Reusing crash session: {existing.session_id}")
+            self._use(existing)
+            return True
+
+        for session in self._select_evictions(reserve=1):
+            session.close()
+
+        restored = self._restore(crash_dump, kernel_file, timeout)
+        if restored:
+            self.sessions[restored.key] = restored
+            self._use(restored)
+            return True
 
         try:
             logger.info(f"Starting crash session with dump: {crash_dump.name}, kernel: {kernel_file.name}")
@@ -167,43 +788,443 @@ class CrashSessionManager:
 
             # Actually start the crash process
             if session.start(timeout):
-                self.active_session = session
+                self.sessions[session.key] = session
+                self._use(session)
+                for evicted in self._select_evictions(keep=session):
+                    evicted.close()
                 logger.info(f"Crash session started successfully: {session.session_id}")
                 return True
             else:
                 logger.error("Failed to start crash process")
+                session.close()
                 return False
 
         except Exception as e:
             logger.error(f"Failed to start crash session: {e}")
             return False
-    
-    def execute_command(self, command: str, timeout: int = 120) -> Tuple[str, str, int]:
-        """Execute a command in the active session."""
-        if not self.active_session:
-            return "", "No active crash session", 1
-        
-        return self.active_session.execute_command(command, timeout)
-    
-    def is_session_active(self) -> bool:
-        """Check if there's an active session."""
-        return self.active_session is not None and self.active_session.is_active()
-    
-    def get_session_info(self) -> dict:
-        """Get information about the active session."""
-        if not self.active_session:
-            return {"active": False}
-        
+
+    async def _spawn_pooled(self, crash_dump, kernel_file, timeout: int,
+                            prewarm: bool) -> Optional[CrashSession]:
+        """Start a crash process and add it to the pool without making it current.
+
+        Sessions over the pool limits are evicted only once the new one is
+        up, so a failed start does not cost a warm session.
+        """
+        try:
+            logger.info(f"Starting crash session with dump: {crash_dump.name}, kernel: {kernel_file.name}")
+
+            session = CrashSession(str(crash_dump.path), str(kernel_file.path))
+            session.prewarmed = prewarm
+
+            if await session.start_async(timeout):
+                self.sessions[session.key] = session
+                for evicted in self._select_evictions(keep=session):
+                    await evicted.close_async()
+                logger.info(f"Crash session started successfully: {session.session_id}")
+                # Results saved by an earlier session are served without crash
+                await asyncio.to_thread(self._load_snapshot, session)
+                return session
+            else:
+                logger.error("Failed to start crash process")
+                await session.close_async()
+                return None
+
+        except Exception as e:
+            logger.error(f"Failed to start crash session: {e}")
+            return None
+
+    async def _get_or_start(self, crash_dump, kernel_file, timeout: int,
+                            prewarm: bool = False) -> Tuple[Optional[CrashSession], str]:
+        """Return a pooled session for the pair, starting one if needed.
+
+        Returns:
+            Tuple of (session or None, how it was obtained: "reused", "joined",
+            "restored" from a snapshot or "started")
+        """
+        key = (str(crash_dump.path), str(kernel_file.path))
+        existing = self._find_reusable(*key)
+        if existing:
+            return existing, "reused"
+
+        task = self._starting.get(key)
+        if task is not None:
+            # shield: a cancelled caller must not abort the start for everyone else
+            return await asyncio.shield(task), "joined"
+
+        if not prewarm and self.snapshots:
+            restored = await asyncio.to_thread(self._restore, crash_dump, kernel_file, timeout)
+            # Another caller may have started the pair meanwhile
+            existing = self._find_reusable(*key)
+            if existing:
+                return existing, "reused"
+            task = self._starting.get(key)
+            if task is not None:
+                return await asyncio.shield(task), "joined"
+            if restored:
+                self.sessions[key] = restored
+                for evicted in self._select_evictions(keep=restored):
+                    await evicted.close_async()
+                return restored, "restored"
+
+        task = asyncio.ensure_future(self._spawn_pooled(crash_dump, kernel_file, timeout, prewarm))
+        self._starting[key] = task
+        task.add_done_callback(lambda _: self._starting.pop(key, None))
+        return await asyncio.shield(task), "started"
+
+    async def start_session_async(self, crash_dump, kernel_file, timeout: int = 180) -> bool:
+        """Start (or reuse) a crash analysis session without blocking the event loop."""
+        session, how = await self._get_or_start(crash_dump, kernel_file, timeout)
+        if session is None:
+            return False
+
+        if session.prewarmed:
+            self.stats["warm_hits" if how == "reused" else "prewarm_joins"] += 1
+            session.prewarmed = False
+        elif how == "started":
+            self.stats["cold_starts"] += 1
+        elif how != "restored":
+            logger.info(f"Reusing crash session: {session.session_id}")
+
+        self._use(session)
+        return True
+
+    async def prewarm_session_async(self, crash_dump, kernel_file, timeout: int = 180) -> bool:
+        """Start a session ahead of time without making it current.
+
+        Returns:
+            True if a session for the pair is ready (new or already pooled)
+        """
+        session, how = await self._get_or_start(crash_dump, kernel_file, timeout, prewarm=True)
+        if session is None:
+            self.stats["prewarm_failures"] += 1
+            return False
+        if how == "started":
+            self.stats["prewarmed"] += 1
+        return True
+
+    def _cache_key(self, session: CrashSession, command: str) -> Optional[str]:
+        """Cache key for a command, or None if its result must not be cached."""
+        if not self.result_cache or not self.result_cache.is_enabled():
+            return None
+        if session.context_modified or not normalize_command(command) or is_stateful_command(command):
+            return None
+        try:
+            return self.result_cache.make_key(session.dump_path, session.kernel_path, command)
+        except OSError as e:
+            logger.warning(f"Cannot identify dump or kernel for caching: {e}")
+            return None
+
+    def _lookup(self, session: CrashSession, command: str) -> Tuple[Optional[str], Optional[str]]:
+        """Worker thread: a command's cache key and its cached output, if any.
+
+        Keys hash samples of the dump and kernel, and disk-tier hits are
+        gunzipped, so this stays off the event loop.
+        """
+        key = self._cache_key(session, command)
+        return key, self._cached_result(session, key, command) if key else None
+
+    def _execute_recorded(self, session: CrashSession, command: str, timeout: int,
+                          key: Optional[str]) -> Tuple[str, str, int]:
+        """Worker thread: run a command and cache its result."""
+        result = session.execute_command(command, timeout)
+        self._record_result(session, command, key, result)
+        return result
+
+    def _record_result(self, session: CrashSession, command: str, key: Optional[str],
+                       result: Tuple[str, str, int]):
+        """Cache a successful result and track session state changes."""
+        if is_stateful_command(command):
+            session.context_modified = True
+        elif key and result[2] == 0:
+            self.result_cache.put(key, result[0])
+            self._remember(session, command, result[0])
+
+    def execute_command(self, command: str, timeout: int = 120,
+                        session_id: Optional[str] = None) -> Tuple[str, str, int]:
+        """Execute a command in the named (or current) session."""
+        session = self.get_session(session_id)
+        if not session:
+            return "", self._missing_session_error(session_id), 1
+
+        self._use(session)
+        key = self._cache_key(session, command)
+        if key:
+            cached = self._cached_result(session, key, command)
+            if cached is not None:
+                return cached, "", 0
+
+        result = session.execute_command(command, timeout)
+        self._record_result(session, command, key, result)
+        return result
+
+    async def execute_command_async(self, command: str, timeout: int = 120,
+                                    session_id: Optional[str] = None) -> Tuple[str, str, int]:
+        """Execute a command in the named (or current) session without blocking the event loop."""
+        session = self.get_session(session_id)
+        if not session:
+            return "", self._missing_session_error(session_id), 1
+
+        self._use(session)
+        key, cached = await asyncio.to_thread(self._lookup, session, command)
+        if cached is not None:
+            return cached, "", 0
+
+        session.touch()
+        try:
+            # Caching the result writes to the disk tier: keep it on the worker
+            return await session._run_in_worker(self._execute_recorded, session, command, timeout, key)
+        finally:
+            session.touch()
+
+    def _execute_cached(self, session: CrashSession, command: str, timeout: int,
+                        cache_session: Optional[CrashSession] = None) -> dict:
+        """Run one command on the calling (worker) thread, using the result cache.
+
+        ``cache_session`` is the session whose state decides cacheability
+        when ``session`` is one of its replicas.
+
+        Returns:
+            Result dict with output, error, return code, cache flag and duration
+        """
+        started = time.monotonic()
+        cache_session = cache_session or session
+        key = self._cache_key(cache_session, command)
+        cached = self._cached_result(cache_session, key, command) if key else None
+        if cached is not None:
+            output, error, return_code = cached, "", 0
+        else:
+            output, error, return_code = session.execute_command(command, timeout)
+            self._record_result(cache_session, command, key, (output, error, return_code))
         return {
-            "active": True,
-            "session_id": self.active_session.session_id,
-            "dump_path": self.active_session.dump_path,
-            "kernel_path": self.active_session.kernel_path
+            "command": command,
+            "output": output,
+            "error": error,
+            "return_code": return_code,
+            "cached": cached is not None,
+            "duration": round(time.monotonic() - started, 4)
         }
-    
-    def close_session(self):
-        """Close the active session."""
-        if self.active_session:
-            logger.info(f"Closing crash session: {self.active_session.session_id}")
-            self.active_session.close()
-            self.active_session = None
+
+    async def _ensure_replicas(self, session: CrashSession, count: int, timeout: int) -> List[CrashSession]:
+        """Start replicas of a session until ``count`` are running.
+
+        Returns:
+            The running replicas (fewer than asked if some failed to start)
+        """
+        session.replicas = [replica for replica in session.replicas if replica.is_active()]
+        missing = count - len(session.replicas)
+        if missing > 0:
+            logger.info(f"Starting {missing} replicas of crash session {session.session_id}")
+            new = [CrashSession(session.dump_path, session.kernel_path) for _ in range(missing)]
+            started = await asyncio.gather(*(replica.start_async(timeout) for replica in new))
+            for replica, ok in zip(new, started):
+                if ok:
+                    session.replicas.append(replica)
+                else:
+                    await replica.close_async()
+            self.stats["replicas_started"] += sum(started)
+        return session.replicas[:count]
+
+    async def execute_fanout_async(self, commands: List[str], timeout: int = 120,
+                                   session_id: Optional[str] = None, replicas: int = 4,
+                                   start_timeout: int = 180) -> Tuple[Optional[List[dict]], int, str]:
+        """Spread read-only commands over a session and its replicas.
+
+        crash is single threaded, so a whole-dump sweep split into shards
+        (``bt -c N`` per CPU, ``kmem -S <cache>`` per slab, ...) runs on up
+        to ``replicas`` crash processes at once.  Each process pulls the next
+        shard when it finishes one, and results come back in command order.
+
+        Returns:
+            Tuple of (per-command results or None, sessions used, error message)
+        """
+        session = self.get_session(session_id)
+        if not session:
+            return None, 0, self._missing_session_error(session_id)
+        stateful = [command for command in commands if is_stateful_command(command)]
+        if stateful:
+            return None, 0, f"Fan-out only runs read-only commands, not: {', '.join(stateful)}"
+
+        self._use(session)
+        workers = [session]
+        if session.context_modified:
+            # Fresh replicas would not share the session's context or loaded symbols
+            logger.info(f"Session {session.session_id} context was modified; fan-out runs without replicas")
+        elif replicas > 1:
+            workers += await self._ensure_replicas(session, min(replicas, len(commands)) - 1, start_timeout)
+
+        results: List[Optional[dict]] = [None] * len(commands)
+        pending = iter(range(len(commands)))
+
+        async def drain(worker: CrashSession):
+            worker.touch()
+            try:
+                # The shared iterator hands each shard to exactly one worker
+                for index in pending:
+                    results[index] = await worker._run_in_worker(
+                        self._execute_cached, worker, commands[index], timeout, session
+                    )
+            finally:
+                worker.touch()
+
+        await asyncio.gather(*(drain(worker) for worker in workers))
+        self.stats["fanouts"] += 1
+        return results, len(workers), ""
+
+    async def execute_batch_async(self, commands: List[str], timeout: int = 120,
+                                  session_id: Optional[str] = None,
+                                  stop_on_error: bool = False) -> Tuple[Optional[List[dict]], str]:
+        """Execute several commands back-to-back in the named (or current) session.
+
+        The whole batch is a single job on the session's worker thread, so no
+        other caller's command is interleaved and nothing is returned to the
+        event loop between commands.
+
+        Returns:
+            Tuple of (per-command results or None, error message)
+        """
+        session = self.get_session(session_id)
+        if not session:
+            return None, self._missing_session_error(session_id)
+
+        self._use(session)
+
+        def run_batch() -> List[dict]:
+            results = []
+            for command in commands:
+                result = self._execute_cached(session, command, timeout)
+                results.append(result)
+                if stop_on_error and result["return_code"] != 0:
+                    break
+            return results
+
+        session.touch()
+        try:
+            return await session._run_in_worker(run_batch), ""
+        finally:
+            session.touch()
+
+    async def stream_command_async(self, command: str, timeout: int = 120, session_id: Optional[str] = None,
+                                   chunk_size: int = 64 * 1024) -> Tuple[Optional[CrashCommandStream], str]:
+        """Stream a command's output from the named (or current) session.
+
+        The result is cached from the session's worker thread when the
+        command finishes.
+
+        Returns:
+            Tuple of (stream or None, error message)
+        """
+        session = self.get_session(session_id)
+        if not session:
+            return None, self._missing_session_error(session_id)
+
+        self._use(session)
+        key, cached = await asyncio.to_thread(self._lookup, session, command)
+        if cached is not None:
+            return CrashCommandStream.from_text(command, cached, chunk_size), ""
+
+        def on_finish(stream: CrashCommandStream):
+            self._record_stream(stream)
+            if is_stateful_command(command):
+                session.context_modified = True
+            elif key and stream.return_code == 0 and stream.captured is not None:
+                output = "".join(stream.captured).strip()
+                self.result_cache.put(key, output)
+                self._remember(session, command, output)
+
+        capture_limit = self.result_cache.max_bytes if key else 0
+        return session.stream_command(command, timeout, chunk_size,
+                                      capture_limit=capture_limit, on_finish=on_finish), ""
+
+    def _record_stream(self, stream: CrashCommandStream):
+        """Update streaming metrics with a finished stream."""
+        self.stream_stats["streams"] += 1
+        self.stream_stats["bytes"] += stream.bytes_read
+        ttfb = stream.time_to_first_byte
+        if ttfb is not None:
+            self.stream_stats["last_time_to_first_byte"] = round(ttfb, 4)
+            previous = self.stream_stats["max_time_to_first_byte"]
+            self.stream_stats["max_time_to_first_byte"] = round(max(ttfb, previous or 0.0), 4)
+
+    def _missing_session_error(self, session_id: Optional[str]) -> str:
+        if session_id:
+            return f"No crash session with id '{session_id}'"
+        return "No active crash session"
+
+    def is_session_active(self, session_id: Optional[str] = None) -> bool:
+        """Check if the named (or current) session is active."""
+        session = self.get_session(session_id)
+        return session is not None and session.is_active()
+
+    def get_session_info(self) -> dict:
+        """Get information about the current session and the pool."""
+        session = self.active_session
+        if not session:
+            info = {"active": False}
+        else:
+            info = {
+                "active": True,
+                "session_id": session.session_id,
+                "dump_path": session.dump_path,
+                "kernel_path": session.kernel_path
+            }
+        info["pool"] = {
+            "sessions": len(self.sessions),
+            "max_sessions": self.max_sessions,
+            "idle_timeout": self.idle_timeout,
+            "max_rss_mb": self.max_rss_mb,
+            **self.stats
+        }
+        info["streaming"] = dict(self.stream_stats)
+        return info
+
+    def list_sessions(self) -> List[Dict]:
+        """Describe every pooled session, most recently used last."""
+        sessions = []
+        for session in self.sessions.values():
+            info = session.to_dict()
+            info["current"] = session.key == self._current_key
+            sessions.append(info)
+        return sessions
+
+    def close_session(self, session_id: Optional[str] = None):
+        """Close the named (or current) session."""
+        session = self.get_session(session_id)
+        if session:
+            logger.info(f"Closing crash session: {session.session_id}")
+            saved = self._remove(session)
+            session.close()
+            if saved is not None:
+                saved.result()
+
+    async def close_session_async(self, session_id: Optional[str] = None):
+        """Close the named (or current) session without blocking the event loop."""
+        session = self.get_session(session_id)
+        if session:
+            logger.info(f"Closing crash session: {session.session_id}")
+            saved = self._remove(session)
+            await session.close_async()
+            if saved is not None:
+                await asyncio.wrap_future(saved)
+
+    async def evict_idle_sessions(self) -> int:
+        """Close sessions that exceed the idle or memory limits.
+
+        Returns:
+            Number of sessions closed
+        """
+        evicted = self._select_evictions(keep=self.active_session)
+        for session in evicted:
+            await session.close_async()
+
+        # Fan-out replicas are released on their own once unused
+        for session in list(self.sessions.values()):
+            for replica in list(session.replicas):
+                if self.idle_timeout and replica.idle_seconds() > self.idle_timeout:
+                    session.replicas.remove(replica)
+                    await replica.close_async()
+        return len(evicted)
+
+    def close_all_sessions(self):
+        """Close every pooled session."""
+        for session in list(self.sessions.values()):
+            self.close_session(session.session_id)
@@ -0,0 +1,117 @@
+"""Snapshots of crash session results that outlive the session.
+
+Everything a session computes for a (dump, kernel) pair -- symbol lookups,
+``ps``, ``mod`` and every other deterministic command's output -- is
+written to a gzip-compressed JSON file when the session leaves the pool
+(close, eviction or server shutdown).  The next session on the same pair
+is restored from it without a crash process: crash only runs once a
+command the snapshot cannot answer arrives.
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from dynamic_mcp.crash_cache import CrashResultCache
+
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_VERSION = 1
+
+
+class CrashSessionSnapshots:
+    """Per (dump, kernel) snapshot files under ``directory``.
+
+    Snapshots are keyed by the dump and kernel identities of the result
+    cache (size and sampled content), so a moved dump keeps its snapshot
+    and a replaced one does not pick up a stale snapshot.  A snapshot keeps
+    the most recently computed results up to ``max_bytes`` of output.
+    """
+
+    def __init__(self, directory: str, result_cache: CrashResultCache,
+                 max_bytes: int = 64 * 1024 * 1024):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.result_cache = result_cache
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.stats = {"saved": 0, "restored": 0, "results_restored": 0, "errors": 0}
+
+    def _path(self, dump_path: str, kernel_path: str) -> Path:
+        identity = "\0".join([self.result_cache.file_identity(dump_path),
+                              self.result_cache.file_identity(kernel_path)])
+        key = hashlib.sha256(identity.encode()).hexdigest()
+        return self.directory / key[:2] / f"{key}.json.gz"
+
+    def save(self, dump_path: str, kernel_path: str, results: Dict[str, str]) -> bool:
+        """Write a pair's results (normalized command -> output, oldest first)."""
+        kept: List[Tuple[str, str]] = []
+        size = 0
+        for command, output in reversed(list(results.items())):
+            size += len(command) + len(output)
+            if size > self.max_bytes:
+                break
+            kept.append((command, output))
+        kept.reverse()
+        snapshot = {
+            "version": SNAPSHOT_VERSION,
+            "dump_path": dump_path,
+            "kernel_path": kernel_path,
+            "saved_at": time.time(),
+            "results": kept
+        }
+        try:
+            path = self._path(dump_path, kernel_path)
+            path.parent.mkdir(exist_ok=True)
+            tmp_path = path.with_suffix(f".tmp{os.getpid()}.{threading.get_ident()}")
+            with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+                json.dump(snapshot, f, separators=(",", ":"))
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not save crash session snapshot for {dump_path}: {e}")
+            with self._lock:
+                self.stats["errors"] += 1
+            return False
+        with self._lock:
+            self.stats["saved"] += 1
+        logger.info(f"Saved crash session snapshot for {dump_path} ({len(kept)} results) to {path}")
+        return True
+
+    def load(self, dump_path: str, kernel_path: str) -> Optional[Dict[str, str]]:
+        """Load a pair's saved results.
+
+        Returns:
+            normalized command -> output, or None if there is no usable snapshot
+        """
+        try:
+            path = self._path(dump_path, kernel_path)
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                snapshot = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, EOFError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable crash session snapshot for {dump_path}: {e}")
+            with self._lock:
+                self.stats["errors"] += 1
+            return None
+        if snapshot.get("version") != SNAPSHOT_VERSION:
+            return None
+
+        results = dict(snapshot["results"])
+        with self._lock:
+            self.stats["restored"] += 1
+            self.stats["results_restored"] += len(results)
+        logger.info(f"Restored crash session snapshot for {dump_path} ({len(results)} results)")
+        return results
+
+    def get_stats(self) -> dict:
+        """Snapshot counters, reported by get_crash_info."""
+        with self._lock:
+            return {**self.stats, "directory": str(self.directory)}
@@ -0,0 +1,335 @@
+"""Live updates of the crash dump catalog from inotify events."""
+
+import asyncio
+import ctypes
+import ctypes.util
+import errno
+import logging
+import os
+import struct
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from dynamic_mcp.crash_discovery import CrashDump, CrashDumpCatalog
+
+
+logger = logging.getLogger(__name__)
+
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = os.O_CLOEXEC
+
+# No IN_MODIFY: a dump still being written is picked up when it is closed
+WATCH_MASK = (IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR)
+EVENT_HEADER = struct.Struct("iIII")
+
+
+def _load_libc():
+    """libc with the inotify calls, or None where inotify is not available."""
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        libc.inotify_init1
+        libc.inotify_add_watch
+        libc.inotify_rm_watch
+        return libc
+    except (OSError, AttributeError):
+        return None
+
+
+def inotify_available() -> bool:
+    """Whether this system supports inotify."""
+    libc = _load_libc()
+    if libc is None:
+        return False
+    fd = libc.inotify_init1(IN_CLOEXEC)
+    if fd < 0:
+        return False
+    os.close(fd)
+    return True
+
+
+class CrashDumpWatcher:
+    """Keeps a CrashDumpCatalog current from inotify events.
+
+    Every directory in the catalog gets a watch, so the tree is followed to
+    the same depth the catalog scans.  Events mark directories or dumps
+    stale and, after a short debounce, the catalog refreshes only those in
+    a worker thread; while the watcher runs the catalog does no mtime
+    polling at all.  ``on_change`` is called when dumps appear or
+    disappear, and ``on_dump_complete``
+    once a dump is closed after writing or renamed into place, which is
+    when kdump has finished with it.  If inotify is unavailable, or a
+    watch cannot be added, the catalog keeps polling as before.
+    """
+
+    def __init__(
+        self,
+        catalog: CrashDumpCatalog,
+        on_change: Optional[Callable[[], None]] = None,
+        on_dump_complete: Optional[Callable[[CrashDump], None]] = None,
+        debounce: float = 0.2
+    ):
+        self.catalog = catalog
+        self.on_change = on_change
+        self.on_dump_complete = on_dump_complete
+        self.debounce = debounce
+        self._libc = None
+        self._fd: Optional[int] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        # Watch descriptor <-> directory path
+        self._paths: Dict[int, str] = {}
+        self._watches: Dict[str, int] = {}
+        # Changes seen by the reader, applied by the next refresh
+        self._stale_dirs: Set[str] = set()
+        self._stale_files: Set[str] = set()
+        self._rescan_all = False
+        self._completed: Set[str] = set()
+        self._refresh_handle: Optional[asyncio.TimerHandle] = None
+        self._refresh_task: Optional[asyncio.Task] = None
+        self.stats = {"events": 0, "overflows": 0, "notifications": 0, "completed_dumps": 0}
+
+    @property
+    def active(self) -> bool:
+        return self._fd is not None
+
+    async def start(self) -> bool:
+        """Watch the catalog's directories from the event loop.
+
+        Returns:
+            True if watching, False if the catalog falls back to polling
+        """
+        self._libc = _load_libc()
+        if self._libc is None:
+            logger.warning("inotify is not available; crash dumps will be found by polling")
+            return False
+        fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            logger.warning(f"inotify_init1 failed ({os.strerror(ctypes.get_errno())}); "
+                           f"crash dumps will be found by polling")
+            return False
+        self._fd = fd
+        self._loop = asyncio.get_running_loop()
+
+        try:
+            await asyncio.to_thread(self.catalog.refresh, True)
+            watching = await self._sync_watches()
+        except Exception as e:
+            logger.error(f"Error scanning crash dump directories: {e}")
+            watching = False
+        if not watching:
+            self.close()
+            return False
+        self._loop.add_reader(fd, self._read_events)
+        logger.info(f"Watching {len(self._watches)} crash dump directories under {self.catalog.root}")
+        return True
+
+    def close(self):
+        """Stop watching; the catalog goes back to polling."""
+        if self._refresh_handle:
+            self._refresh_handle.cancel()
+            self._refresh_handle = None
+        if self._refresh_task:
+            self._refresh_task.cancel()
+            self._refresh_task = None
+        if self._fd is not None:
+            if self._loop:
+                self._loop.remove_reader(self._fd)
+            os.close(self._fd)
+            self._fd = None
+        self._paths.clear()
+        self._watches.clear()
+        self._stale_dirs.clear()
+        self._stale_files.clear()
+        self._completed.clear()
+        self.catalog.live = False
+
+    def _add_watch(self, path: str) -> bool:
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(path), WATCH_MASK)
+        if wd < 0:
+            error = ctypes.get_errno()
+            if error in (errno.ENOENT, errno.ENOTDIR):
+                # Gone already; the parent's event drops it from the catalog
+                return True
+            logger.warning(f"Cannot watch {path}: {os.strerror(error)}"
+                           + (" (raise fs.inotify.max_user_watches)" if error == errno.ENOSPC else ""))
+            return False
+        self._paths[wd] = path
+        self._watches[path] = wd
+        return True
+
+    async def _sync_watches(self) -> bool:
+        """Match the watches to the catalog's directories.
+
+        A new directory may have gained files before its watch existed, so
+        it is rescanned once watched, until no new directories turn up.
+
+        Returns:
+            False if a directory could not be watched or none is left
+        """
+        while True:
+            directories = set(self.catalog.directories())
+            for path in set(self._watches) - directories:
+                wd = self._watches.pop(path)
+                self._paths.pop(wd, None)
+                self._libc.inotify_rm_watch(self._fd, wd)
+            added = sorted(directories - set(self._watches))
+            for path in added:
+                if not self._add_watch(path):
+                    return False
+            if not self._watches:
+                # Root is missing: only polling notices when it appears
+                return False
+            self.catalog.live = True
+            if not added:
+                return True
+            for path in added:
+                self.catalog.mark_stale(path, is_dir=True)
+            await asyncio.to_thread(self.catalog.refresh)
+
+    def _read_events(self):
+        """Reader callback: record what pending events touched.
+
+        The catalog is not refreshed here, since that can rescan large
+        directories; a debounced refresh runs in a worker thread instead.
+        """
+        try:
+            while True:
+                try:
+                    data = os.read(self._fd, 65536)
+                except BlockingIOError:
+                    break
+                offset = 0
+                while offset < len(data):
+                    wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+                    offset += EVENT_HEADER.size
+                    name = os.fsdecode(data[offset:offset + length].rstrip(b"\0"))
+                    offset += length
+                    self.stats["events"] += 1
+                    self._handle_event(wd, mask, name)
+        except Exception as e:
+            logger.error(f"Error reading crash dump directory events: {e}")
+        self._schedule_refresh()
+
+    def _handle_event(self, wd: int, mask: int, name: str):
+        """Record what an event touched as stale."""
+        if mask & IN_Q_OVERFLOW:
+            self.stats["overflows"] += 1
+            logger.warning("inotify queue overflowed; rescanning all crash dump directories")
+            self._rescan_all = True
+            return
+        directory = self._paths.get(wd)
+        if directory is None:
+            return
+        if mask & IN_IGNORED:
+            self._paths.pop(wd, None)
+            self._watches.pop(directory, None)
+            return
+        if mask & (IN_DELETE_SELF | IN_MOVE_SELF):
+            self._stale_dirs.add(os.path.dirname(directory) or directory)
+            self._stale_dirs.add(directory)
+            return
+
+        path = os.path.join(directory, name)
+        if mask & IN_CLOSE_WRITE:
+            # Size and mtime are final now; a dump not yet indexed rescans its directory
+            self._stale_files.add(path)
+        else:
+            self._stale_dirs.add(directory)
+        if mask & (IN_CLOSE_WRITE | IN_MOVED_TO) and not mask & IN_ISDIR:
+            self._completed.add(path)
+
+    def _pending(self) -> bool:
+        return bool(self._stale_dirs or self._stale_files or self._rescan_all)
+
+    def _schedule_refresh(self):
+        if not self._pending() or self._refresh_handle is not None or self._refresh_task is not None:
+            return
+        self._refresh_handle = self._loop.call_later(self.debounce, self._start_refresh)
+
+    def _start_refresh(self):
+        self._refresh_handle = None
+        self._refresh_task = self._loop.create_task(self._refresh())
+
+    def _apply_stale(self, stale_dirs: Set[str], stale_files: Set[str], rescan_all: bool,
+                     completed: Set[str]) -> Tuple[bool, List[CrashDump]]:
+        """Worker thread: pass recorded changes to the catalog and refresh it.
+
+        Returns:
+            Tuple of (whether dumps appeared or disappeared, the completed dumps)
+        """
+        catalog = self.catalog
+        if rescan_all:
+            stale_dirs |= set(catalog.directories())
+        for path in stale_dirs:
+            catalog.mark_stale(path, is_dir=True)
+        for path in stale_files:
+            if catalog.get(path):
+                catalog.mark_stale(path, is_dir=False)
+            else:
+                catalog.mark_stale(os.path.dirname(path), is_dir=True)
+        before = {str(dump.path) for dump in catalog.all()}
+        catalog.refresh()
+        changed = {str(dump.path) for dump in catalog.all()} != before
+        return changed, [dump for dump in map(catalog.get, sorted(completed)) if dump]
+
+    async def _refresh(self):
+        """Apply the recorded changes, then report new and completed dumps."""
+        stale_dirs, self._stale_dirs = self._stale_dirs, set()
+        stale_files, self._stale_files = self._stale_files, set()
+        rescan_all, self._rescan_all = self._rescan_all, False
+        completed, self._completed = self._completed, set()
+        try:
+            changed, completed = await asyncio.to_thread(
+                self._apply_stale, stale_dirs, stale_files, rescan_all, completed)
+            if not await self._sync_watches():
+                logger.warning("Falling back to polling for crash dumps")
+                self._refresh_task = None
+                self.close()
+                return
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Error processing crash dump directory events: {e}")
+            changed, completed = False, []
+        finally:
+            if self._refresh_task is asyncio.current_task():
+                self._refresh_task = None
+
+        if changed:
+            self._notify_change()
+        for dump in completed:
+            if self.on_dump_complete:
+                self.stats["completed_dumps"] += 1
+                try:
+                    self.on_dump_complete(dump)
+                except Exception as e:
+                    logger.error(f"Error handling completed crash dump {dump.path}: {e}")
+        if self.active:
+            # Events that arrived during this refresh
+            self._schedule_refresh()
+
+    def _notify_change(self):
+        if self.on_change is None:
+            return
+        self.stats["notifications"] += 1
+        try:
+            self.on_change()
+        except Exception as e:
+            logger.error(f"Error notifying crash dump changes: {e}")
+
+    def get_stats(self) -> dict:
+        """Watch counts and event counters, reported by get_crash_info."""
+        return {
+            "mode": "inotify" if self.active else "polling",
+            "watches": len(self._watches),
+            **self.stats
+        }
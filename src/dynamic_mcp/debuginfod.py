@@ -0,0 +1,187 @@
+"""Fetching kernel debuginfo by build-id from debuginfod servers.
+
+debuginfod serves the ELF file with debug symbols for a build-id at
+``<server>/buildid/<build-id>/debuginfo``; for a kernel that is the
+vmlinux crash needs.  Downloads land in a content-addressed cache laid out
+like the debuginfod client's own (``<cache>/<build-id>/debuginfo``), so a
+build is fetched once per node however many dumps need it.
+"""
+
+import asyncio
+import logging
+import os
+import re
+import shutil
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from dynamic_mcp.dump_metadata import read_dump_metadata
+
+
+logger = logging.getLogger(__name__)
+
+BUILD_ID_RE = re.compile(r"^[0-9a-f]{8,128}$")
+DOWNLOAD_CHUNK_BYTES = 1024 * 1024
+PARTIAL_SUFFIX = ".part"
+
+
+class DebuginfodClient:
+    """Download vmlinux files by build-id into a size-bounded local cache.
+
+    Concurrent requests for the same build-id share one download, and at
+    most ``max_concurrent`` downloads run at a time.  An interrupted
+    download leaves a partial file that the next attempt resumes with an
+    HTTP range request.  A finished file is kept only if its GNU build-id
+    note matches the one requested.  The cache is an LRU on file mtime
+    bounded by ``max_bytes``; cache hits touch the file.  ``timeout`` is how
+    long a download may stall, not its total duration.
+    """
+
+    def __init__(self, urls: List[str], cache_dir: str, max_bytes: int = 16 * 1024 * 1024 * 1024,
+                 timeout: int = 60, max_concurrent: int = 2):
+        self.urls = [url.rstrip("/") for url in urls if url]
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+        self._semaphore = asyncio.Semaphore(max(1, max_concurrent))
+        self._downloads: Dict[str, asyncio.Future] = {}
+        self.stats = {"hits": 0, "downloads": 0, "resumed": 0, "failures": 0,
+                      "bytes_downloaded": 0, "evictions": 0}
+
+    def is_enabled(self) -> bool:
+        """Check whether any debuginfod server is configured."""
+        return bool(self.urls)
+
+    def cached_path(self, build_id: str) -> Path:
+        """Where the debuginfo of a build-id is (or would be) cached."""
+        return self.cache_dir / build_id / "debuginfo"
+
+    def lookup(self, build_id: str) -> Optional[Path]:
+        """The cached debuginfo for a build-id, without downloading."""
+        path = self.cached_path(build_id.lower())
+        try:
+            os.utime(path)
+        except OSError:
+            return None
+        self.stats["hits"] += 1
+        return path
+
+    async def fetch(self, build_id: str) -> Optional[Path]:
+        """The debuginfo for a build-id, downloading it if not cached.
+
+        Returns None if no server has it or the download fails.
+        """
+        build_id = build_id.lower()
+        if not BUILD_ID_RE.match(build_id):
+            logger.warning(f"Not fetching debuginfo for malformed build-id {build_id!r}")
+            return None
+        path = self.lookup(build_id)
+        if path or not self.urls:
+            return path
+
+        download = self._downloads.get(build_id)
+        if download is None:
+            download = asyncio.ensure_future(self._download(build_id))
+            self._downloads[build_id] = download
+            download.add_done_callback(lambda _: self._downloads.pop(build_id, None))
+        return await asyncio.shield(download)
+
+    async def _download(self, build_id: str) -> Optional[Path]:
+        import aiohttp
+
+        path = self.cached_path(build_id)
+        partial = path.with_name(path.name + PARTIAL_SUFFIX)
+        async with self._semaphore:
+            try:
+                path.parent.mkdir(parents=True, exist_ok=True)
+            except OSError as e:
+                logger.warning(f"Cannot create debuginfo cache entry {path.parent}: {e}")
+                self.stats["failures"] += 1
+                return None
+
+            timeout = aiohttp.ClientTimeout(total=None, sock_connect=self.timeout, sock_read=self.timeout)
+            async with aiohttp.ClientSession(timeout=timeout) as session:
+                for url in self.urls:
+                    try:
+                        if await self._download_from(session, f"{url}/buildid/{build_id}/debuginfo", partial):
+                            break
+                    except (aiohttp.ClientError, asyncio.TimeoutError, OSError) as e:
+                        # The partial file is kept for the next attempt to resume
+                        logger.warning(f"Debuginfo download of {build_id} from {url} failed: {e}")
+                else:
+                    self.stats["failures"] += 1
+                    return None
+
+            found = await asyncio.to_thread(read_dump_metadata, partial)
+            if found.build_id != build_id:
+                logger.warning(f"Discarding debuginfo for {build_id}: the file's build-id is {found.build_id}")
+                partial.unlink(missing_ok=True)
+                self.stats["failures"] += 1
+                return None
+            os.replace(partial, path)
+            self.stats["downloads"] += 1
+            logger.info(f"Fetched debuginfo for {build_id} into {path}")
+
+        await asyncio.to_thread(self._evict, path)
+        return path
+
+    async def _download_from(self, session, url: str, partial: Path) -> bool:
+        """Download (or resume) one URL into the partial file; False on 404."""
+        offset = partial.stat().st_size if partial.exists() else 0
+        headers = {"Range": f"bytes={offset}-"} if offset else {}
+        async with session.get(url, headers=headers) as resp:
+            if resp.status == 404:
+                return False
+            if resp.status == 416 and offset:
+                # Partial file is not a prefix of this server's copy: start over
+                partial.unlink()
+                return await self._download_from(session, url, partial)
+            resp.raise_for_status()
+            if resp.status == 206:
+                self.stats["resumed"] += 1
+                logger.info(f"Resuming debuginfo download {url} at byte {offset}")
+                mode = "ab"
+            else:
+                mode = "wb"
+            # Disk writes go to a worker thread: a slow cache disk must not stall the loop
+            f = await asyncio.to_thread(open, partial, mode)
+            try:
+                async for chunk in resp.content.iter_chunked(DOWNLOAD_CHUNK_BYTES):
+                    await asyncio.to_thread(f.write, chunk)
+                    self.stats["bytes_downloaded"] += len(chunk)
+            finally:
+                await asyncio.to_thread(f.close)
+        return True
+
+    def _evict(self, keep: Path):
+        """Drop least recently used entries down to 90% of the limit."""
+        entries = []
+        for path in self.cache_dir.glob("*/debuginfo"):
+            try:
+                stat = path.stat()
+                entries.append((stat.st_mtime, stat.st_size, path))
+            except OSError:
+                continue
+        total = sum(size for _, size, _ in entries)
+        if total <= self.max_bytes:
+            return
+        entries.sort()
+        target = self.max_bytes * 0.9
+        for _, size, path in entries:
+            if total <= target:
+                break
+            if path == keep:
+                continue
+            # Sessions that already opened the file keep reading it
+            shutil.rmtree(path.parent, ignore_errors=True)
+            total -= size
+            self.stats["evictions"] += 1
+
+    def get_stats(self) -> dict:
+        """Cache and download counters, reported by get_crash_info."""
+        return {
+            **self.stats,
+            "servers": self.urls,
+            "cache_dir": str(self.cache_dir),
+            "downloading": sorted(self._downloads)
+        }
@@ -0,0 +1,277 @@
+"""Reading kernel metadata from crash dump headers without running crash.
+
+ELF vmcores carry a VMCOREINFO note in their PT_NOTE segment.  kdump-
+compressed (makedumpfile diskdump) files start with a header holding the
+crashed kernel's utsname and crash time, followed by a sub header pointing
+at the same VMCOREINFO text.  Both sit in the first pages of the file, so
+they are read through mmap and only those pages are touched, however large
+the dump.  kdump does not store the panic message in the dump itself; it is
+taken from the vmcore-dmesg.txt it saves next to the vmcore.
+"""
+
+import logging
+import mmap
+import os
+import re
+import struct
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterator, NamedTuple, Optional, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+ELF_MAGIC = b"\x7fELF"
+KDUMP_SIGNATURE = b"KDUMP   "
+FLATTENED_SIGNATURE = b"makedumpfile\0"
+FLATTENED_HEADER_SIZE = 4096
+# Records of a flattened dump scanned for the header and VMCOREINFO
+FLATTENED_MAX_RECORDS = 64
+
+PT_NOTE = 4
+PN_XNUM = 0xFFFF
+NT_PRSTATUS = 1
+NT_GNU_BUILD_ID = 3
+ELF_MACHINES = {3: "i386", 20: "ppc", 21: "ppc64", 22: "s390x", 40: "arm", 62: "x86_64", 183: "aarch64", 243: "riscv64"}
+
+UTS_FIELD = 65
+# struct disk_dump_header on 64-bit: signature, header_version, new_utsname,
+# timeval, status, block_size, sub_hdr_size, bitmap_blocks, max_mapnr,
+# total_ram_blocks, device_blocks, written_blocks, current_cpu, nr_cpus
+DISK_DUMP_HEADER = "8si390s6xqqIiiIIIIIIi"
+# struct kdump_sub_header up to offset_note/size_note
+KDUMP_SUB_HEADER = "QiiQQqQqQ"
+
+PANIC_RE = re.compile(
+    r"Kernel panic - not syncing: .*|BUG: .*|Oops: .*|general protection fault.*|"
+    r"Unable to handle kernel .*|SysRq : Trigger a crash.*"
+)
+DMESG_TAIL_BYTES = 256 * 1024
+
+
+class DumpMetadata(NamedTuple):
+    """Kernel facts recorded in a crash dump's headers."""
+    format: str
+    release: Optional[str] = None
+    version: Optional[str] = None
+    machine: Optional[str] = None
+    build_id: Optional[str] = None
+    crash_time: Optional[float] = None
+    panic: Optional[str] = None
+    cpus: Optional[int] = None
+
+    def to_dict(self) -> dict:
+        """Convert metadata to dictionary."""
+        info = self._asdict()
+        if self.crash_time is not None:
+            info["crash_time"] = datetime.fromtimestamp(self.crash_time).isoformat()
+        return info
+
+
+def read_dump_metadata(path) -> DumpMetadata:
+    """Read what the dump's headers say about the crashed kernel.
+
+    Never raises for unreadable or unrecognized files: the format is then
+    "unknown" and the other fields are None.
+    """
+    path = Path(path)
+    try:
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if mm[:4] == ELF_MAGIC:
+                metadata = _read_elf(mm)
+            elif mm[:8] == KDUMP_SIGNATURE:
+                metadata = _read_kdump(lambda offset, size: mm[offset:offset + size], "kdump")
+            elif mm[:len(FLATTENED_SIGNATURE)] == FLATTENED_SIGNATURE:
+                metadata = _read_kdump(_flattened_reader(mm), "flattened")
+            else:
+                metadata = DumpMetadata("unknown")
+    except (OSError, ValueError, struct.error) as e:
+        # ValueError: empty file (mmap) or a truncated header
+        logger.debug(f"Cannot read dump header of {path}: {e}")
+        metadata = DumpMetadata("unknown")
+    if metadata.panic is None:
+        metadata = metadata._replace(panic=_panic_from_dmesg(path))
+    return metadata
+
+
+def read_kernel_metadata(path) -> DumpMetadata:
+    """Read the GNU build-id of a kernel image, skipping the dump-only lookups.
+
+    Compressed images (vmlinuz) are not ELF files and get no build-id.
+    """
+    try:
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if mm[:4] != ELF_MAGIC:
+                return DumpMetadata("unknown")
+            return _read_elf(mm)
+    except (OSError, ValueError, struct.error) as e:
+        logger.debug(f"Cannot read kernel image header of {path}: {e}")
+        return DumpMetadata("unknown")
+
+
+def parse_vmcoreinfo(text: str) -> Dict[str, str]:
+    """KEY=VALUE lines of a VMCOREINFO note."""
+    info = {}
+    for line in text.splitlines():
+        key, sep, value = line.partition("=")
+        if sep:
+            info[key] = value
+    return info
+
+
+def iter_elf_notes(data: bytes, endian: str = "<") -> Iterator[Tuple[str, int, bytes]]:
+    """(name, type, descriptor) of each note in an ELF note segment or section."""
+    header = struct.Struct(endian + "III")
+    offset = 0
+    while offset + header.size <= len(data):
+        namesz, descsz, note_type = header.unpack_from(data, offset)
+        offset += header.size
+        name = bytes(data[offset:offset + namesz]).rstrip(b"\0").decode("ascii", "replace")
+        offset += (namesz + 3) & ~3
+        desc = data[offset:offset + descsz]
+        offset += (descsz + 3) & ~3
+        if len(desc) < descsz:
+            return
+        yield name, note_type, desc
+
+
+def _elf_layout(data) -> Tuple[str, bool, Tuple[int, int, int, int]]:
+    """Endianness, ELF class and (e_machine, e_phoff, e_phentsize, e_phnum)."""
+    is_64 = data[4] == 2
+    endian = ">" if data[5] == 2 else "<"
+    if is_64:
+        _, machine, _, _, phoff, shoff, _, _, phentsize, phnum = struct.unpack_from(
+            endian + "HHIQQQIHHH", data, 16)
+    else:
+        _, machine, _, _, phoff, shoff, _, _, phentsize, phnum = struct.unpack_from(
+            endian + "HHIIIIIHHH", data, 16)
+    if phnum == PN_XNUM and shoff:
+        # Too many segments for e_phnum: the count is in section 0's sh_info
+        phnum = struct.unpack_from(endian + "I", data, shoff + (44 if is_64 else 28))[0]
+    return endian, is_64, (machine, phoff, phentsize, phnum)
+
+
+def elf_note_segments(data) -> Iterator[Tuple[str, bytes]]:
+    """(endianness, contents) of each PT_NOTE segment of an ELF file."""
+    endian, is_64, (_, phoff, phentsize, phnum) = _elf_layout(data)
+    for index in range(phnum):
+        offset = phoff + index * phentsize
+        if is_64:
+            p_type, _, p_offset, _, _, p_filesz = struct.unpack_from(endian + "IIQQQQ", data, offset)
+        else:
+            p_type, p_offset, _, _, p_filesz = struct.unpack_from(endian + "IIIII", data, offset)
+        if p_type == PT_NOTE:
+            yield endian, data[p_offset:p_offset + p_filesz]
+
+
+def _read_elf(mm) -> DumpMetadata:
+    """Metadata of an ELF vmcore, or the build-id of a vmlinux."""
+    _, _, (machine, _, _, _) = _elf_layout(mm)
+    vmcoreinfo = {}
+    build_id = None
+    cpus = 0
+    for segment_endian, segment in elf_note_segments(mm):
+        for name, note_type, desc in iter_elf_notes(segment, segment_endian):
+            if name == "VMCOREINFO":
+                vmcoreinfo = parse_vmcoreinfo(bytes(desc).decode("ascii", "replace"))
+            elif name == "CORE" and note_type == NT_PRSTATUS:
+                cpus += 1
+            elif name == "GNU" and note_type == NT_GNU_BUILD_ID:
+                build_id = bytes(desc).hex()
+    return _from_vmcoreinfo(
+        "elf", vmcoreinfo,
+        machine=ELF_MACHINES.get(machine),
+        build_id=build_id,
+        cpus=cpus or None
+    )
+
+
+def _read_kdump(read: Callable[[int, int], bytes], dump_format: str) -> DumpMetadata:
+    header = read(0, struct.calcsize("<" + DISK_DUMP_HEADER))
+    endian = "<"
+    fields = struct.unpack("<" + DISK_DUMP_HEADER, header)
+    if not 0 < fields[1] < 0x10000:
+        # Dumped by a big-endian kernel
+        endian = ">"
+        fields = struct.unpack(endian + DISK_DUMP_HEADER, header)
+    _, header_version, utsname, tv_sec, _, _, block_size, _, _, _, _, _, _, _, nr_cpus = fields
+    uts = [utsname[i:i + UTS_FIELD].split(b"\0", 1)[0].decode("ascii", "replace")
+           for i in range(0, 6 * UTS_FIELD, UTS_FIELD)]
+
+    vmcoreinfo = {}
+    if header_version >= 3 and block_size > 0:
+        sub_header = read(block_size, struct.calcsize(endian + KDUMP_SUB_HEADER))
+        if len(sub_header) == struct.calcsize(endian + KDUMP_SUB_HEADER):
+            (_, _, _, _, _, offset_vmcoreinfo, size_vmcoreinfo,
+             offset_note, size_note) = struct.unpack(endian + KDUMP_SUB_HEADER, sub_header)
+            if offset_vmcoreinfo and size_vmcoreinfo:
+                vmcoreinfo = parse_vmcoreinfo(read(offset_vmcoreinfo, size_vmcoreinfo).decode("ascii", "replace"))
+            elif header_version >= 4 and offset_note and size_note:
+                for name, _, desc in iter_elf_notes(read(offset_note, size_note), endian):
+                    if name == "VMCOREINFO":
+                        vmcoreinfo = parse_vmcoreinfo(bytes(desc).decode("ascii", "replace"))
+
+    return _from_vmcoreinfo(
+        dump_format, vmcoreinfo,
+        release=uts[2] or None,
+        version=uts[3] or None,
+        machine=uts[4] or None,
+        crash_time=float(tv_sec) if tv_sec > 0 else None,
+        cpus=nr_cpus if nr_cpus > 0 else None
+    )
+
+
+def _flattened_reader(mm) -> Callable[[int, int], bytes]:
+    """Read by dump offset from a flattened dump's leading records.
+
+    A flattened file is a 4 KB header followed by (offset, size) records
+    in big-endian, each carrying the bytes for that offset of the dump.
+    """
+    records = []
+    position = FLATTENED_HEADER_SIZE
+    for _ in range(FLATTENED_MAX_RECORDS):
+        if position + 16 > len(mm):
+            break
+        offset, size = struct.unpack_from(">qq", mm, position)
+        if offset < 0 or size <= 0:
+            # End marker
+            break
+        records.append((offset, size, position + 16))
+        position += 16 + size
+
+    def read(offset: int, size: int) -> bytes:
+        for start, length, data_position in records:
+            if start <= offset and offset + size <= start + length:
+                data_offset = data_position + offset - start
+                return mm[data_offset:data_offset + size]
+        return b""
+
+    return read
+
+
+def _from_vmcoreinfo(dump_format: str, vmcoreinfo: Dict[str, str], **fields) -> DumpMetadata:
+    if vmcoreinfo.get("OSRELEASE"):
+        fields["release"] = vmcoreinfo["OSRELEASE"]
+    if vmcoreinfo.get("BUILD-ID"):
+        fields["build_id"] = vmcoreinfo["BUILD-ID"].lower()
+    if vmcoreinfo.get("CRASHTIME", "").isdigit():
+        fields["crash_time"] = float(vmcoreinfo["CRASHTIME"])
+    return DumpMetadata(dump_format, **fields)
+
+
+def _panic_from_dmesg(path: Path) -> Optional[str]:
+    """The panic line from the vmcore-dmesg.txt kdump saves beside the dump."""
+    dmesg = path.parent / "vmcore-dmesg.txt"
+    try:
+        with open(dmesg, "rb") as f:
+            f.seek(max(0, os.fstat(f.fileno()).st_size - DMESG_TAIL_BYTES))
+            text = f.read().decode("utf-8", "replace")
+    except OSError:
+        return None
+    # Prefer the "Kernel panic - not syncing" summary; otherwise the first
+    # oops-like line, which is usually the cause
+    matches = PANIC_RE.findall(text)
+    if not matches:
+        return None
+    panics = [line for line in matches if line.startswith("Kernel panic")]
+    return (panics[-1] if panics else matches[0]).strip()
@@ -3,12 +3,26 @@
 import logging
 import os
 import re
+import threading
+from collections import OrderedDict
 from pathlib import Path
-from typing import List, NamedTuple, Optional
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from dynamic_mcp.crash_discovery import CrashDumpCatalog
+from dynamic_mcp.debuginfod import DebuginfodClient
+from dynamic_mcp.dump_metadata import DumpMetadata, read_kernel_metadata
 
 
 logger = logging.getLogger(__name__)
 
+KERNEL_PATTERNS = ["vmlinux", "vmlinuz", "vmlinuz-*"]
+# Kernel images are found at most three directories below a search root,
+# which covers /usr/lib/debug/lib/modules/<release>/vmlinux and
+# KERNEL_PATH/<distro>/<release>/vmlinux layouts
+KERNEL_SEARCH_DEPTH = 3
+# Crash dump directories whose kernel candidates are remembered
+DUMP_DIRECTORY_CACHE_SIZE = 256
+
 
 class KernelFile(NamedTuple):
     """Represents a kernel file."""
@@ -16,6 +30,7 @@ class KernelFile(NamedTuple):
     path: Path
     version: str
     size: int
+    build_id: Optional[str] = None
 
     def to_dict(self) -> dict:
         """Convert kernel file to dictionary."""
@@ -24,15 +39,170 @@ class KernelFile(NamedTuple):
             "path": str(self.path),
             "version": self.version,
             "size": self.size,
+            "build_id": self.build_id,
             "size_mb": round(self.size / (1024 * 1024), 2),
             "readable": os.access(self.path, os.R_OK)
         }
 
 
+def _kernel_version(filename: str, directory: Path) -> str:
+    """Extract kernel version from filename or directory path."""
+    # Try to extract from filename
+    if filename.startswith("vmlinuz-"):
+        return filename[8:]  # Remove "vmlinuz-" prefix
+
+    # Try to extract from directory path (for debug symbols)
+    path_parts = str(directory).split(os.sep)
+    for part in reversed(path_parts):
+        if re.match(r'^\d+\.\d+\.\d+', part):
+            return part
+
+    # Fallback: use directory name if it looks like a version
+    dir_name = directory.name
+    if re.match(r'^\d+\.\d+', dir_name):
+        return dir_name
+
+    return "unknown"
+
+
+class KernelIndex:
+    """Kernel images under the search roots, keyed by build-id and release.
+
+    Each root is indexed by a CrashDumpCatalog, so a refresh only rescans
+    directories whose mtime changed and, with ``db_path``, the index
+    survives restarts.  The GNU build-id of each vmlinux is read from its
+    ELF notes once per file version and kept with the catalog.
+
+    Kernels saved next to a dump are cached per dump directory and
+    rescanned only when the directory's mtime changes.
+    """
+
+    def __init__(self, roots: Iterable[Path], db_path: Optional[str] = None, refresh_interval: float = 0.0):
+        self.roots = list(dict.fromkeys(Path(root) for root in roots))
+        self.catalogs = [
+            CrashDumpCatalog(root, KERNEL_PATTERNS, max_depth=KERNEL_SEARCH_DEPTH,
+                             db_path=db_path, refresh_interval=refresh_interval,
+                             metadata_reader=read_kernel_metadata)
+            for root in self.roots
+        ]
+        self._lock = threading.Lock()
+        self._kernels: Optional[List[KernelFile]] = None
+        self._by_build_id: Dict[str, KernelFile] = {}
+        self._by_release: Dict[str, List[KernelFile]] = {}
+        self._dump_directories: "OrderedDict[Path, Tuple[int, List[KernelFile]]]" = OrderedDict()
+        self.stats = {"dump_directory_scans": 0, "dump_directory_hits": 0}
+
+    def refresh(self, force: bool = False):
+        """Pick up kernels added, removed or replaced since the last refresh."""
+        changed = False
+        for catalog in self.catalogs:
+            changed |= catalog.refresh(force)
+        with self._lock:
+            if changed or self._kernels is None:
+                self._rebuild()
+
+    def _rebuild(self):
+        kernels = []
+        for catalog in self.catalogs:
+            for dump in sorted(catalog.all(), key=lambda dump: str(dump.path)):
+                metadata = catalog.metadata(dump.path)
+                kernels.append(KernelFile(
+                    name=dump.name,
+                    path=dump.path,
+                    version=_kernel_version(dump.name, dump.path.parent),
+                    size=dump.size,
+                    build_id=metadata.build_id if metadata else None
+                ))
+        self._kernels = kernels
+        self._by_build_id = {}
+        self._by_release = {}
+        for kernel in kernels:
+            if kernel.build_id:
+                self._by_build_id.setdefault(kernel.build_id, kernel)
+            self._by_release.setdefault(kernel.version, []).append(kernel)
+
+    def kernels(self) -> List[KernelFile]:
+        """Every indexed kernel, in search root order."""
+        self.refresh()
+        return list(self._kernels)
+
+    def lookup(self, build_id: Optional[str] = None, release: Optional[str] = None) -> Optional[KernelFile]:
+        """The kernel a dump was taken from.
+
+        A build-id match is exact.  Otherwise the first kernel of the
+        release is used, skipping files whose build-id proves them to be a
+        different build of it.
+        """
+        self.refresh()
+        with self._lock:
+            if build_id and build_id in self._by_build_id:
+                return self._by_build_id[build_id]
+            for kernel in self._by_release.get(release, []) if release else []:
+                if not build_id or not kernel.build_id:
+                    return kernel
+        return None
+
+    def dump_directory_kernels(self, directory: Path) -> List[KernelFile]:
+        """Kernel images saved directly in a crash dump's directory."""
+        directory = Path(directory)
+        try:
+            mtime = directory.stat().st_mtime_ns
+        except OSError as e:
+            logger.debug(f"Cannot access crash dump directory {directory}: {e}")
+            return []
+        with self._lock:
+            cached = self._dump_directories.get(directory)
+            if cached and cached[0] == mtime:
+                self._dump_directories.move_to_end(directory)
+                self.stats["dump_directory_hits"] += 1
+                return list(cached[1])
+
+        kernels = []
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if not any(Path(entry.name).match(pattern) for pattern in KERNEL_PATTERNS):
+                        continue
+                    try:
+                        if entry.is_file():
+                            kernels.append(KernelFile(
+                                name=entry.name,
+                                path=Path(entry.path),
+                                version=_kernel_version(entry.name, directory),
+                                size=entry.stat().st_size
+                            ))
+                    except OSError as e:
+                        logger.warning(f"Cannot access kernel file {entry.path}: {e}")
+        except OSError as e:
+            logger.warning(f"Cannot read crash dump directory {directory}: {e}")
+            return []
+        kernels.sort(key=lambda kernel: kernel.name)
+
+        with self._lock:
+            self.stats["dump_directory_scans"] += 1
+            self._dump_directories[directory] = (mtime, kernels)
+            self._dump_directories.move_to_end(directory)
+            while len(self._dump_directories) > DUMP_DIRECTORY_CACHE_SIZE:
+                self._dump_directories.popitem(last=False)
+        return list(kernels)
+
+    def get_stats(self) -> dict:
+        """Index size and refresh counters, reported by get_crash_info."""
+        return {
+            "kernels": len(self._kernels or []),
+            "with_build_id": len(self._by_build_id),
+            "dump_directories": len(self._dump_directories),
+            **self.stats,
+            "roots": [catalog.get_stats() for catalog in self.catalogs]
+        }
+
+
 class KernelDetection:
     """Detects available kernel files for crash analysis."""
 
-    def __init__(self, kernel_path: str, crash_dump_path: Optional[str] = None):
+    def __init__(self, kernel_path: str, crash_dump_path: Optional[str] = None,
+                 index: Optional[KernelIndex] = None, index_db: Optional[str] = None,
+                 debuginfod: Optional[DebuginfodClient] = None):
         self.kernel_path = Path(kernel_path)
         self.crash_dump_path = Path(crash_dump_path) if crash_dump_path else None
         self.debug_paths = [
@@ -40,21 +210,27 @@ class KernelDetection:
             Path("/usr/lib/debug/boot"),
             self.kernel_path
         ]
-        # Add crash dump directory as highest priority if provided
-        if self.crash_dump_path and self.crash_dump_path.is_file():
-            crash_dir = self.crash_dump_path.parent
-            if crash_dir not in self.debug_paths:
-                self.debug_paths.insert(0, crash_dir)
+        # Shared between detections of the same server; the crash dump
+        # directory is searched first, through the index's per-directory cache
+        self.index = index or KernelIndex(self.debug_paths, db_path=index_db)
+        self.debuginfod = debuginfod
     
-    def find_kernel_files(self) -> List[KernelFile]:
-        """Find available kernel files."""
+    def find_kernel_files(self, crash_dump_path: Optional[Path] = None) -> List[KernelFile]:
+        """Find available kernel files.
+
+        Args:
+            crash_dump_path: Dump whose directory is searched first; defaults
+                to the detection's own crash dump path
+        """
         kernels = []
-        
-        # Search in debug symbol directories first (preferred)
-        for debug_path in self.debug_paths:
-            if debug_path.exists():
-                kernels.extend(self._search_directory(debug_path))
-        
+        crash_dump_path = Path(crash_dump_path) if crash_dump_path else self.crash_dump_path
+
+        # The crash dump directory first, then the indexed debug symbol
+        # directories and KERNEL_PATH
+        if crash_dump_path:
+            kernels.extend(self.index.dump_directory_kernels(crash_dump_path.parent))
+        kernels.extend(self.index.kernels())
+
         # Remove duplicates based on version
         seen_versions = set()
         unique_kernels = []
@@ -65,125 +241,97 @@ class KernelDetection:
         
         return unique_kernels
     
-    def _search_directory(self, directory: Path) -> List[KernelFile]:
-        """Search for kernel files in a directory."""
-        kernels = []
-        
-        try:
-            for root, dirs, files in os.walk(directory):
-                root_path = Path(root)
-                
-                for file in files:
-                    file_path = root_path / file
-                    
-                    # Look for vmlinux (debug symbols) and vmlinuz (compressed kernel)
-                    if file in ["vmlinux", "vmlinuz"] or file.startswith("vmlinuz-"):
-                        version = self._extract_version(file, root_path)
-                        if version:
-                            try:
-                                stat = file_path.stat()
-                                kernel = KernelFile(
-                                    name=file,
-                                    path=file_path,
-                                    version=version,
-                                    size=stat.st_size
-                                )
-                                kernels.append(kernel)
-                            except (OSError, PermissionError) as e:
-                                logger.warning(f"Cannot access kernel file {file_path}: {e}")
-        
-        except PermissionError as e:
-            logger.warning(f"Permission denied accessing directory {directory}: {e}")
-        
-        return kernels
-    
     def _extract_version(self, filename: str, directory: Path) -> str:
         """Extract kernel version from filename or directory path."""
-        # Try to extract from filename
-        if filename.startswith("vmlinuz-"):
-            return filename[8:]  # Remove "vmlinuz-" prefix
-        
-        # Try to extract from directory path (for debug symbols)
-        path_parts = str(directory).split(os.sep)
-        for part in reversed(path_parts):
-            if re.match(r'^\d+\.\d+\.\d+', part):
-                return part
-        
-        # Fallback: use directory name if it looks like a version
-        dir_name = directory.name
-        if re.match(r'^\d+\.\d+', dir_name):
-            return dir_name
-        
-        return "unknown"
+        return _kernel_version(filename, directory)
     
-    def find_vmlinux_in_dump_directory(self) -> Optional[KernelFile]:
+    def find_vmlinux_in_dump_directory(self, crash_dump_path: Optional[Path] = None) -> Optional[KernelFile]:
         """Find vmlinux in the same directory as the crash dump.
 
         This is the highest priority search location.
 
+        Args:
+            crash_dump_path: The dump; defaults to the detection's own
+                crash dump path
+
         Returns:
             KernelFile if found, None otherwise
         """
-        logger.info(f"looking for the image in the same directory : {self.crash_dump_path}")
-        if not self.crash_dump_path or not self.crash_dump_path.is_file():
+        crash_dump_path = Path(crash_dump_path) if crash_dump_path else self.crash_dump_path
+        logger.info(f"looking for the image in the same directory : {crash_dump_path}")
+        if not crash_dump_path:
             return None
 
-        crash_dir = self.crash_dump_path.parent
-        vmlinux_path = crash_dir / "vmlinux"
-        logger.info(f"Looking for vmlinux on path: {vmlinux_path}")
-        if vmlinux_path.exists() and vmlinux_path.is_file():
-            try:
-                if os.access(vmlinux_path, os.R_OK):
-                    stat = vmlinux_path.stat()
-                    # Try to extract version from the dump directory name or use "unknown"
-                    version = self._extract_version_from_path(crash_dir)
-                    kernel = KernelFile(
-                        name="vmlinux",
-                        path=vmlinux_path,
-                        version=version,
-                        size=stat.st_size
-                    )
-                    logger.info(f"Found vmlinux in crash dump directory: {vmlinux_path}")
-                    return kernel
-            except (OSError, PermissionError) as e:
-                logger.debug(f"Cannot access vmlinux in crash directory: {e}")
+        for kernel in self.index.dump_directory_kernels(crash_dump_path.parent):
+            if kernel.name == "vmlinux" and os.access(kernel.path, os.R_OK):
+                logger.info(f"Found vmlinux in crash dump directory: {kernel.path}")
+                return kernel
 
         return None
 
-    def _extract_version_from_path(self, directory: Path) -> str:
-        """Extract kernel version from directory path."""
-        path_parts = str(directory).split(os.sep)
-        for part in reversed(path_parts):
-            if re.match(r'^\d+\.\d+\.\d+', part):
-                return part
+    def find_matching_kernel(self, crash_dump, metadata: Optional[DumpMetadata] = None) -> Optional[KernelFile]:
+        """Find a kernel file that matches the crash dump.
 
-        dir_name = directory.name
-        if re.match(r'^\d+\.\d+', dir_name):
-            return dir_name
+        Args:
+            crash_dump: The dump to find a kernel for
+            metadata: The dump's header metadata; when it names the kernel
+                build-id or release, only a kernel matching it is returned
 
-        return "unknown"
+        Returns:
+            The kernel, or None if none is available or none matches
+        """
+        crash_dump_path = getattr(crash_dump, "path", None)
 
-    def find_matching_kernel(self, crash_dump) -> Optional[KernelFile]:
-        """Find a kernel file that matches the crash dump."""
         # Priority 1: Check for vmlinux in the crash dump directory
-        kernel = self.find_vmlinux_in_dump_directory()
+        kernel = self.find_vmlinux_in_dump_directory(crash_dump_path)
         if kernel:
             return kernel
         logger.warning("No kernel in the same dir")
 
-        # Priority 2: Search standard locations
-        kernels = self.find_kernel_files()
+        # Priority 2: The indexed kernel with the dump's build-id or release
+        if metadata and (metadata.build_id or metadata.release):
+            kernel = self.index.lookup(metadata.build_id, metadata.release)
+            if not kernel and self.debuginfod and metadata.build_id:
+                # Downloaded earlier from a debuginfod server
+                kernel = self._debuginfo_kernel(metadata, self.debuginfod.lookup(metadata.build_id))
+            if kernel:
+                logger.info(f"Selected kernel: {kernel.path} (version: {kernel.version}, "
+                            f"build-id: {kernel.build_id}) matching the dump")
+                return kernel
+            logger.warning(f"No kernel found for release {metadata.release} "
+                           f"(build-id {metadata.build_id})")
+            return None
+
+        kernels = self.find_kernel_files(crash_dump_path)
 
         if not kernels:
             logger.warning("No kernel files found")
             return None
 
-        # For now, return the first available kernel
-        # In a real implementation, this would match based on dump metadata
+        # The dump's header did not name a release: take the first kernel
         kernel = kernels[0]
         logger.info(f"Selected kernel: {kernel.name} (version: {kernel.version})")
         return kernel
     
+    async def fetch_kernel(self, metadata: Optional[DumpMetadata]) -> Optional[KernelFile]:
+        """Download the dump's kernel by build-id from the debuginfod servers.
+
+        For use when find_matching_kernel found nothing locally.
+        """
+        if not self.debuginfod or not self.debuginfod.is_enabled() or not metadata or not metadata.build_id:
+            return None
+        return self._debuginfo_kernel(metadata, await self.debuginfod.fetch(metadata.build_id))
+
+    def _debuginfo_kernel(self, metadata: DumpMetadata, path: Optional[Path]) -> Optional[KernelFile]:
+        if not path:
+            return None
+        try:
+            size = path.stat().st_size
+        except OSError:
+            return None
+        return KernelFile(name=path.name, path=path, version=metadata.release or "unknown",
+                          size=size, build_id=metadata.build_id)
+
     def get_kernel_info(self, kernel: KernelFile) -> dict:
         """Get detailed information about a kernel file."""
         return {
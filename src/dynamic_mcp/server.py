@@ -12,7 +12,10 @@ import os
 import secrets
 import string
 import sys
+import time
+import weakref
 from typing import Any, Dict, List, Optional, Sequence
+from urllib.parse import unquote
 
 try:
     from dotenv import load_dotenv
@@ -20,6 +23,7 @@ except ImportError:
     def load_dotenv():
         pass
 from mcp.server import NotificationOptions, Server
+from mcp.server.lowlevel.helper_types import ReadResourceContents
 from mcp.server.models import InitializationOptions
 from mcp.server.stdio import stdio_server
 from mcp.server.sse import SseServerTransport
@@ -28,19 +32,31 @@ from mcp.types import (
     CallToolRequest,
     CallToolResult,
     ListToolsRequest,
+    Resource,
     TextContent,
     Tool,
 )
-from pydantic import BaseModel
+from pydantic import AnyUrl, BaseModel
 
 # Import crash-related modules from dynamic_mcp
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'dynamic_mcp', 'src'))
 from dynamic_mcp.config import Config, setup_logging, check_system_requirements, validate_crash_utility, ensure_crash_dump_access
+from dynamic_mcp.crash_cache import CrashResultCache
+from dynamic_mcp.crash_snapshot import CrashSessionSnapshots
 from dynamic_mcp.crash_discovery import CrashDumpDiscovery
+from dynamic_mcp.crash_fanout import FANOUT_PRESETS, plan_fanout
+from dynamic_mcp.crash_output import CrashOutputStore, OutputCollector, OutputFilter
+from dynamic_mcp.crash_parsers import PARSERS, get_parser
+from dynamic_mcp.crash_prewarm import CrashSessionPrewarmer
 from dynamic_mcp.crash_session import CrashSessionManager
+from dynamic_mcp.crash_watcher import CrashDumpWatcher
+from dynamic_mcp.crash_decompress import CrashDumpDecompressor
+from dynamic_mcp.debuginfod import DebuginfodClient
 from dynamic_mcp.kernel_detection import KernelDetection
 from dynamic_mcp.tunnel_manager import TunnelManager
 from dynamic_mcp.bpftrace_executor import BPFtraceExecutor
+from dynamic_mcp.bpftrace_jobs import BPFtraceJobManager
+from dynamic_mcp.bpftrace_parsers import BPFtraceJSONParser
 
 # Load environment variables
 try:
@@ -60,6 +76,30 @@ class CrashCommandParams(BaseModel):
     """Parameters for crash command tool."""
     command: str
     timeout: Optional[int] = 120
+    session_id: Optional[str] = None
+    stream: Optional[bool] = False
+    filter: Optional[str] = None
+    head: Optional[int] = None
+    tail: Optional[int] = None
+    max_bytes: Optional[int] = None
+    structured: Optional[bool] = False
+
+
+class CrashBatchParams(BaseModel):
+    """Parameters for crash batch tool."""
+    commands: List[str]
+    timeout: Optional[int] = 120
+    session_id: Optional[str] = None
+    stop_on_error: Optional[bool] = False
+
+
+class CrashFanoutParams(BaseModel):
+    """Parameters for crash fan-out tool."""
+    preset: Optional[str] = None
+    commands: Optional[List[str]] = None
+    replicas: Optional[int] = None
+    timeout: Optional[int] = 120
+    session_id: Optional[str] = None
 
 
 class StartSessionParams(BaseModel):
@@ -68,9 +108,65 @@ class StartSessionParams(BaseModel):
     timeout: Optional[int] = 120
 
 
+class GetCrashOutputParams(BaseModel):
+    """Parameters for get crash output tool."""
+    handle: str
+    offset: Optional[int] = None
+    length: Optional[int] = None
+    start_line: Optional[int] = None
+    end_line: Optional[int] = None
+    filter: Optional[str] = None
+    max_matches: Optional[int] = 100
+
+
+def _stored_output_schema(source: str) -> dict:
+    """Input schema of the tools that page through an output spilled by ``source``."""
+    return {
+        "type": "object",
+        "properties": {
+            "handle": {
+                "type": "string",
+                "description": f"Output handle returned by {source}"
+            },
+            "offset": {
+                "type": "integer",
+                "description": "Byte offset of the page to read (optional, default 0)"
+            },
+            "length": {
+                "type": "integer",
+                "description": "Page size in bytes (optional, default CRASH_OUTPUT_PAGE_KB)"
+            },
+            "start_line": {
+                "type": "integer",
+                "description": "First line to read, 1-based (optional)"
+            },
+            "end_line": {
+                "type": "integer",
+                "description": "Last line to read, inclusive (optional, default start_line + 999)"
+            },
+            "filter": {
+                "type": "string",
+                "description": "Return only lines matching this regex, with line numbers (optional)"
+            },
+            "max_matches": {
+                "type": "integer",
+                "description": "Maximum matching lines to return with filter (optional)",
+                "default": 100
+            }
+        },
+        "required": ["handle"]
+    }
+
+
+class CloseSessionParams(BaseModel):
+    """Parameters for close session tool."""
+    session_id: Optional[str] = None
+
+
 class ListDumpsParams(BaseModel):
     """Parameters for list dumps tool."""
     max_dumps: Optional[int] = 10
+    pattern: Optional[str] = None
 
 
 class ExecuteBPFtraceParams(BaseModel):
@@ -78,6 +174,31 @@ class ExecuteBPFtraceParams(BaseModel):
     script: str
     timeout: Optional[int] = 30
     use_sudo: Optional[bool] = True
+    stream: Optional[bool] = False
+    mode: Optional[str] = "timeout"
+    structured: Optional[bool] = False
+    priority: Optional[int] = 0
+
+
+class StartBPFtraceJobParams(BaseModel):
+    """Parameters for start BPFtrace job tool."""
+    script: str
+    timeout: Optional[int] = 300
+    use_sudo: Optional[bool] = True
+    priority: Optional[int] = 0
+
+
+class PollBPFtraceJobParams(BaseModel):
+    """Parameters for poll BPFtrace job tool."""
+    job_id: str
+    cursor: Optional[int] = 0
+    max_chars: Optional[int] = None
+
+
+class StopBPFtraceJobParams(BaseModel):
+    """Parameters for stop BPFtrace job tool."""
+    job_id: str
+    cursor: Optional[int] = 0
 
 
 class DynamicMCPServer:
@@ -86,10 +207,84 @@ class DynamicMCPServer:
     def __init__(self):
         self.config = Config()
         self.server = Server("dynamic-mcp")
-        self.crash_discovery = CrashDumpDiscovery(str(self.config.crash_dump_path))
-        self.crash_session_manager = CrashSessionManager()
-        self.kernel_detection = KernelDetection(str(self.config.kernel_path))
-        self.bpftrace_executor = BPFtraceExecutor()
+        self.crash_discovery = CrashDumpDiscovery(
+            str(self.config.crash_dump_path),
+            catalog_db=self.config.crash_catalog_db or None,
+            refresh_interval=self.config.crash_catalog_refresh_interval
+        )
+        result_cache = CrashResultCache(
+            max_bytes=self.config.crash_cache_max_mb * 1024 * 1024,
+            cache_dir=self.config.crash_cache_dir or None,
+            max_disk_bytes=self.config.crash_cache_disk_max_mb * 1024 * 1024
+        )
+        snapshots = None
+        if self.config.crash_snapshot_dir:
+            snapshots = CrashSessionSnapshots(
+                self.config.crash_snapshot_dir,
+                result_cache,
+                max_bytes=self.config.crash_snapshot_max_mb * 1024 * 1024
+            )
+        self.crash_session_manager = CrashSessionManager(
+            max_sessions=self.config.max_crash_sessions,
+            idle_timeout=self.config.crash_session_idle_timeout,
+            max_rss_mb=self.config.crash_session_max_rss_mb,
+            result_cache=result_cache,
+            snapshots=snapshots
+        )
+        self.debuginfod = DebuginfodClient(
+            self.config.debuginfod_urls,
+            self.config.debuginfod_cache_dir,
+            max_bytes=self.config.debuginfod_cache_max_mb * 1024 * 1024,
+            timeout=self.config.debuginfod_timeout
+        )
+        self.kernel_detection = KernelDetection(
+            str(self.config.kernel_path),
+            index_db=self.config.kernel_index_db or None,
+            debuginfod=self.debuginfod
+        )
+        self.output_store = CrashOutputStore(
+            self.config.crash_output_dir or None,
+            ttl=self.config.crash_output_ttl,
+            max_bytes=self.config.crash_output_max_mb * 1024 * 1024
+        )
+        self.decompressor = CrashDumpDecompressor(
+            self.config.crash_decompress_dir or None,
+            max_bytes=self.config.crash_decompress_max_mb * 1024 * 1024,
+            max_concurrent=self.config.crash_decompress_workers
+        )
+        self.prewarmer: Optional[CrashSessionPrewarmer] = None
+        if self.config.prewarm_crash_sessions:
+            self.prewarmer = CrashSessionPrewarmer(
+                self.crash_discovery,
+                self.crash_session_manager,
+                self.kernel_detection,
+                decompressor=self.decompressor,
+                max_concurrent=self.config.prewarm_max_concurrent,
+                scan_interval=self.config.prewarm_scan_interval,
+                timeout=self.config.session_init_timeout,
+                max_dumps=self.config.max_crash_dumps
+            )
+        self.crash_watcher: Optional[CrashDumpWatcher] = None
+        if self.config.watch_crash_dumps:
+            self.crash_watcher = CrashDumpWatcher(
+                self.crash_discovery.catalog,
+                on_change=self._on_crash_dumps_changed,
+                on_dump_complete=self._on_crash_dump_complete
+            )
+        # MCP client sessions to push list-changed notifications to
+        self._mcp_sessions = weakref.WeakSet()
+        self.bpftrace_executor = BPFtraceExecutor(
+            max_concurrent=self.config.bpftrace_max_concurrent,
+            max_queued=self.config.bpftrace_max_queued,
+            max_per_client=self.config.bpftrace_max_per_client,
+            queue_timeout=self.config.bpftrace_queue_timeout
+        )
+        self.bpftrace_jobs = BPFtraceJobManager(
+            self.bpftrace_executor,
+            max_jobs=self.config.bpftrace_max_jobs,
+            buffer_chars=self.config.bpftrace_job_buffer_kb * 1024,
+            retention=self.config.bpftrace_job_retention
+        )
 
         # Generate unique, secure MCP server name
         self.mcp_server_name = self._generate_secure_server_name()
@@ -105,6 +300,25 @@ class DynamicMCPServer:
         self.tunnel_manager: Optional[TunnelManager] = None
         self.enable_reverse_connection = os.getenv("ENABLE_REVERSE_CONNECTION", "false").lower() == "true"
 
+        # Tool name -> handler, shared by MCP call_tool and /api/mcp/request
+        self._tool_handlers = {
+            "crash_command": self._handle_crash_command,
+            "crash_batch": self._handle_crash_batch,
+            "crash_fanout": self._handle_crash_fanout,
+            "get_crash_output": self._handle_get_crash_output,
+            "get_crash_info": self._handle_get_crash_info,
+            "list_crash_dumps": self._handle_list_crash_dumps,
+            "start_crash_session": self._handle_start_crash_session,
+            "close_crash_session": self._handle_close_crash_session,
+            "list_crash_sessions": self._handle_list_crash_sessions,
+            "execute_bpftrace_script": self._handle_execute_bpftrace_script,
+            "get_bpftrace_output": self._handle_get_bpftrace_output,
+            "get_bpftrace_info": self._handle_get_bpftrace_info,
+            "start_bpftrace_job": self._handle_start_bpftrace_job,
+            "poll_bpftrace_job": self._handle_poll_bpftrace_job,
+            "stop_bpftrace_job": self._handle_stop_bpftrace_job,
+        }
+
         self._setup_tools()
 
     def _generate_secure_server_name(self) -> str:
@@ -156,134 +370,419 @@ class DynamicMCPServer:
         @self.server.list_tools()
         async def handle_list_tools() -> List[Tool]:
             """List available tools."""
-            return [
-                Tool(
-                    name="crash_command",
-                    description="Execute a command in the crash utility session",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {
-                            "command": {
-                                "type": "string",
-                                "description": "The crash command to execute"
-                            },
-                            "timeout": {
-                                "type": "integer",
-                                "description": "Command timeout in seconds (optional, default 120s for large dumps)",
-                                "default": 120
-                            }
-                        },
-                        "required": ["command"]
-                    }
-                ),
-                Tool(
-                    name="get_crash_info",
-                    description="Get information about the current crash dump and session",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {},
-                        "required": []
-                    }
-                ),
-                Tool(
-                    name="list_crash_dumps",
-                    description="List all available crash dumps",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {
-                            "max_dumps": {
-                                "type": "integer",
-                                "description": "Maximum number of dumps to return (optional)",
-                                "default": 10
-                            }
-                        },
-                        "required": []
-                    }
-                ),
-                Tool(
-                    name="start_crash_session",
-                    description="Start a new crash session with a specific dump",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {
-                            "dump_name": {
-                                "type": "string",
-                                "description": "Name of the crash dump file (optional, uses latest if not specified)"
-                            },
-                            "timeout": {
-                                "type": "integer",
-                                "description": "Session timeout in seconds (optional, default 120s for large dumps)",
-                                "default": 120
-                            }
-                        },
-                        "required": []
-                    }
-                ),
-                Tool(
-                    name="close_crash_session",
-                    description="Close the current crash session",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {},
-                        "required": []
-                    }
-                ),
-                Tool(
-                    name="execute_bpftrace_script",
-                    description="Execute a BPFtrace script for system tracing and analysis",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {
-                            "script": {
-                                "type": "string",
-                                "description": "BPFtrace script content"
-                            },
-                            "timeout": {
-                                "type": "integer",
-                                "description": "Script execution timeout in seconds (optional, default 30s)",
-                                "default": 30
-                            },
-                            "use_sudo": {
-                                "type": "boolean",
-                                "description": "Whether to use sudo for execution (optional, default true)",
-                                "default": True
-                            }
-                        },
-                        "required": ["script"]
-                    }
-                ),
-                Tool(
-                    name="get_bpftrace_info",
-                    description="Get information about BPFtrace availability and version",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {},
-                        "required": []
-                    }
-                )
-            ]
+            self._remember_session()
+            return self._get_tool_definitions()
 
         @self.server.call_tool()
         async def handle_call_tool(
             name: str, arguments: Dict[str, Any]
         ) -> Sequence[TextContent]:
             """Handle tool calls."""
-            if name == "crash_command":
-                return await self._handle_crash_command(arguments)
-            elif name == "get_crash_info":
-                return await self._handle_get_crash_info(arguments)
-            elif name == "list_crash_dumps":
-                return await self._handle_list_crash_dumps(arguments)
-            elif name == "start_crash_session":
-                return await self._handle_start_crash_session(arguments)
-            elif name == "close_crash_session":
-                return await self._handle_close_crash_session(arguments)
-            elif name == "execute_bpftrace_script":
-                return await self._handle_execute_bpftrace_script(arguments)
-            elif name == "get_bpftrace_info":
-                return await self._handle_get_bpftrace_info(arguments)
-            else:
+            self._remember_session()
+            handler = self._tool_handlers.get(name)
+            if handler is None:
                 raise ValueError(f"Unknown tool: {name}")
+            return await handler(arguments)
+
+        @self.server.list_resources()
+        async def handle_list_resources() -> List[Resource]:
+            """List crash dumps as resources, newest first."""
+            self._remember_session()
+            dumps = await asyncio.to_thread(self.crash_discovery.find_crash_dumps, self.config.max_crash_dumps)
+            return [
+                Resource(
+                    uri=AnyUrl(f"crash-dump://{dump.path}"),
+                    name=dump.name,
+                    description=f"Crash dump {dump.path} ({dump.size:,} bytes, modified {dump.mtime})",
+                    mimeType="application/json",
+                    size=dump.size
+                )
+                for dump in dumps
+            ]
+
+        @self.server.read_resource()
+        async def handle_read_resource(uri: AnyUrl) -> List[ReadResourceContents]:
+            """Describe one crash dump."""
+            self._remember_session()
+            if uri.scheme != "crash-dump" or not uri.path:
+                raise ValueError(f"Unknown resource: {uri}")
+            path = unquote(uri.path)
+            await asyncio.to_thread(self.crash_discovery.catalog.refresh)
+            dump = self.crash_discovery.catalog.get(path)
+            if dump is None:
+                raise ValueError(f"Crash dump not found: {path}")
+            metadata = await asyncio.to_thread(self.crash_discovery.get_dump_metadata, dump)
+            info = {**dump.to_dict(), "metadata": metadata.to_dict()}
+            return [ReadResourceContents(content=json.dumps(info, indent=2), mime_type="application/json")]
+
+    def _remember_session(self):
+        """Record the requesting MCP session for list-changed notifications."""
+        try:
+            self._mcp_sessions.add(self.server.request_context.session)
+        except LookupError:
+            # Called outside an MCP request (/api/mcp/request)
+            pass
+
+    def _on_crash_dumps_changed(self):
+        """Watcher callback: dumps appeared or disappeared."""
+        asyncio.ensure_future(self._notify_resource_list_changed())
+
+    async def _notify_resource_list_changed(self):
+        """Tell every connected client to re-list crash dump resources."""
+        for session in list(self._mcp_sessions):
+            try:
+                await session.send_resource_list_changed()
+            except Exception as e:
+                logger.debug(f"Dropping MCP session from notifications: {e}")
+                self._mcp_sessions.discard(session)
+
+    def _on_crash_dump_complete(self, dump):
+        """Watcher callback: kdump finished writing a dump."""
+        logger.info(f"Crash dump complete: {dump.path} ({dump.size:,} bytes)")
+        if self.prewarmer:
+            self.prewarmer.dump_completed(dump)
+
+    def _get_tool_definitions(self) -> List[Tool]:
+        """Definitions of every tool, shared by list_tools and /api/tools."""
+        return [
+            Tool(
+                name="crash_command",
+                description="Execute a command in the crash utility session",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "command": {
+                            "type": "string",
+                            "description": "The crash command to execute"
+                        },
+                        "timeout": {
+                            "type": "integer",
+                            "description": "Command timeout in seconds (optional, default 120s for large dumps)",
+                            "default": 120
+                        },
+                        "session_id": {
+                            "type": "string",
+                            "description": "Crash session to run the command in (optional, defaults to the current session)"
+                        },
+                        "stream": {
+                            "type": "boolean",
+                            "description": "Send output as progress notifications while it is produced "
+                                           "(optional, requires a progress token)",
+                            "default": False
+                        },
+                        "filter": {
+                            "type": "string",
+                            "description": "Only return output lines matching this regex (optional)"
+                        },
+                        "head": {
+                            "type": "integer",
+                            "description": "Only return the first N (matching) lines; crash output past them is "
+                                           "discarded without being read into the response (optional)"
+                        },
+                        "tail": {
+                            "type": "integer",
+                            "description": "Only return the last N (matching) lines (optional)"
+                        },
+                        "max_bytes": {
+                            "type": "integer",
+                            "description": "Stop returning output after this many bytes (optional)"
+                        },
+                        "structured": {
+                            "type": "boolean",
+                            "description": "Return the output parsed into JSON (optional; supported for "
+                                           f"{', '.join(PARSERS)})",
+                            "default": False
+                        }
+                    },
+                    "required": ["command"]
+                }
+            ),
+            Tool(
+                name="crash_batch",
+                description="Execute several crash commands back-to-back in one call and return "
+                            "per-command results with timings",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "commands": {
+                            "type": "array",
+                            "items": {"type": "string"},
+                            "description": "Crash commands to execute, in order"
+                        },
+                        "timeout": {
+                            "type": "integer",
+                            "description": "Timeout per command in seconds (optional)",
+                            "default": 120
+                        },
+                        "session_id": {
+                            "type": "string",
+                            "description": "Crash session to run the commands in (optional, defaults to the current session)"
+                        },
+                        "stop_on_error": {
+                            "type": "boolean",
+                            "description": "Skip the remaining commands after the first failing one (optional)",
+                            "default": False
+                        }
+                    },
+                    "required": ["commands"]
+                }
+            ),
+            Tool(
+                name="crash_fanout",
+                description="Run a whole-dump sweep split into read-only shards on parallel crash "
+                            "processes for the same dump, with the outputs merged in order",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "preset": {
+                            "type": "string",
+                            "enum": list(FANOUT_PRESETS),
+                            "description": "Sweep to shard: bt_per_cpu (bt -c N for every CPU), "
+                                           "bt_per_pid (bt over PID ranges from ps) or "
+                                           "kmem_per_slab (kmem -S for every slab cache)"
+                        },
+                        "commands": {
+                            "type": "array",
+                            "items": {"type": "string"},
+                            "description": "Explicit read-only commands to spread instead of a preset"
+                        },
+                        "replicas": {
+                            "type": "integer",
+                            "description": "Number of crash processes to use (optional, default CRASH_FANOUT_REPLICAS)"
+                        },
+                        "timeout": {
+                            "type": "integer",
+                            "description": "Timeout per command in seconds (optional)",
+                            "default": 120
+                        },
+                        "session_id": {
+                            "type": "string",
+                            "description": "Crash session to fan out from (optional, defaults to the current session)"
+                        }
+                    }
+                }
+            ),
+            Tool(
+                name="get_crash_output",
+                description="Read more of a large crash_command output by handle: a byte page, "
+                            "a line range, or the lines matching a regex",
+                inputSchema=_stored_output_schema("crash_command")
+            ),
+            Tool(
+                name="get_crash_info",
+                description="Get information about the current crash dump and session",
+                inputSchema={
+                    "type": "object",
+                    "properties": {},
+                    "required": []
+                }
+            ),
+            Tool(
+                name="list_crash_dumps",
+                description="List all available crash dumps",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "max_dumps": {
+                            "type": "integer",
+                            "description": "Maximum number of dumps to return (optional)",
+                            "default": 10
+                        },
+                        "pattern": {
+                            "type": "string",
+                            "description": "Only dumps matching this file name, path or glob, "
+                                           "e.g. 'vmcore', '127.0.0.1-2024-*/vmcore' (optional)"
+                        }
+                    },
+                    "required": []
+                }
+            ),
+            Tool(
+                name="start_crash_session",
+                description="Start a new crash session with a specific dump",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "dump_name": {
+                            "type": "string",
+                            "description": "Name or path of the crash dump file, e.g. "
+                                           "'127.0.0.1-2024-05-01-10:00:00/vmcore' when several share a "
+                                           "name (optional, uses latest if not specified)"
+                        },
+                        "timeout": {
+                            "type": "integer",
+                            "description": "Session timeout in seconds (optional, default 120s for large dumps)",
+                            "default": 120
+                        }
+                    },
+                    "required": []
+                }
+            ),
+            Tool(
+                name="close_crash_session",
+                description="Close the current crash session",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "session_id": {
+                            "type": "string",
+                            "description": "Crash session to close (optional, defaults to the current session)"
+                        }
+                    },
+                    "required": []
+                }
+            ),
+            Tool(
+                name="list_crash_sessions",
+                description="List the crash sessions kept open in the session pool",
+                inputSchema={
+                    "type": "object",
+                    "properties": {},
+                    "required": []
+                }
+            ),
+            Tool(
+                name="execute_bpftrace_script",
+                description="Execute a BPFtrace script for system tracing and analysis",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "script": {
+                            "type": "string",
+                            "description": "BPFtrace script content"
+                        },
+                        "timeout": {
+                            "type": "integer",
+                            "description": "Script execution timeout in seconds (optional, default 30s)",
+                            "default": 30
+                        },
+                        "mode": {
+                            "type": "string",
+                            "enum": ["timeout", "duration"],
+                            "description": "\"timeout\" stops an overrunning script as an error (exit code 124); "
+                                           "\"duration\" traces for timeout seconds, then stops the script "
+                                           "with SIGINT and returns the maps it prints (optional, default timeout)",
+                            "default": "timeout"
+                        },
+                        "use_sudo": {
+                            "type": "boolean",
+                            "description": "Whether to use sudo for execution (optional, default true)",
+                            "default": True
+                        },
+                        "stream": {
+                            "type": "boolean",
+                            "description": "Send output as progress notifications while the script runs "
+                                           "(optional, requires a progress token)",
+                            "default": False
+                        },
+                        "structured": {
+                            "type": "boolean",
+                            "description": "Run with JSON output and return printf lines, maps, histograms "
+                                           "and stats as compact JSON instead of text (optional, default false)",
+                            "default": False
+                        },
+                        "priority": {
+                            "type": "integer",
+                            "description": "Queue priority when BPFTRACE_MAX_CONCURRENT scripts are already "
+                                           "running; higher runs first (optional, default 0)",
+                            "default": 0
+                        }
+                    },
+                    "required": ["script"]
+                }
+            ),
+            Tool(
+                name="get_bpftrace_output",
+                description="Read more of a large execute_bpftrace_script output by handle: a byte page, "
+                            "a line range, or the lines matching a regex",
+                inputSchema=_stored_output_schema("execute_bpftrace_script")
+            ),
+            Tool(
+                name="get_bpftrace_info",
+                description="Get information about BPFtrace availability and version",
+                inputSchema={
+                    "type": "object",
+                    "properties": {},
+                    "required": []
+                }
+            ),
+            Tool(
+                name="start_bpftrace_job",
+                description="Start a BPFtrace script in the background and return a job id to poll",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "script": {
+                            "type": "string",
+                            "description": "BPFtrace script content"
+                        },
+                        "timeout": {
+                            "type": "integer",
+                            "description": "Seconds after which the job is stopped with SIGINT, keeping its "
+                                           "final maps (optional, default 300s, at most BPFTRACE_JOB_MAX_DURATION)",
+                            "default": 300
+                        },
+                        "use_sudo": {
+                            "type": "boolean",
+                            "description": "Whether to use sudo for execution (optional, default true)",
+                            "default": True
+                        },
+                        "priority": {
+                            "type": "integer",
+                            "description": "Queue priority when BPFTRACE_MAX_CONCURRENT scripts are already "
+                                           "running; higher runs first (optional, default 0)",
+                            "default": 0
+                        }
+                    },
+                    "required": ["script"]
+                }
+            ),
+            Tool(
+                name="poll_bpftrace_job",
+                description="Get a background BPFtrace job's status and the output printed since a cursor",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "job_id": {
+                            "type": "string",
+                            "description": "Job id from start_bpftrace_job"
+                        },
+                        "cursor": {
+                            "type": "integer",
+                            "description": "Return output from this position, the cursor of the previous poll "
+                                           "(optional, default 0)",
+                            "default": 0
+                        },
+                        "max_chars": {
+                            "type": "integer",
+                            "description": "Most characters of output to return "
+                                           "(optional, default CRASH_OUTPUT_PAGE_KB * 1024)"
+                        }
+                    },
+                    "required": ["job_id"]
+                }
+            ),
+            Tool(
+                name="stop_bpftrace_job",
+                description="Stop a background BPFtrace job with SIGINT and return its final output and maps",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "job_id": {
+                            "type": "string",
+                            "description": "Job id from start_bpftrace_job"
+                        },
+                        "cursor": {
+                            "type": "integer",
+                            "description": "Return output from this position, the cursor of the last poll "
+                                           "(optional, default 0)",
+                            "default": 0
+                        }
+                    },
+                    "required": ["job_id"]
+                }
+            )
+        ]
 
     async def _handle_crash_command(self, arguments: Dict[str, Any]) -> Sequence[TextContent]:
         """Handle crash command execution."""
@@ -292,30 +791,311 @@ class DynamicMCPServer:
 
             logger.info(f"Executing crash command: {params.command}")
 
-            # Ensure we have an active session
+            output_filter = None
+            if any(value is not None for value in (params.filter, params.head, params.tail, params.max_bytes)):
+                output_filter = OutputFilter(params.filter, params.head, params.tail, params.max_bytes)
+
+            error = await self._ensure_crash_session(params.session_id)
+            if error:
+                return [TextContent(type="text", text=f"Error: {error}")]
+
+            return await self._run_crash_command(params, output_filter)
+
+        except Exception as e:
+            logger.error(f"Error handling crash command: {e}")
+            return [TextContent(type="text", text=f"Error: {str(e)}")]
+
+    async def _ensure_crash_session(self, session_id: Optional[str]) -> Optional[str]:
+        """Make sure the named session exists, or start one for the latest dump.
+
+        Returns:
+            An error message, or None if a session is ready
+        """
+        if session_id:
+            if not self.crash_session_manager.is_session_active(session_id):
+                return f"No active crash session with id '{session_id}'"
+            return None
+
+        if not self.crash_session_manager.is_session_active():
+            # Try to start a session with the latest crash dump
+            await self._handle_start_crash_session({})
+
             if not self.crash_session_manager.is_session_active():
-                # Try to start a session with the latest crash dump
-                await self._handle_start_crash_session({})
+                return "No active crash session and could not start one"
+        return None
 
-                if not self.crash_session_manager.is_session_active():
-                    return [TextContent(
-                        type="text",
-                        text="Error: No active crash session and could not start one"
-                    )]
+    async def _handle_crash_batch(self, arguments: Dict[str, Any]) -> Sequence[TextContent]:
+        """Handle executing a batch of crash commands."""
+        try:
+            params = CrashBatchParams(**arguments)
+            if not params.commands:
+                return [TextContent(type="text", text="Error: No commands given")]
 
-            # Execute the command
-            output, error, return_code = self.crash_session_manager.execute_command(params.command, params.timeout)
+            logger.info(f"Executing crash batch of {len(params.commands)} commands")
 
-            # Format the result
-            if return_code == 0:
-                result_text = output if output else "Command executed successfully (no output)"
-            else:
-                result_text = f"Command failed (exit code {return_code})\nOutput: {output}\nError: {error}"
+            error = await self._ensure_crash_session(params.session_id)
+            if error:
+                return [TextContent(type="text", text=f"Error: {error}")]
+
+            started = time.monotonic()
+            results, error = await self.crash_session_manager.execute_batch_async(
+                params.commands, params.timeout, session_id=params.session_id,
+                stop_on_error=params.stop_on_error
+            )
+            if results is None:
+                return [TextContent(type="text", text=f"Error: {error}")]
+
+            # Large outputs go to the output store, as for crash_command
+            page_bytes = self.config.crash_output_page_kb * 1024
+            for result in results:
+                collector = OutputCollector(self.output_store, result["command"], page_bytes,
+                                            session_id=params.session_id)
+                await collector.write_async(result["output"])
+                output, stored = await collector.finish_async()
+                result["output"] = output.strip()
+                if stored:
+                    result["output_handle"] = stored.handle
+                    result["output_bytes"] = stored.size
+
+            batch = {
+                "commands": len(params.commands),
+                "completed": len(results),
+                "failed": sum(1 for result in results if result["return_code"] != 0),
+                "stopped_on_error": len(results) < len(params.commands),
+                "duration": round(time.monotonic() - started, 4),
+                "results": results
+            }
+            return [TextContent(type="text", text=json.dumps(batch, indent=2))]
 
+        except Exception as e:
+            logger.error(f"Error handling crash batch: {e}")
+            return [TextContent(type="text", text=f"Error: {str(e)}")]
+
+    def _get_client_id(self) -> str:
+        """Identify the requesting client, for per-client limits."""
+        try:
+            session = self.server.request_context.session
+        except LookupError:
+            # Not inside an MCP request (e.g. /api/mcp/request)
+            return "http"
+        client_info = session.client_params.clientInfo if session.client_params else None
+        name = client_info.name if client_info else "mcp"
+        return f"{name}-{id(session):x}"
+
+    def _get_progress_reporter(self):
+        """Return a coroutine function sending progress notifications, if the caller asked for them."""
+        try:
+            ctx = self.server.request_context
+        except LookupError:
+            # Not inside an MCP request (e.g. /api/mcp/request)
+            return None
+        token = ctx.meta.progressToken if ctx.meta else None
+        if token is None:
+            return None
+
+        async def report(progress: float, message: str):
+            await ctx.session.send_progress_notification(
+                token, progress, message=message, related_request_id=ctx.request_id
+            )
+        return report
+
+    async def _run_crash_command(self, params: CrashCommandParams,
+                                 output_filter: Optional[OutputFilter] = None) -> Sequence[TextContent]:
+        """Run a crash command, reading its output in chunks.
+
+        Chunks pass through ``output_filter`` first, so lines it drops are
+        never collected, and with ``structured`` into a parser instead of
+        the collector; once it is satisfied (``head`` or ``max_bytes``
+        reached) the rest of the output is discarded by the session worker.
+        With ``stream`` and a progress token, every chunk is also relayed as
+        a progress notification.  Output larger than one page is spilled to
+        the output store, and the result holds the first page plus a handle
+        for get_crash_output, so neither the server nor the response grows
+        with the output size.
+        """
+        page_bytes = self.config.crash_output_page_kb * 1024
+        # Execute the command on the session's worker thread so other
+        # requests keep being served while crash is busy
+        stream, error = await self.crash_session_manager.stream_command_async(
+            params.command, params.timeout, session_id=params.session_id,
+            chunk_size=self.config.crash_stream_chunk_kb * 1024
+        )
+        if stream is None:
+            return [TextContent(type="text", text=f"Command failed (exit code 1)\nOutput: \nError: {error}")]
+
+        report = self._get_progress_reporter() if params.stream else None
+        parser = get_parser(params.command) if params.structured else None
+        collector = OutputCollector(self.output_store, params.command, page_bytes,
+                                    session_id=params.session_id)
+        notifications = 0
+        try:
+            async for chunk in stream:
+                if output_filter:
+                    chunk = output_filter.feed(chunk)
+                if parser:
+                    parser.feed_text(chunk)
+                else:
+                    await collector.write_async(chunk)
+                if report and chunk:
+                    await report(stream.bytes_read, chunk)
+                    notifications += 1
+                if output_filter and output_filter.done:
+                    break
+            if output_filter:
+                remainder = output_filter.flush()
+                if parser:
+                    parser.feed_text(remainder)
+                else:
+                    await collector.write_async(remainder)
+            if parser:
+                await collector.write_async(json.dumps(parser.result(), separators=(",", ":")))
+        except BaseException:
+            collector.abort()
+            raise
+        output, stored = await collector.finish_async()
+        output = output.strip()
+        # Reading stopped early: the command did not fail in the lines read
+        return_code = 0 if stream.return_code is None else stream.return_code
+
+        if stored:
+            output += (
+                f"\n\n[Output truncated: showing the first {len(output.encode('utf-8')):,} of "
+                f"{stored.size:,} bytes ({stored.lines:,} lines). Use get_crash_output with "
+                f"handle \"{stored.handle}\" to read more or filter it.]"
+            )
+
+        if output_filter and output_filter.describe():
+            output = f"{output}\n\n{output_filter.describe()}".strip()
+        if params.structured and not parser:
+            output = f"{output}\n\n[No structured parser for this command; returned as text]".strip()
+
+        # Format the result
+        if return_code == 0:
+            result_text = output if output else "Command executed successfully (no output)"
+        else:
+            result_text = f"Command failed (exit code {return_code})\nOutput: {output}\nError: {stream.error}"
+
+        if report:
+            ttfb = stream.time_to_first_byte
+            result_text = (
+                f"Streamed {stream.bytes_read:,} bytes in {notifications} progress notifications "
+                f"(time to first byte: {f'{ttfb:.3f}s' if ttfb is not None else 'n/a'})\n{result_text}"
+            )
+
+        return [TextContent(type="text", text=result_text)]
+
+    async def _handle_crash_fanout(self, arguments: Dict[str, Any]) -> Sequence[TextContent]:
+        """Handle fanning a sweep out over replica crash sessions."""
+        try:
+            params = CrashFanoutParams(**arguments)
+            if bool(params.preset) == bool(params.commands):
+                return [TextContent(type="text", text="Error: Give either a preset or a list of commands")]
+            replicas = params.replicas or self.config.crash_fanout_replicas
+
+            error = await self._ensure_crash_session(params.session_id)
+            if error:
+                return [TextContent(type="text", text=f"Error: {error}")]
+
+            commands = params.commands
+            if params.preset:
+                if params.preset not in FANOUT_PRESETS:
+                    raise ValueError(f"Unknown fan-out preset '{params.preset}' "
+                                     f"(available: {', '.join(FANOUT_PRESETS)})")
+                probe, _ = FANOUT_PRESETS[params.preset]
+                output, error, return_code = await self.crash_session_manager.execute_command_async(
+                    probe, params.timeout, session_id=params.session_id
+                )
+                if return_code != 0:
+                    return [TextContent(type="text", text=f"Error: '{probe}' failed: {error}")]
+                # Several shards per process let fast ones pick up the slack
+                commands = plan_fanout(params.preset, output, replicas * 4)
+                if not commands:
+                    return [TextContent(type="text", text=f"Error: '{probe}' output gave nothing to fan out")]
+
+            logger.info(f"Fanning out {len(commands)} crash commands over up to {replicas} sessions")
+
+            started = time.monotonic()
+            results, used, error = await self.crash_session_manager.execute_fanout_async(
+                commands, params.timeout, session_id=params.session_id, replicas=replicas
+            )
+            if results is None:
+                return [TextContent(type="text", text=f"Error: {error}")]
+            elapsed = time.monotonic() - started
+
+            # Merge in command order; large sweeps are paged like crash_command
+            collector = OutputCollector(self.output_store, params.preset or commands[0],
+                                        self.config.crash_output_page_kb * 1024,
+                                        session_id=params.session_id)
+            for result in results:
+                if result["return_code"] == 0:
+                    await collector.write_async(result["output"].strip() + "\n")
+                else:
+                    await collector.write_async(
+                        f"Command failed: {result['command']}\nError: {result['error'].strip()}\n"
+                    )
+            output, stored = await collector.finish_async()
+
+            failed = sum(1 for result in results if result["return_code"] != 0)
+            result_text = (
+                f"Ran {len(results)} commands on {used} crash sessions in {elapsed:.2f}s "
+                f"({failed} failed)\n\n{output.strip()}"
+            )
+            if stored:
+                result_text += (
+                    f"\n\n[Output truncated: showing the first page of {stored.size:,} bytes "
+                    f"({stored.lines:,} lines). Use get_crash_output with handle "
+                    f"\"{stored.handle}\" to read more or filter it.]"
+                )
             return [TextContent(type="text", text=result_text)]
 
         except Exception as e:
-            logger.error(f"Error handling crash command: {e}")
+            logger.error(f"Error handling crash fan-out: {e}")
+            return [TextContent(type="text", text=f"Error: {str(e)}")]
+
+    async def _handle_get_crash_output(self, arguments: Dict[str, Any]) -> Sequence[TextContent]:
+        """Handle reading a page of a stored crash output."""
+        return await self._read_stored_output(arguments, "crash")
+
+    async def _handle_get_bpftrace_output(self, arguments: Dict[str, Any]) -> Sequence[TextContent]:
+        """Handle reading a page of a stored bpftrace output."""
+        return await self._read_stored_output(arguments, "bpftrace")
+
+    async def _read_stored_output(self, arguments: Dict[str, Any], kind: str) -> Sequence[TextContent]:
+        """Read a page, line range or regex matches of a stored crash or bpftrace output."""
+        try:
+            params = GetCrashOutputParams(**arguments)
+
+            stored = self.output_store.get(params.handle)
+            if stored and stored.kind != kind:
+                # Each tool pages through its own outputs only
+                stored = None
+            if not stored:
+                return [TextContent(type="text", text=f"Error: Unknown or expired output handle '{params.handle}'")]
+
+            if params.filter:
+                start = params.start_line or 1
+                matches, next_line = await asyncio.to_thread(
+                    stored.grep, params.filter, start, params.max_matches
+                )
+                text = "\n".join(f"{line_no}: {line}" for line_no, line in matches)
+                footer = f"[{len(matches)} matching lines from line {start} of {stored.lines:,}"
+                footer += f"; continue with start_line {next_line}]" if next_line else "; end of output]"
+            elif params.start_line:
+                end = params.end_line or params.start_line + 999
+                text, next_line = await asyncio.to_thread(stored.read_lines, params.start_line, end)
+                footer = f"[lines {params.start_line}-{min(end, stored.lines)} of {stored.lines:,}"
+                footer += f"; continue with start_line {next_line}]" if next_line else "; end of output]"
+            else:
+                offset = params.offset or 0
+                length = params.length or self.config.crash_output_page_kb * 1024
+                text, next_offset = await asyncio.to_thread(stored.read_page, offset, length)
+                footer = f"[bytes {offset:,}-{(next_offset or stored.size):,} of {stored.size:,}"
+                footer += f"; continue with offset {next_offset}]" if next_offset else "; end of output]"
+
+            return [TextContent(type="text", text=f"{text.rstrip()}\n{footer}" if text.strip() else footer)]
+
+        except Exception as e:
+            logger.error(f"Error reading {kind} output: {e}")
             return [TextContent(type="text", text=f"Error: {str(e)}")]
 
     async def _handle_get_crash_info(self, arguments: Dict[str, Any]) -> Sequence[TextContent]:
@@ -330,12 +1110,30 @@ class DynamicMCPServer:
             else:
                 info["session"] = {"is_active": False}
 
+            if self.prewarmer:
+                info["prewarm"] = self.prewarmer.get_stats()
+            if self.crash_watcher:
+                info["dump_watcher"] = self.crash_watcher.get_stats()
+
+            info["output_store"] = self.output_store.get_stats()
+            info["decompression"] = self.decompressor.get_stats()
+            if self.crash_session_manager.snapshots:
+                info["snapshots"] = self.crash_session_manager.snapshots.get_stats()
+            info["dump_catalog"] = self.crash_discovery.catalog.get_stats()
+            info["kernel_index"] = self.kernel_detection.index.get_stats()
+            if self.debuginfod.is_enabled():
+                info["debuginfod"] = self.debuginfod.get_stats()
+
+            result_cache = self.crash_session_manager.result_cache
+            if result_cache and result_cache.is_enabled():
+                info["result_cache"] = result_cache.get_stats()
+
             # Get available crash dumps
-            crash_dumps = self.crash_discovery.find_crash_dumps()
+            crash_dumps = await asyncio.to_thread(self.crash_discovery.find_crash_dumps)
             info["available_dumps"] = [dump.to_dict() for dump in crash_dumps[:5]]
 
             # Get available kernels
-            kernels = self.kernel_detection.find_kernel_files()
+            kernels = await asyncio.to_thread(self.kernel_detection.find_kernel_files)
             info["available_kernels"] = [kernel.to_dict() for kernel in kernels[:5]]
 
             return [TextContent(type="text", text=json.dumps(info, indent=2))]
@@ -349,7 +1147,10 @@ class DynamicMCPServer:
         try:
             params = ListDumpsParams(**arguments)
 
-            crash_dumps = self.crash_discovery.find_crash_dumps()
+            if params.pattern:
+                crash_dumps = await asyncio.to_thread(self.crash_discovery.search_crash_dumps, params.pattern)
+            else:
+                crash_dumps = await asyncio.to_thread(self.crash_discovery.find_crash_dumps, params.max_dumps)
 
             if not crash_dumps:
                 return [TextContent(type="text", text="No crash dumps found")]
@@ -357,13 +1158,22 @@ class DynamicMCPServer:
             # Limit results
             crash_dumps = crash_dumps[:params.max_dumps]
 
+            # Reading metadata may open each dump: do them all in one worker thread
+            metadata_list = await asyncio.to_thread(
+                lambda: [self.crash_discovery.get_dump_metadata(dump) for dump in crash_dumps])
+
             # Format output
             output = f"Found {len(crash_dumps)} crash dumps:\n\n"
-            for i, dump in enumerate(crash_dumps, 1):
+            for i, (dump, metadata) in enumerate(zip(crash_dumps, metadata_list), 1):
                 output += f"{i}. {dump.name}\n"
                 output += f"   Path: {dump.path}\n"
                 output += f"   Size: {dump.size:,} bytes\n"
-                output += f"   Modified: {dump.mtime}\n\n"
+                output += f"   Modified: {dump.mtime}\n"
+                if metadata.release:
+                    output += f"   Kernel: {metadata.release}\n"
+                if metadata.panic:
+                    output += f"   Panic: {metadata.panic}\n"
+                output += "\n"
 
             return [TextContent(type="text", text=output)]
 
@@ -377,12 +1187,17 @@ class DynamicMCPServer:
             params = StartSessionParams(**arguments)
 
             # Find crash dump
+            note = ""
             if params.dump_name:
-                crash_dump = self.crash_discovery.get_crash_dump_by_name(params.dump_name)
-                if not crash_dump:
+                matches = await asyncio.to_thread(self.crash_discovery.search_crash_dumps, params.dump_name)
+                if not matches:
                     return [TextContent(type="text", text=f"Error: Crash dump '{params.dump_name}' not found")]
+                crash_dump = matches[0]
+                if len(matches) > 1:
+                    note = (f"\nNote: {len(matches)} dumps match '{params.dump_name}'; using the newest. "
+                            f"Pass a path such as '{matches[1].path}' to pick another.")
             else:
-                crash_dump = self.crash_discovery.get_latest_crash_dump()
+                crash_dump = await asyncio.to_thread(self.crash_discovery.get_latest_crash_dump)
                 if not crash_dump:
                     return [TextContent(type="text", text="Error: No crash dumps found")]
 
@@ -390,17 +1205,36 @@ class DynamicMCPServer:
             if not self.crash_discovery.is_valid_crash_dump(crash_dump):
                 return [TextContent(type="text", text=f"Error: Invalid crash dump: {crash_dump.name}")]
 
-            # Find matching kernel - create KernelDetection with specific crash dump path
-            kernel_detection = KernelDetection(str(self.config.kernel_path), str(crash_dump.path))
-            kernel = kernel_detection.find_matching_kernel(crash_dump)
+            # crash cannot open compressed or flattened dumps: use a decompressed copy
+            session_dump = await self.decompressor.prepare(crash_dump)
+
+            # Find matching kernel; the shared detection caches candidates
+            metadata = await asyncio.to_thread(self.crash_discovery.get_dump_metadata, crash_dump, session_dump)
+            kernel = await asyncio.to_thread(self.kernel_detection.find_matching_kernel, crash_dump, metadata)
+            if not kernel and metadata.build_id and self.debuginfod.is_enabled():
+                logger.info(f"Fetching kernel {metadata.build_id} from debuginfod")
+                kernel = await self.kernel_detection.fetch_kernel(metadata)
             if not kernel:
+                if metadata.release:
+                    return [TextContent(type="text", text=f"Error: No kernel found for the dump's release "
+                                                          f"{metadata.release}")]
                 return [TextContent(type="text", text="Error: No matching kernel found")]
 
             # Start session
-            success = self.crash_session_manager.start_session(crash_dump, kernel, params.timeout)
+            success = await self.crash_session_manager.start_session_async(session_dump, kernel, params.timeout)
 
             if success:
-                return [TextContent(type="text", text=f"Crash session started successfully\nDump: {crash_dump.name}\nKernel: {kernel.name}")]
+                session = self.crash_session_manager.active_session
+                if session_dump is not crash_dump:
+                    note = f"\nDecompressed copy: {session_dump.path}{note}"
+                if session.deferred:
+                    note += (f"\nRestored from snapshot ({len(session.results)} saved results); "
+                             f"crash starts on the first command it cannot answer")
+                return [TextContent(
+                    type="text",
+                    text=f"Crash session started successfully\nSession: {session.session_id}\n"
+                         f"Dump: {crash_dump.path}\nKernel: {kernel.name}{note}"
+                )]
             else:
                 return [TextContent(type="text", text="Error: Failed to start crash session")]
 
@@ -411,8 +1245,10 @@ class DynamicMCPServer:
     async def _handle_close_crash_session(self, arguments: Dict[str, Any]) -> Sequence[TextContent]:
         """Handle closing the crash session."""
         try:
-            if self.crash_session_manager.is_session_active():
-                self.crash_session_manager.close_session()
+            params = CloseSessionParams(**arguments)
+
+            if self.crash_session_manager.get_session(params.session_id):
+                await self.crash_session_manager.close_session_async(params.session_id)
                 return [TextContent(type="text", text="Crash session closed")]
             else:
                 return [TextContent(type="text", text="No active crash session to close")]
@@ -421,6 +1257,40 @@ class DynamicMCPServer:
             logger.error(f"Error closing crash session: {e}")
             return [TextContent(type="text", text=f"Error: {str(e)}")]
 
+    async def _handle_list_crash_sessions(self, arguments: Dict[str, Any]) -> Sequence[TextContent]:
+        """Handle listing pooled crash sessions."""
+        try:
+            await self.crash_session_manager.evict_idle_sessions()
+            sessions = self.crash_session_manager.list_sessions()
+            if not sessions:
+                return [TextContent(type="text", text="No open crash sessions")]
+            return [TextContent(type="text", text=json.dumps(sessions, indent=2))]
+
+        except Exception as e:
+            logger.error(f"Error listing crash sessions: {e}")
+            return [TextContent(type="text", text=f"Error: {str(e)}")]
+
+    def _start_background_tasks(self) -> List[asyncio.Task]:
+        """Start session housekeeping tasks for the lifetime of the server."""
+        tasks = [asyncio.create_task(self._reap_idle_sessions())]
+        if self.crash_watcher:
+            # The first scan of the dump tree runs in a worker thread
+            tasks.append(asyncio.create_task(self.crash_watcher.start()))
+        if self.prewarmer:
+            tasks.append(asyncio.create_task(self.prewarmer.run()))
+        return tasks
+
+    async def _reap_idle_sessions(self, interval: int = 60):
+        """Periodically close crash sessions past the idle or memory limits."""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                evicted = await self.crash_session_manager.evict_idle_sessions()
+                if evicted:
+                    logger.info(f"Closed {evicted} idle crash session(s)")
+            except Exception as e:
+                logger.error(f"Error reaping crash sessions: {e}")
+
     async def _handle_execute_bpftrace_script(self, arguments: Dict[str, Any]) -> Sequence[TextContent]:
         """Handle BPFtrace script execution."""
         try:
@@ -429,17 +1299,67 @@ class DynamicMCPServer:
             if not self.bpftrace_executor.is_available():
                 return [TextContent(type="text", text="Error: BPFtrace is not available on this system")]
 
-            logger.info(f"Executing BPFtrace script (timeout: {params.timeout}s)")
+            logger.info(f"Executing BPFtrace script ({params.mode}: {params.timeout}s)")
 
-            # Execute the script
-            stdout, stderr, return_code = await self.bpftrace_executor.execute_script(
+            stream, error = await self.bpftrace_executor.stream_script(
                 params.script,
                 timeout=params.timeout,
-                use_sudo=params.use_sudo
+                use_sudo=params.use_sudo,
+                chunk_size=self.config.bpftrace_stream_chunk_kb * 1024,
+                mode=params.mode,
+                output_format="json" if params.structured else "text",
+                client=self._get_client_id(),
+                priority=params.priority
             )
+            if stream is None:
+                return [TextContent(type="text", text=f"Error: {error}")]
+
+            # Output is relayed as it is printed and spilled to the output
+            # store past one page, so a chatty script does not grow the server
+            report = self._get_progress_reporter() if params.stream else None
+            parser = BPFtraceJSONParser() if params.structured else None
+            collector = OutputCollector(self.output_store, "bpftrace", self.config.crash_output_page_kb * 1024,
+                                        kind="bpftrace")
+            notifications = 0
+            try:
+                async for chunk in stream:
+                    if parser:
+                        parser.feed_text(chunk)
+                    else:
+                        await collector.write_async(chunk)
+                    if report:
+                        await report(stream.bytes_read, chunk)
+                        notifications += 1
+                if parser:
+                    await collector.write_async(json.dumps(parser.result(), separators=(",", ":")))
+            except BaseException:
+                stream.cancel()
+                collector.abort()
+                raise
+            stdout, stored = await collector.finish_async()
+            stderr = stream.error
+            return_code = stream.return_code
+
+            if stored:
+                stdout += (
+                    f"\n\n[Output truncated: showing the first {len(stdout.encode('utf-8')):,} of "
+                    f"{stored.size:,} bytes ({stored.lines:,} lines) of bpftrace output. Use "
+                    f"get_bpftrace_output with handle \"{stored.handle}\" to read more or filter it.]"
+                )
 
             # Format the result
             result_text = f"BPFtrace execution completed (exit code: {return_code})\n\n"
+            if stream.interrupted:
+                result_text = (f"BPFtrace trace ran for {params.timeout}s, stopped with SIGINT "
+                               f"(exit code: {return_code})\n\n")
+            if stream.queue_wait >= 0.001:
+                result_text = f"Waited {stream.queue_wait:.3f}s for a bpftrace slot\n{result_text}"
+            if report:
+                ttfb = stream.time_to_first_byte
+                result_text = (
+                    f"Streamed {stream.bytes_read:,} bytes in {notifications} progress notifications "
+                    f"(time to first byte: {f'{ttfb:.3f}s' if ttfb is not None else 'n/a'})\n{result_text}"
+                )
             if stdout:
                 result_text += f"Output:\n{stdout}\n"
             if stderr:
@@ -459,7 +1379,9 @@ class DynamicMCPServer:
             info = {
                 "available": self.bpftrace_executor.is_available(),
                 "version": self.bpftrace_executor.get_version(),
-                "default_timeout": self.bpftrace_executor.timeout
+                "default_timeout": self.bpftrace_executor.timeout,
+                "scheduler": self.bpftrace_executor.scheduler.get_stats(),
+                "jobs": self.bpftrace_jobs.get_stats()
             }
 
             return [TextContent(type="text", text=json.dumps(info, indent=2))]
@@ -468,10 +1390,66 @@ class DynamicMCPServer:
             logger.error(f"Error getting BPFtrace info: {e}")
             return [TextContent(type="text", text=f"Error: {str(e)}")]
 
+    async def _handle_start_bpftrace_job(self, arguments: Dict[str, Any]) -> Sequence[TextContent]:
+        """Handle starting a background BPFtrace job."""
+        try:
+            params = StartBPFtraceJobParams(**arguments)
+
+            if not self.bpftrace_executor.is_available():
+                return [TextContent(type="text", text="Error: BPFtrace is not available on this system")]
+
+            timeout = min(params.timeout, self.config.bpftrace_job_max_duration)
+            job = self.bpftrace_jobs.start(params.script, timeout, use_sudo=params.use_sudo,
+                                           client=self._get_client_id(), priority=params.priority)
+            result = {**job.to_dict(), "duration": timeout}
+            return [TextContent(type="text", text=json.dumps(result, indent=2))]
+
+        except Exception as e:
+            logger.error(f"Error starting BPFtrace job: {e}")
+            return [TextContent(type="text", text=f"Error: {str(e)}")]
+
+    async def _handle_poll_bpftrace_job(self, arguments: Dict[str, Any]) -> Sequence[TextContent]:
+        """Handle polling a background BPFtrace job."""
+        try:
+            params = PollBPFtraceJobParams(**arguments)
+            job = self.bpftrace_jobs.get(params.job_id)
+            if job is None:
+                return [TextContent(type="text", text=f"Error: Unknown or expired bpftrace job '{params.job_id}'")]
+
+            max_chars = params.max_chars or self.config.crash_output_page_kb * 1024
+            result = self.bpftrace_jobs.poll(job, params.cursor, max_chars)
+            return [TextContent(type="text", text=json.dumps(result, indent=2))]
+
+        except Exception as e:
+            logger.error(f"Error polling BPFtrace job: {e}")
+            return [TextContent(type="text", text=f"Error: {str(e)}")]
+
+    async def _handle_stop_bpftrace_job(self, arguments: Dict[str, Any]) -> Sequence[TextContent]:
+        """Handle stopping a background BPFtrace job."""
+        try:
+            params = StopBPFtraceJobParams(**arguments)
+            job = self.bpftrace_jobs.get(params.job_id)
+            if job is None:
+                return [TextContent(type="text", text=f"Error: Unknown or expired bpftrace job '{params.job_id}'")]
+
+            await self.bpftrace_jobs.stop(job)
+            # The final maps are the newest output: return the last page, and
+            # say how much unread output before it was skipped
+            page_chars = self.config.crash_output_page_kb * 1024
+            cursor = max(params.cursor, job.output.end - page_chars)
+            result = self.bpftrace_jobs.poll(job, cursor, page_chars)
+            result["skipped"] = cursor - params.cursor
+            return [TextContent(type="text", text=json.dumps(result, indent=2))]
+
+        except Exception as e:
+            logger.error(f"Error stopping BPFtrace job: {e}")
+            return [TextContent(type="text", text=f"Error: {str(e)}")]
+
     async def run_stdio(self):
         """Run the MCP server with stdio transport."""
         logger.info("Starting Dynamic MCP Server (stdio)")
 
+        background_tasks = self._start_background_tasks()
         async with stdio_server() as (read_stream, write_stream):
             try:
                 await self.server.run(
@@ -481,7 +1459,7 @@ class DynamicMCPServer:
                         server_name="dynamic-mcp",
                         server_version="0.1.0",
                         capabilities=self.server.get_capabilities(
-                            notification_options=NotificationOptions(),
+                            notification_options=NotificationOptions(resources_changed=True),
                             experimental_capabilities=None,
                         ),
                     ),
@@ -490,9 +1468,15 @@ class DynamicMCPServer:
                 logger.error(f"Server error: {e}")
                 raise
             finally:
-                # Clean up crash session if active
-                if self.crash_session_manager.is_session_active():
-                    self.crash_session_manager.close_session()
+                for task in background_tasks:
+                    task.cancel()
+                # Clean up crash sessions
+                if self.crash_watcher:
+                    self.crash_watcher.close()
+                self.crash_session_manager.close_all_sessions()
+                self.output_store.close()
+                self.decompressor.close()
+                self.bpftrace_jobs.close()
 
     def create_sse_app(self):
         """Create Starlette app for SSE transport."""
@@ -536,7 +1520,7 @@ class DynamicMCPServer:
                                     server_name="dynamic-mcp",
                                     server_version="0.1.0",
                                     capabilities=self.server.get_capabilities(
-                                        notification_options=NotificationOptions(),
+                                        notification_options=NotificationOptions(resources_changed=True),
                                         experimental_capabilities=None,
                                     ),
                                 )
@@ -589,23 +1573,10 @@ class DynamicMCPServer:
                         logger.info(f"[MCP Request] Received method: {method}")
 
                         # Call the appropriate tool handler
-                        result = None
-                        if method == "crash_command":
-                            result = await self._handle_crash_command(params)
-                        elif method == "get_crash_info":
-                            result = await self._handle_get_crash_info(params)
-                        elif method == "list_crash_dumps":
-                            result = await self._handle_list_crash_dumps(params)
-                        elif method == "start_crash_session":
-                            result = await self._handle_start_crash_session(params)
-                        elif method == "close_crash_session":
-                            result = await self._handle_close_crash_session(params)
-                        elif method == "execute_bpftrace_script":
-                            result = await self._handle_execute_bpftrace_script(params)
-                        elif method == "get_bpftrace_info":
-                            result = await self._handle_get_bpftrace_info(params)
-                        else:
+                        handler = self._tool_handlers.get(method)
+                        if handler is None:
                             raise ValueError(f"Unknown method: {method}")
+                        result = await handler(params)
 
                         # Convert TextContent results to strings
                         if isinstance(result, (list, tuple)):
@@ -650,113 +1621,9 @@ class DynamicMCPServer:
                 elif path == "/api/tools":
                     # Handle tools listing request
                     try:
-                        # Get available tools - list_tools is a handler, not a coroutine
-                        # We need to manually construct the tools list
                         tools_list = [
-                            {
-                                "name": "crash_command",
-                                "description": "Execute a command in the crash utility session",
-                                "inputSchema": {
-                                    "type": "object",
-                                    "properties": {
-                                        "command": {
-                                            "type": "string",
-                                            "description": "The crash command to execute"
-                                        },
-                                        "timeout": {
-                                            "type": "integer",
-                                            "description": "Command timeout in seconds (optional, default 120s for large dumps)",
-                                            "default": 120
-                                        }
-                                    },
-                                    "required": ["command"]
-                                }
-                            },
-                            {
-                                "name": "get_crash_info",
-                                "description": "Get information about the current crash dump and session",
-                                "inputSchema": {
-                                    "type": "object",
-                                    "properties": {},
-                                    "required": []
-                                }
-                            },
-                            {
-                                "name": "list_crash_dumps",
-                                "description": "List all available crash dumps",
-                                "inputSchema": {
-                                    "type": "object",
-                                    "properties": {
-                                        "max_dumps": {
-                                            "type": "integer",
-                                            "description": "Maximum number of dumps to return (optional)",
-                                            "default": 10
-                                        }
-                                    },
-                                    "required": []
-                                }
-                            },
-                            {
-                                "name": "start_crash_session",
-                                "description": "Start a new crash session with a specific dump",
-                                "inputSchema": {
-                                    "type": "object",
-                                    "properties": {
-                                        "dump_name": {
-                                            "type": "string",
-                                            "description": "Name of the crash dump file (optional, uses latest if not specified)"
-                                        },
-                                        "timeout": {
-                                            "type": "integer",
-                                            "description": "Session timeout in seconds (optional, default 120s for large dumps)",
-                                            "default": 120
-                                        }
-                                    },
-                                    "required": []
-                                }
-                            },
-                            {
-                                "name": "close_crash_session",
-                                "description": "Close the current crash session",
-                                "inputSchema": {
-                                    "type": "object",
-                                    "properties": {},
-                                    "required": []
-                                }
-                            },
-                            {
-                                "name": "execute_bpftrace_script",
-                                "description": "Execute a BPFtrace script for system tracing and analysis",
-                                "inputSchema": {
-                                    "type": "object",
-                                    "properties": {
-                                        "script": {
-                                            "type": "string",
-                                            "description": "BPFtrace script content"
-                                        },
-                                        "timeout": {
-                                            "type": "integer",
-                                            "description": "Script execution timeout in seconds (optional, default 30s)",
-                                            "default": 30
-                                        },
-                                        "use_sudo": {
-                                            "type": "boolean",
-                                            "description": "Whether to use sudo for execution (optional, default true)",
-                                            "default": True
-                                        }
-                                    },
-                                    "required": ["script"]
-                                }
-                            },
-                            {
-                                "name": "get_bpftrace_info",
-                                "description": "Get information about BPFtrace availability and version",
-                                "inputSchema": {
-                                    "type": "object",
-                                    "properties": {},
-                                    "required": []
-                                }
-                            }
+                            tool.model_dump(by_alias=True, exclude_none=True)
+                            for tool in self._get_tool_definitions()
                         ]
 
                         # Send response
@@ -809,15 +1676,7 @@ class DynamicMCPServer:
                     "name": self.mcp_server_name,
                     "type": "crash_analysis",
                     "version": "0.1.0",
-                    "capabilities": [
-                        "crash_command",
-                        "get_crash_info",
-                        "list_crash_dumps",
-                        "start_crash_session",
-                        "close_crash_session",
-                        "execute_bpftrace_script",
-                        "get_bpftrace_info"
-                    ],
+                    "capabilities": list(self._tool_handlers),
                     "url": self.mcp_server_url
                 }
 
@@ -877,19 +1736,26 @@ class DynamicMCPServer:
                 log_level="info"
             )
             server = uvicorn.Server(config)
+            background_tasks = self._start_background_tasks()
 
             # Register with Dynamic after server starts (if tunnel is available)
             if self.mcp_server_url:
                 asyncio.create_task(self.register_with_dynamic())
 
             await server.serve()
+            for task in background_tasks:
+                task.cancel()
         finally:
             # Clean up tunnel
             await self.cleanup_tunnel()
 
-            # Clean up crash session if active
-            if self.crash_session_manager.is_session_active():
-                self.crash_session_manager.close_session()
+            if self.crash_watcher:
+                self.crash_watcher.close()
+            # Clean up crash sessions
+            self.crash_session_manager.close_all_sessions()
+            self.output_store.close()
+            self.decompressor.close()
+            self.bpftrace_jobs.close()
 
 
 async def async_main():
@@ -0,0 +1,26 @@
+"""Shared fixtures for bpftrace executor tests."""
+
+import os
+import stat
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from dynamic_mcp.bpftrace_executor import BPFtraceExecutor
+
+FAKE_BPFTRACE = Path(__file__).parent / "fake_bpftrace.py"
+
+
+@pytest.fixture
+def fake_bpftrace(tmp_path):
+    """An executor running a fake ``bpftrace`` (use it with ``use_sudo=False``)."""
+    wrapper = tmp_path / "bpftrace"
+    wrapper.write_text(f'#!/bin/sh\nexec "{sys.executable}" "{FAKE_BPFTRACE}" "$@"\n')
+    wrapper.chmod(wrapper.stat().st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+    executor = BPFtraceExecutor(timeout=10)
+    executor.bpftrace_path = str(wrapper)
+    return executor
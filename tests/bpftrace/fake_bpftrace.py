@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Minimal stand-in for bpftrace used by the bpftrace executor tests.
+
+It runs the ``.bt`` file given on the command line, but instead of BPF code
+it follows ``//fake:`` directive lines, one per line, in order:
+
+    //fake: print N      print N ``event i`` lines as fast as possible
+    //fake: tick SECONDS print an ``event i`` line every SECONDS, forever
+    //fake: sleep SECONDS
+    //fake: stderr TEXT  write TEXT to stderr
+    //fake: lost N       report N lost events
+
+Like bpftrace it prints its maps when it exits, whether at the end of the
+directives or on SIGINT/SIGTERM.  With ``-f json`` every line is a JSON
+record, as bpftrace writes them.
+"""
+
+import json
+import signal
+import sys
+import time
+
+JSON = "json" in sys.argv[1:-1]
+
+MAPS = (
+    "@count: 42\n"
+    "\n"
+    "@calls[read]: 10\n"
+    "@calls[write]: 5\n"
+    "\n"
+    "@usecs:\n"
+    "[0]                    1 |@@@@                                                |\n"
+    "[1]                    3 |@@@@@@@@@@@@                                        |\n"
+    "[2, 4)                 5 |@@@@@@@@@@@@@@@@@@@@                                |\n"
+    "[4, 8)                 2 |@@@@@@@@                                            |\n"
+)
+
+
+JSON_MAPS = [
+    {"type": "map", "data": {"@count": 42}},
+    {"type": "map", "data": {"@calls": {"read": 10, "write": 5}}},
+    {"type": "hist", "data": {"@usecs": [
+        {"min": 0, "max": 0, "count": 1},
+        {"min": 1, "max": 1, "count": 3},
+        {"min": 2, "max": 3, "count": 5},
+        {"min": 4, "max": 7, "count": 2}
+    ]}},
+]
+
+
+def _record(record_type: str, data):
+    sys.stdout.write(json.dumps({"type": record_type, "data": data}) + "\n")
+
+
+def _exit(*_):
+    if JSON:
+        for record in JSON_MAPS:
+            _record(record["type"], record["data"])
+    else:
+        sys.stdout.write("\n\n" + MAPS)
+    sys.stdout.flush()
+    sys.exit(0)
+
+
+def _event(event: int):
+    if JSON:
+        _record("printf", f"event {event}\n")
+    else:
+        sys.stdout.write(f"event {event}\n")
+
+
+def main():
+    signal.signal(signal.SIGINT, _exit)
+    signal.signal(signal.SIGTERM, _exit)
+    with open(sys.argv[-1]) as f:
+        directives = [line.split()[1:] for line in f if line.startswith("//fake:")]
+
+    if JSON:
+        _record("attached_probes", {"probes": 1})
+    else:
+        sys.stdout.write("Attaching 1 probe...\n")
+    sys.stdout.flush()
+    event = 0
+    for directive in directives:
+        verb, args = directive[0], directive[1:]
+        if verb == "print":
+            for _ in range(int(args[0])):
+                _event(event)
+                event += 1
+            sys.stdout.flush()
+        elif verb == "tick":
+            while True:
+                _event(event)
+                sys.stdout.flush()
+                event += 1
+                time.sleep(float(args[0]))
+        elif verb == "sleep":
+            time.sleep(float(args[0]))
+        elif verb == "stderr":
+            sys.stderr.write(" ".join(args) + "\n")
+            sys.stderr.flush()
+        elif verb == "lost":
+            if JSON:
+                _record("lost_events", {"events": int(args[0])})
+            else:
+                sys.stdout.write(f"Lost {args[0]} events\n")
+            sys.stdout.flush()
+    _exit()
+
+
+if __name__ == "__main__":
+    main()
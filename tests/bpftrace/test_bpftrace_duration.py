@@ -0,0 +1,40 @@
+"""Tests for fixed-duration bpftrace runs."""
+
+import asyncio
+import time
+
+
+class TestBPFtraceDuration:
+    """Test the duration and timeout execution modes against a fake bpftrace."""
+
+    def test_duration_mode_returns_final_maps(self, fake_bpftrace):
+        """At the deadline bpftrace gets SIGINT and its map dump is returned."""
+        started = time.monotonic()
+        stdout, stderr, return_code = asyncio.run(fake_bpftrace.execute_script(
+            "//fake: tick 0.01\n", timeout=1, use_sudo=False, mode="duration"))
+        elapsed = time.monotonic() - started
+
+        assert return_code == 0
+        assert stderr == ""
+        assert stdout.startswith("Attaching 1 probe...\nevent 0\n")
+        assert "@count: 42" in stdout
+        assert "@calls[write]: 5" in stdout
+        assert stdout.rstrip().endswith("[4, 8)                 2 |@@@@@@@@                                            |")
+        assert elapsed < 1 + 1
+
+    def test_timeout_mode_keeps_partial_output(self, fake_bpftrace):
+        """An overrunning script is still an error, but its output is not thrown away."""
+        stdout, stderr, return_code = asyncio.run(fake_bpftrace.execute_script(
+            "//fake: tick 0.01\n", timeout=1, use_sudo=False))
+
+        assert return_code == 124
+        assert "timed out after 1s" in stderr
+        assert "event 0\n" in stdout
+
+    def test_unknown_mode_is_rejected(self, fake_bpftrace):
+        """Nothing is started for an unknown mode."""
+        stdout, stderr, return_code = asyncio.run(fake_bpftrace.execute_script(
+            "//fake: print 1\n", use_sudo=False, mode="forever"))
+
+        assert return_code == 1
+        assert "Unknown execution mode 'forever'" in stderr
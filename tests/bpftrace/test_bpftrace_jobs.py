@@ -0,0 +1,114 @@
+"""Tests for background bpftrace jobs."""
+
+import asyncio
+
+from dynamic_mcp.bpftrace_executor import BPFtraceExecutor
+from dynamic_mcp.bpftrace_jobs import BPFtraceJobManager, OutputRing
+
+
+class TestOutputRing:
+    """Test the bounded job output buffer."""
+
+    def test_keeps_the_newest_text(self):
+        """Old text is dropped; cursors are stream offsets and report what was missed."""
+        ring = OutputRing(10)
+        ring.write("abcdef")
+        assert ring.read(0, 100) == ("abcdef", 6, 0)
+        ring.write("ghij")
+        ring.write("klm")
+        assert (ring.start, ring.end) == (3, 13)
+        assert ring.read(0, 100) == ("defghijklm", 13, 3)
+        assert ring.read(5, 4) == ("fghi", 9, 0)
+        assert ring.read(13, 4) == ("", 13, 0)
+        ring.write("x" * 25 + "0123456789")
+        assert ring.read(13, 100) == ("0123456789", 48, 25)
+        assert sum(len(chunk) for _, chunk in ring._chunks) == 10
+
+
+class TestBPFtraceJobs:
+    """Test starting, polling and stopping jobs against a fake bpftrace."""
+
+    def test_poll_then_stop_collects_final_maps(self, fake_bpftrace):
+        """Polls return new output since the cursor; stop ends the job with its maps."""
+        jobs = BPFtraceJobManager(fake_bpftrace)
+
+        async def run_test():
+            job = jobs.start("//fake: tick 0.02\n", timeout=60, use_sudo=False)
+            polls = []
+            cursor = 0
+            while len(polls) < 3:
+                await asyncio.sleep(0.1)
+                poll = jobs.poll(job, cursor)
+                if poll["output"]:
+                    polls.append(poll)
+                    cursor = poll["cursor"]
+            await jobs.stop(job)
+            return job, polls, jobs.poll(job, cursor)
+
+        job, polls, final = asyncio.run(run_test())
+        assert [poll["status"] for poll in polls] == ["running"] * 3
+        text = "".join(poll["output"] for poll in polls) + final["output"]
+        assert text.startswith("Attaching 1 probe...\nevent 0\nevent 1\n")
+        assert "@count: 42" in final["output"]
+        assert final["status"] == "finished" and final["return_code"] == 0
+        assert final["stopped"] and not final["more"]
+        assert final["elapsed"] < 5
+        assert jobs.stats["stopped"] == 1
+        assert jobs.executor.scheduler.running == 0
+
+    def test_long_job_output_is_bounded(self, fake_bpftrace):
+        """A chatty job keeps only the newest output, which ends with its maps."""
+        jobs = BPFtraceJobManager(fake_bpftrace, buffer_chars=4096)
+
+        async def run_test():
+            job = jobs.start("//fake: print 50000\n", timeout=60, use_sudo=False)
+            await asyncio.wait_for(job.task, timeout=30)
+            return job, jobs.poll(job, 0, 1024 * 1024)
+
+        job, poll = asyncio.run(run_test())
+        assert poll["status"] == "finished"
+        assert poll["dropped"] == job.output.end - 4096
+        assert len(poll["output"]) == 4096
+        assert poll["output"].rstrip().endswith("|@@@@@@@@                                            |")
+
+    def test_queued_job_can_be_stopped(self, fake_bpftrace):
+        """A job still waiting for a slot is dropped from the queue when stopped."""
+        executor = BPFtraceExecutor(timeout=10, max_concurrent=1)
+        executor.bpftrace_path = fake_bpftrace.bpftrace_path
+        jobs = BPFtraceJobManager(executor)
+
+        async def run_test():
+            running = jobs.start("//fake: tick 0.05\n", timeout=60, use_sudo=False)
+            queued = jobs.start("//fake: tick 0.05\n", timeout=60, use_sudo=False, client="other")
+            await asyncio.sleep(0.3)
+            statuses = (running.status, queued.status)
+            await jobs.stop(queued)
+            waiting = executor.scheduler.get_stats()["waiting"]
+            await jobs.stop(running)
+            return statuses, queued, waiting
+
+        statuses, queued, waiting = asyncio.run(run_test())
+        assert statuses == ("running", "queued")
+        assert queued.status == "failed"
+        assert queued.error == "Stopped before it started"
+        assert waiting == 0
+        assert executor.scheduler.get_stats()["running"] == 0
+
+    def test_running_job_does_not_block_its_client(self, fake_bpftrace):
+        """Jobs have their own per-client quota, so the same client can still run scripts."""
+        executor = BPFtraceExecutor(timeout=10, max_concurrent=2, max_per_client=1, queue_timeout=1)
+        executor.bpftrace_path = fake_bpftrace.bpftrace_path
+        jobs = BPFtraceJobManager(executor)
+
+        async def run_test():
+            job = jobs.start("//fake: tick 0.05\n", timeout=60, use_sudo=False, client="agent-a")
+            while job.status == "queued":
+                await asyncio.sleep(0.02)
+            result = await executor.execute_script("//fake: print 1\n", use_sudo=False, client="agent-a")
+            running_by_client = executor.scheduler.get_stats()["running_by_client"]
+            await jobs.stop(job)
+            return result, running_by_client
+
+        result, running_by_client = asyncio.run(run_test())
+        assert result[2] == 0
+        assert running_by_client == {"agent-a/job": 1}
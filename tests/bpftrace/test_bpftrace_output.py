@@ -0,0 +1,61 @@
+"""Tests for paging through large bpftrace output."""
+
+import asyncio
+import re
+
+import pytest
+
+from dynamic_mcp.crash_output import OutputCollector
+from dynamic_mcp.server import DynamicMCPServer
+
+
+@pytest.fixture
+def server(tmp_path, monkeypatch, fake_bpftrace):
+    """A server whose bpftrace is the fake one and whose output pages are 1 KiB."""
+    for name, value in (("CRASH_DUMP_PATH", tmp_path / "crash"), ("KERNEL_PATH", tmp_path / "boot"),
+                        ("DEBUGINFOD_CACHE_DIR", tmp_path / "debuginfod"), ("CRASH_OUTPUT_DIR", tmp_path / "out"),
+                        ("CRASH_OUTPUT_PAGE_KB", 1), ("WATCH_CRASH_DUMPS", "false")):
+        monkeypatch.setenv(name, str(value))
+    server = DynamicMCPServer()
+    server.bpftrace_executor.bpftrace_path = fake_bpftrace.bpftrace_path
+    yield server
+    server.output_store.close()
+
+
+class TestBPFtraceOutput:
+    """Test get_bpftrace_output against spilled execute_bpftrace_script output."""
+
+    def test_large_output_is_paged(self, server):
+        """The truncation note names get_bpftrace_output, which pages through the rest."""
+
+        async def run_test():
+            result = await server._handle_execute_bpftrace_script(
+                {"script": "//fake: print 2000\n", "use_sudo": False})
+            handle = re.search(r'get_bpftrace_output with handle "(out_\w+)"', result[0].text).group(1)
+            page = await server._handle_get_bpftrace_output({"handle": handle, "start_line": 1001, "end_line": 1002})
+            matches = await server._handle_get_bpftrace_output({"handle": handle, "filter": "^event 1999$"})
+            return page[0].text, matches[0].text
+
+        page, matches = asyncio.run(run_test())
+        assert page.startswith("event 999\nevent 1000\n[lines 1001-1002 of ")
+        assert matches.startswith("2001: event 1999\n[1 matching lines")
+
+    def test_tools_only_read_their_own_outputs(self, server):
+        """A crash handle is rejected by get_bpftrace_output, and the other way round."""
+        handles = {}
+        for kind in ("crash", "bpftrace"):
+            # A crash command literally named "bpftrace" is still crash output
+            collector = OutputCollector(server.output_store, "bpftrace", 16, kind=kind)
+            collector.write("line\n" * 10)
+            handles[kind] = collector.finish()[1].handle
+
+        async def run_test():
+            return [(await read({"handle": handles[kind]}))[0].text
+                    for read, kind in ((server._handle_get_bpftrace_output, "crash"),
+                                       (server._handle_get_crash_output, "bpftrace"),
+                                       (server._handle_get_bpftrace_output, "bpftrace"))]
+
+        wrong_tool, other_wrong_tool, right_tool = asyncio.run(run_test())
+        assert wrong_tool.startswith("Error: Unknown or expired output handle")
+        assert other_wrong_tool.startswith("Error: Unknown or expired output handle")
+        assert right_tool.startswith("line\n")
@@ -0,0 +1,68 @@
+"""Tests for structured bpftrace output."""
+
+import asyncio
+import json
+
+from dynamic_mcp.bpftrace_parsers import BPFtraceJSONParser
+
+RECORDS = [
+    {"type": "attached_probes", "data": {"probes": 2}},
+    {"type": "printf", "data": "open /etc/passwd\n"},
+    {"type": "printf", "data": "open /etc/"},
+    {"type": "printf", "data": "hosts\nclose 3\n"},
+    {"type": "map", "data": {"@opens": {"bash": 3, "sshd": 1}}},
+    {"type": "lost_events", "data": {"events": 7}},
+    {"type": "map", "data": {"@opens": {"bash": 5, "sshd": 2}}},
+    {"type": "hist", "data": {"@bytes": {"bash": [{"max": -1, "count": 1}, {"min": 0, "max": 0, "count": 4}],
+                                         "sshd": [{"min": 1024, "count": 2}]}}},
+    {"type": "stats", "data": {"@latency": {"count": 3, "average": 20, "total": 60}}},
+    {"type": "time", "data": "10:00:00\n"},
+]
+
+
+class TestBPFtraceJSONParser:
+    """Test merging -f json records."""
+
+    def test_records_are_merged_across_chunks(self):
+        """Records split at any byte still merge; later map dumps win."""
+        text = "".join(json.dumps(record) + "\n" for record in RECORDS) + "not json\n"
+        parser = BPFtraceJSONParser()
+        for start in range(0, len(text), 7):
+            parser.feed_text(text[start:start + 7])
+        result = parser.result()
+
+        assert result["attached_probes"] == 2
+        assert result["printf"] == ["open /etc/passwd", "open /etc/hosts", "close 3"]
+        assert result["maps"] == {"@opens": {"bash": 5, "sshd": 2}}
+        assert result["histograms"]["@bytes"]["bash"] == {
+            "columns": ["min", "max", "count"], "buckets": [[None, -1, 1], [0, 0, 4]], "total": 5}
+        assert result["histograms"]["@bytes"]["sshd"]["buckets"] == [[1024, None, 2]]
+        assert result["stats"] == {"@latency": {"count": 3, "average": 20, "total": 60}}
+        assert result["lost_events"] == 7
+        assert result["other"] == [{"type": "time", "data": "10:00:00\n"}, "not json"]
+
+    def test_printf_lines_are_capped(self):
+        """Past max_lines printf lines are only counted."""
+        parser = BPFtraceJSONParser(max_lines=10)
+        for i in range(25):
+            parser.feed(json.dumps({"type": "printf", "data": f"event {i}\n"}))
+        result = parser.result()
+        assert result["printf"] == [f"event {i}" for i in range(10)]
+        assert result["printf_omitted"] == 15
+
+    def test_structured_run_is_smaller_than_text(self, fake_bpftrace):
+        """A histogram run returns bucket rows, smaller than the text rendering."""
+        script = "//fake: lost 3\n"
+
+        async def run_test():
+            text = await fake_bpftrace.execute_script(script, use_sudo=False)
+            structured = await fake_bpftrace.execute_script_structured(script, use_sudo=False)
+            return text, structured
+
+        (text, _, _), (result, stderr, return_code) = asyncio.run(run_test())
+        assert return_code == 0
+        assert stderr == ""
+        assert result["maps"] == {"@count": 42, "@calls": {"read": 10, "write": 5}}
+        assert result["histograms"]["@usecs"]["buckets"] == [[0, 0, 1], [1, 1, 3], [2, 3, 5], [4, 7, 2]]
+        assert result["lost_events"] == 3
+        assert len(json.dumps(result["histograms"], separators=(",", ":"))) < len(text[text.index("@usecs"):]) / 2
@@ -0,0 +1,116 @@
+"""Tests for bpftrace admission control."""
+
+import asyncio
+import time
+
+import pytest
+
+from dynamic_mcp.bpftrace_executor import BPFtraceExecutor
+from dynamic_mcp.bpftrace_scheduler import BPFtraceQueueFull, BPFtraceScheduler
+
+
+class TestBPFtraceScheduler:
+    """Test slot ordering, quotas and rejection."""
+
+    def test_priority_then_fifo_order(self):
+        """Waiters are served by priority, then in arrival order."""
+        scheduler = BPFtraceScheduler(max_concurrent=1, max_per_client=0)
+
+        async def run_test():
+            first = await scheduler.acquire("a")
+            order = []
+
+            async def run(name, priority):
+                slot = await scheduler.acquire(name, priority)
+                order.append(name)
+                await asyncio.sleep(0.01)
+                slot.release()
+
+            tasks = []
+            for name, priority in (("low-1", 0), ("high", 5), ("low-2", 0)):
+                tasks.append(asyncio.ensure_future(run(name, priority)))
+                await asyncio.sleep(0)
+            assert scheduler.get_stats()["waiting"] == 3
+            first.release()
+            first.release()
+            await asyncio.gather(*tasks)
+            return order
+
+        assert asyncio.run(run_test()) == ["high", "low-1", "low-2"]
+        stats = scheduler.get_stats()
+        assert stats["started"] == 4
+        assert stats["queued"] == 3
+        assert stats["running"] == 0
+        assert stats["queue_wait_max"] > 0
+
+    def test_client_quota_lets_others_pass(self):
+        """A client at its quota waits without holding back other clients."""
+        scheduler = BPFtraceScheduler(max_concurrent=3, max_per_client=1)
+
+        async def run_test():
+            held = await scheduler.acquire("agent-a")
+            waiting = asyncio.ensure_future(scheduler.acquire("agent-a"))
+            await asyncio.sleep(0)
+            other = await asyncio.wait_for(scheduler.acquire("agent-b"), timeout=1)
+            assert not waiting.done()
+            assert scheduler.get_stats()["running_by_client"] == {"agent-a": 1, "agent-b": 1}
+            held.release()
+            (await asyncio.wait_for(waiting, timeout=1)).release()
+            other.release()
+
+        asyncio.run(run_test())
+
+    def test_quota_timeout_names_the_client(self):
+        """A client waiting on its own quota is told so when it gives up."""
+        scheduler = BPFtraceScheduler(max_concurrent=2, max_per_client=1, queue_timeout=0.1)
+
+        async def run_test():
+            held = await scheduler.acquire("agent-a")
+            with pytest.raises(BPFtraceQueueFull, match="agent-a is at its limit of 1 running"):
+                await scheduler.acquire("agent-a")
+            held.release()
+
+        asyncio.run(run_test())
+
+    def test_excess_requests_are_rejected(self):
+        """A full queue rejects at once; a waiter gives up after queue_timeout."""
+        scheduler = BPFtraceScheduler(max_concurrent=1, max_queued=1, max_per_client=0, queue_timeout=0.2)
+
+        async def run_test():
+            held = await scheduler.acquire("a")
+            waiting = asyncio.ensure_future(scheduler.acquire("b"))
+            await asyncio.sleep(0)
+            started = time.monotonic()
+            with pytest.raises(BPFtraceQueueFull, match="Too many bpftrace runs"):
+                await scheduler.acquire("c")
+            rejected_in = time.monotonic() - started
+            with pytest.raises(BPFtraceQueueFull, match="Waited 0.2s"):
+                await waiting
+            held.release()
+            return rejected_in
+
+        assert asyncio.run(run_test()) < 0.05
+        stats = scheduler.get_stats()
+        assert stats["rejected_queue_full"] == 1
+        assert stats["rejected_timeout"] == 1
+        assert stats["running"] == 0 and stats["waiting"] == 0
+
+    def test_executor_runs_scripts_within_limit(self, fake_bpftrace):
+        """Scripts over max_concurrent wait their turn; the queue wait is measured."""
+        executor = BPFtraceExecutor(timeout=10, max_concurrent=1, max_per_client=0)
+        executor.bpftrace_path = fake_bpftrace.bpftrace_path
+        script = "//fake: sleep 0.3\n"
+
+        async def run_test():
+            return await asyncio.gather(*(
+                executor.execute_script(script, use_sudo=False, client=f"agent-{i}") for i in range(3)))
+
+        started = time.monotonic()
+        results = asyncio.run(run_test())
+        elapsed = time.monotonic() - started
+        assert [return_code for _, _, return_code in results] == [0, 0, 0]
+        assert elapsed >= 0.9
+        stats = executor.scheduler.get_stats()
+        assert stats["started"] == 3
+        assert stats["queue_wait_max"] >= 0.5
+        assert stats["running"] == 0
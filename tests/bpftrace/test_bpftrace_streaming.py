@@ -0,0 +1,72 @@
+"""Tests for streaming bpftrace output."""
+
+import asyncio
+import time
+
+
+class TestBPFtraceStream:
+    """Test BPFtraceExecutor.stream_script against a fake bpftrace."""
+
+    def test_output_arrives_before_exit(self, fake_bpftrace):
+        """Lines are delivered while the script runs; stopping early ends the process."""
+        script = "//fake: tick 0.05\n"
+
+        async def run_test():
+            stream, error = await fake_bpftrace.stream_script(script, timeout=30, use_sudo=False)
+            assert error == ""
+            started = time.monotonic()
+            chunks = []
+            async for chunk in stream:
+                chunks.append(chunk)
+                if "event 2\n" in "".join(chunks):
+                    break
+            first_output = time.monotonic() - started
+            await asyncio.wait_for(stream.wait(), timeout=5)
+            return stream, chunks, first_output
+
+        stream, chunks, first_output = asyncio.run(run_test())
+        assert first_output < 5
+        assert "".join(chunks).startswith("Attaching 1 probe...\nevent 0\nevent 1\n")
+        assert stream.cancelled
+        assert stream.process.returncode is not None
+
+    def test_fast_output_is_bounded_and_complete(self, fake_bpftrace):
+        """A slow consumer holds back the script instead of buffering its output."""
+        script = "//fake: print 20000\n//fake: stderr lost 3 events\n"
+
+        async def run_test():
+            stream, _ = await fake_bpftrace.stream_script(
+                script, timeout=30, use_sudo=False, chunk_size=1024, max_pending_chunks=4)
+            chunks = []
+            pending = 0
+            async for chunk in stream:
+                pending = max(pending, stream._queue.qsize())
+                chunks.append(chunk)
+                if len(chunks) < 20:
+                    await asyncio.sleep(0.01)
+            return stream, chunks, pending
+
+        stream, chunks, pending = asyncio.run(run_test())
+        output = "".join(chunks)
+        assert stream.return_code == 0
+        assert stream.error == "lost 3 events\n"
+        assert pending <= 4
+        assert max(len(chunk) for chunk in chunks) <= 1024
+        assert all(chunk.endswith("\n") for chunk in chunks)
+        events = [line for line in output.splitlines() if line.startswith("event")]
+        assert events == [f"event {i}" for i in range(20000)]
+        assert "@count: 42" in output
+        assert stream.bytes_read == len(output.encode())
+
+    def test_timeout_keeps_partial_output(self, fake_bpftrace):
+        """A script still running at its timeout is stopped with exit code 124."""
+
+        async def run_test():
+            stream, _ = await fake_bpftrace.stream_script("//fake: tick 0.05\n", timeout=1, use_sudo=False)
+            return stream, await stream.read_all()
+
+        stream, output = asyncio.run(run_test())
+        assert stream.return_code == 124
+        assert "timed out after 1s" in stream.error
+        assert "event 0\n" in output
+        assert stream.duration < 1 + 2
@@ -0,0 +1,32 @@
+"""Shared fixtures for crash session tests."""
+
+import os
+import stat
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+FAKE_CRASH = Path(__file__).parent / "fake_crash.py"
+
+
+@pytest.fixture
+def fake_crash(tmp_path, monkeypatch):
+    """Put a fake ``crash`` binary on PATH and return a (dump, kernel) pair."""
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    wrapper = bin_dir / "crash"
+    wrapper.write_text(f'#!/bin/sh\nexec "{sys.executable}" "{FAKE_CRASH}" "$@"\n')
+    wrapper.chmod(wrapper.stat().st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ.get('PATH', '')}")
+
+    dump_dir = tmp_path / "127.0.0.1-2025-09-19-15:54:12"
+    dump_dir.mkdir()
+    dump = dump_dir / "vmcore"
+    dump.write_bytes(b"fake vmcore")
+    kernel = dump_dir / "vmlinux"
+    kernel.write_bytes(b"fake vmlinux")
+    return dump, kernel
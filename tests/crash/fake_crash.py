@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Minimal stand-in for the crash utility used by the crash session tests.
+
+It mimics the interactive behaviour CrashSession relies on: a startup banner,
+a ``crash> `` prompt after every command and ``quit`` to exit.  A handful of
+commands produce canned output; ``foreach bt`` sleeps to emulate a slow
+whole-dump sweep, and ``bt`` sleeps per call so sharded sweeps can be timed.
+
+Environment knobs:
+    FAKE_CRASH_STARTUP_DELAY  seconds to sleep before the first prompt
+    FAKE_CRASH_SLOW_SECONDS   seconds ``foreach bt`` takes (default 1)
+    FAKE_CRASH_LINES          lines ``kmem -S`` prints (default 1000)
+    FAKE_CRASH_BT_SECONDS     seconds each ``bt`` takes (default 0)
+"""
+
+import os
+import sys
+import time
+
+
+def _write(text: str):
+    sys.stdout.write(text)
+    sys.stdout.flush()
+
+
+def _handle(command: str):
+    """Print canned output for a command."""
+    words = command.split()
+    if not words:
+        return
+    if words[0] == "sys":
+        _write(
+            "      KERNEL: vmlinux\n"
+            "    DUMPFILE: vmcore\n"
+            "        CPUS: 4\n"
+            "     RELEASE: 4.18.0-553.el8.x86_64\n"
+            "       PANIC: \"Kernel panic - not syncing: sysrq triggered crash\"\n"
+        )
+    elif words[0] == "set":
+        _write("    PID: 1\nCOMMAND: \"systemd\"\n   TASK: ffff8881000d0000\n")
+    elif words[0] == "echo":
+        _write(" ".join(words[1:]) + "\n")
+    elif command == "kmem -S":
+        lines = int(os.getenv("FAKE_CRASH_LINES", "1000"))
+        for i in range(lines):
+            sys.stdout.write(f"ffff888100{i:06x}  ffff888200{i:06x}     0   4096  slab line {i}\n")
+        sys.stdout.flush()
+    elif words[0] == "ps":
+        _write("   PID    PPID  CPU       TASK        ST  %MEM     VSZ    RSS  COMM\n")
+        for cpu in range(4):
+            _write(f">     0      0   {cpu}  ffffffff81a1{cpu:04x}  RU   0.0       0      0  [swapper/{cpu}]\n")
+        for pid in range(1, 13):
+            _write(f"  {pid:5d}      1   {pid % 4}  ffff8881000d{pid:04x}  IN   0.1    1000    100  task{pid}\n")
+    elif words[0] == "bt":
+        time.sleep(float(os.getenv("FAKE_CRASH_BT_SECONDS", "0")))
+        if words[1:2] == ["-c"]:
+            _write(f"PID: 0      TASK: ffffffff81a1{int(words[2]):04x}  CPU: {words[2]}   COMMAND: \"swapper/{words[2]}\"\n")
+        for pid in words[1:] if words[1:2] != ["-c"] else []:
+            _write(f"PID: {pid}      TASK: ffff8881000d{int(pid):04x}  CPU: 0   COMMAND: \"task{pid}\"\n")
+    elif command == "kmem -s":
+        _write("CACHE             OBJSIZE  ALLOCATED     TOTAL  SLABS  SSIZE  NAME\n")
+        for name in ("kmalloc-64", "dentry", "inode_cache"):
+            _write(f"ffff888100{len(name):06x}       64        100       128      2     4k  {name}\n")
+    elif words[:2] == ["kmem", "-S"] and len(words) == 3:
+        _write(f"CACHE             OBJSIZE  ALLOCATED     TOTAL  SLABS  SSIZE  NAME\n{words[2]} slabs\n")
+    elif command == "foreach bt":
+        time.sleep(float(os.getenv("FAKE_CRASH_SLOW_SECONDS", "1")))
+        _write("PID: 1      TASK: ffff8881000d0000  CPU: 0   COMMAND: \"systemd\"\n")
+    else:
+        _write(f"crash: command not found: {words[0]}\n")
+
+
+def main():
+    time.sleep(float(os.getenv("FAKE_CRASH_STARTUP_DELAY", "0")))
+    _write("crash 8.0.4 (fake)\n\n")
+    while True:
+        _write("crash> ")
+        line = sys.stdin.readline()
+        if not line:
+            break
+        command = line.strip()
+        if command in ("quit", "q", "exit"):
+            break
+        _handle(command)
+
+
+if __name__ == "__main__":
+    main()
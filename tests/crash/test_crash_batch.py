@@ -0,0 +1,66 @@
+"""Tests for batched crash command execution."""
+
+import asyncio
+from types import SimpleNamespace
+
+from dynamic_mcp.crash_cache import CrashResultCache
+from dynamic_mcp.crash_session import CrashSessionManager
+
+
+def _start(manager, fake_crash):
+    dump, kernel = fake_crash
+    return manager.start_session_async(
+        SimpleNamespace(name=dump.name, path=dump),
+        SimpleNamespace(name=kernel.name, path=kernel),
+        timeout=10
+    )
+
+
+class TestCrashBatch:
+    """Test CrashSessionManager.execute_batch_async."""
+
+    def test_batch_returns_results_in_order(self, fake_crash):
+        """Every command gets its own result, timing and cache flag."""
+        manager = CrashSessionManager(result_cache=CrashResultCache())
+
+        async def run_test():
+            await _start(manager, fake_crash)
+            await manager.execute_command_async("sys", timeout=10)
+            results, error = await manager.execute_batch_async(
+                ["echo one", "sys", "bogus", "echo two"], timeout=10
+            )
+            manager.close_all_sessions()
+            return results, error
+
+        results, error = asyncio.run(run_test())
+        assert error == ""
+        assert [result["command"] for result in results] == ["echo one", "sys", "bogus", "echo two"]
+        assert results[0]["output"] == "one"
+        assert results[1]["cached"] is True
+        assert results[2]["return_code"] == 1
+        assert results[3]["output"] == "two"
+        assert all(result["duration"] >= 0 for result in results)
+
+    def test_stop_on_error(self, fake_crash):
+        """Commands after the first failure are skipped when asked."""
+        manager = CrashSessionManager()
+
+        async def run_test():
+            await _start(manager, fake_crash)
+            results, _ = await manager.execute_batch_async(
+                ["echo one", "bogus", "echo two"], timeout=10, stop_on_error=True
+            )
+            after = await manager.execute_command_async("echo after", timeout=10)
+            manager.close_all_sessions()
+            return results, after
+
+        results, after = asyncio.run(run_test())
+        assert [result["command"] for result in results] == ["echo one", "bogus"]
+        assert after == ("after", "", 0)
+
+    def test_missing_session(self):
+        """A batch without a session reports an error."""
+        manager = CrashSessionManager()
+        results, error = asyncio.run(manager.execute_batch_async(["sys"]))
+        assert results is None
+        assert error == "No active crash session"
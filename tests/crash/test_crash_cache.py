@@ -0,0 +1,101 @@
+"""Tests for the crash command result cache."""
+
+import asyncio
+from types import SimpleNamespace
+
+from dynamic_mcp.crash_cache import CrashResultCache, is_stateful_command, normalize_command
+from dynamic_mcp.crash_session import CrashSessionManager
+
+
+class TestCrashResultCache:
+    """Test the cache tiers and key derivation."""
+
+    def test_stateful_commands(self):
+        """Commands that change session state are recognized."""
+        assert is_stateful_command("set 1234")
+        assert is_stateful_command("mod -s ext4")
+        assert is_stateful_command("extend /tmp/ext.so")
+        assert is_stateful_command("!ls")
+        assert is_stateful_command("log > /tmp/log.txt")
+        assert not is_stateful_command("mod")
+        assert not is_stateful_command("kmem -i")
+        assert not is_stateful_command("bt -a")
+        assert normalize_command("  kmem   -i ") == "kmem -i"
+
+    def test_key_follows_content_not_path(self, tmp_path):
+        """Identical files at different paths share cache keys."""
+        cache = CrashResultCache()
+        for name in ("a", "b"):
+            (tmp_path / name).mkdir()
+            (tmp_path / name / "vmcore").write_bytes(b"dump" * 1000)
+            (tmp_path / name / "vmlinux").write_bytes(b"kernel")
+        key_a = cache.make_key(str(tmp_path / "a" / "vmcore"), str(tmp_path / "a" / "vmlinux"), "sys")
+        key_b = cache.make_key(str(tmp_path / "b" / "vmcore"), str(tmp_path / "b" / "vmlinux"), " sys ")
+        assert key_a == key_b
+        (tmp_path / "b" / "vmcore").write_bytes(b"other dump")
+        assert cache.make_key(str(tmp_path / "b" / "vmcore"), str(tmp_path / "b" / "vmlinux"), "sys") != key_a
+
+    def test_identity_memo_is_bounded(self, tmp_path, monkeypatch):
+        """Only the most recently used file identities are remembered."""
+        monkeypatch.setattr("dynamic_mcp.crash_cache.MAX_IDENTITIES", 2)
+        cache = CrashResultCache()
+        paths = []
+        for name in ("a", "b", "c"):
+            (tmp_path / name).write_bytes(name.encode())
+            paths.append(str(tmp_path / name))
+        identities = [cache.file_identity(path) for path in paths]
+        assert len(set(identities)) == 3
+        assert [key[0] for key in cache._identities] == paths[1:]
+        assert cache.file_identity(paths[0]) == identities[0]
+
+    def test_memory_lru_is_byte_bounded(self):
+        """Least recently used entries go once the byte budget is exceeded."""
+        cache = CrashResultCache(max_bytes=10)
+        cache.put("a", "12345")
+        cache.put("b", "12345")
+        assert cache.get("a") == "12345"
+        cache.put("c", "12345")
+        assert cache.get("b") is None
+        assert cache.get("a") == "12345"
+        assert cache.get_stats()["memory_bytes"] <= 10
+        assert cache.evictions == 1
+
+    def test_disk_tier_survives_restart(self, tmp_path):
+        """Entries written to disk are found by a new cache instance."""
+        CrashResultCache(cache_dir=str(tmp_path)).put("k" * 64, "output")
+        cache = CrashResultCache(cache_dir=str(tmp_path))
+        assert cache.get("k" * 64) == "output"
+        assert cache.disk_hits == 1
+        assert cache.get("k" * 64) == "output"
+        assert cache.disk_hits == 1
+
+
+class TestSessionManagerCaching:
+    """Test cache use by CrashSessionManager."""
+
+    def test_repeated_command_served_from_cache(self, fake_crash):
+        """A repeated command is a cache hit until session state changes."""
+        dump, kernel = fake_crash
+        cache = CrashResultCache()
+        manager = CrashSessionManager(result_cache=cache)
+
+        async def run_test():
+            await manager.start_session_async(
+                SimpleNamespace(name=dump.name, path=dump),
+                SimpleNamespace(name=kernel.name, path=kernel),
+                timeout=10
+            )
+            first = await manager.execute_command_async("sys", timeout=10)
+            second = await manager.execute_command_async("sys", timeout=10)
+            hits_before_set = cache.hits
+            await manager.execute_command_async("set 1", timeout=10)
+            await manager.execute_command_async("sys", timeout=10)
+            manager.close_all_sessions()
+            return first, second, hits_before_set
+
+        first, second, hits_before_set = asyncio.run(run_test())
+        assert first == second
+        assert "RELEASE" in first[0]
+        assert hits_before_set == 1
+        assert cache.hits == 1
+        assert cache.misses == 1
@@ -0,0 +1,151 @@
+"""Tests for the incremental crash dump catalog."""
+
+import os
+import time
+
+from dynamic_mcp import crash_discovery
+from dynamic_mcp.crash_discovery import CrashDumpCatalog, CrashDumpDiscovery
+
+
+def _dump(root, relative, data=b"dump", age=0):
+    path = root / relative
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+    if age:
+        stamp = time.time() - age
+        os.utime(path, (stamp, stamp))
+    return path
+
+
+def _catalog(root, **kwargs):
+    return CrashDumpCatalog(root, ["vmcore*", "core*", "crash*", "dump*"], **kwargs)
+
+
+class TestCrashDumpCatalog:
+    """Test scanning, incremental refresh and persistence."""
+
+    def test_initial_scan_honours_patterns_and_depth(self, tmp_path):
+        """Matching files down to three directory levels are indexed."""
+        _dump(tmp_path, "a/vmcore")
+        _dump(tmp_path, "a/vmcore-dmesg.txt")
+        _dump(tmp_path, "a/notes.txt")
+        _dump(tmp_path, "1/2/3/vmcore")
+        _dump(tmp_path, "1/2/3/4/vmcore")
+        catalog = _catalog(tmp_path)
+        catalog.refresh()
+        assert sorted(os.path.relpath(path, tmp_path) for path in catalog.dumps) == [
+            "1/2/3/vmcore", "a/vmcore", "a/vmcore-dmesg.txt"
+        ]
+        assert len(catalog.find_by_name("vmcore")) == 2
+
+    def test_refresh_rescans_only_changed_directories(self, tmp_path, monkeypatch):
+        """Unchanged directories cost a stat, not a listing."""
+        monkeypatch.setattr(crash_discovery, "RACY_WINDOW", 0)
+        for index in range(5):
+            _dump(tmp_path, f"dump{index}/vmcore", age=3600)
+        catalog = _catalog(tmp_path)
+        catalog.refresh()
+        scans = catalog.stats["directory_rescans"]
+
+        assert catalog.refresh() is False
+        assert catalog.stats["directory_rescans"] == scans
+
+        _dump(tmp_path, "dump5/vmcore")
+        (tmp_path / "dump0" / "vmcore").unlink()
+        assert catalog.refresh() is True
+        # The root (new subdir), dump5 itself and dump0 (removed file)
+        assert catalog.stats["directory_rescans"] == scans + 3
+        assert catalog.get(tmp_path / "dump5" / "vmcore") is not None
+        assert catalog.get(tmp_path / "dump0" / "vmcore") is None
+
+    def test_growing_dump_is_restated(self, tmp_path):
+        """A dump still being written updates without a directory change."""
+        path = _dump(tmp_path, "new/vmcore", b"x")
+        catalog = _catalog(tmp_path)
+        catalog.refresh()
+        with open(path, "ab") as f:
+            f.write(b"more data")
+        catalog.refresh()
+        assert catalog.get(path).size == 10
+
+    def test_index_persists_in_sqlite(self, tmp_path):
+        """A restarted catalog validates the stored index instead of walking."""
+        root = tmp_path / "crash"
+        _dump(root, "old/vmcore", age=3600)
+        db = str(tmp_path / "catalog.db")
+        _catalog(root, db_path=db).refresh()
+
+        _dump(root, "added/vmcore")
+        catalog = _catalog(root, db_path=db)
+        assert catalog.stats["loaded_from_db"] == 1
+        catalog.refresh()
+        assert catalog.stats["full_scans"] == 0
+        assert len(catalog.find_by_name("vmcore")) == 2
+
+
+    def test_newest_selects_without_full_sort(self, tmp_path):
+        """Heap selection returns the same dumps as sorting everything."""
+        for index in range(30):
+            _dump(tmp_path, f"d{index % 4}/vmcore.{index}", age=1000 + (index * 7919) % 97 * 60)
+        catalog = _catalog(tmp_path)
+        assert catalog.newest(3) == []
+        catalog.refresh()
+        by_age = sorted(catalog.all(), key=lambda dump: dump.timestamp, reverse=True)
+        assert catalog.newest(5) == by_age[:5]
+        assert catalog.newest(1) == by_age[:1]
+        assert catalog.newest(100) == by_age
+
+
+    def test_metadata_is_read_once_per_dump_version(self, tmp_path):
+        """Header metadata is cached, persisted and re-read after a change."""
+        path = _dump(tmp_path, "a/vmcore", age=600)
+        (tmp_path / "a" / "vmcore-dmesg.txt").write_text("Kernel panic - not syncing: Fatal exception\n")
+        db_path = str(tmp_path / "catalog.db")
+        catalog = _catalog(tmp_path, db_path=db_path)
+        catalog.refresh()
+        assert catalog.metadata(path).panic == "Kernel panic - not syncing: Fatal exception"
+        catalog.metadata(path)
+        assert (catalog.stats["metadata_reads"], catalog.stats["metadata_hits"]) == (1, 1)
+
+        reloaded = _catalog(tmp_path, db_path=db_path)
+        reloaded.refresh()
+        assert reloaded.metadata(path).format == "unknown"
+        assert reloaded.stats["metadata_reads"] == 0
+
+        _dump(tmp_path, "a/vmcore", data=b"longer dump")
+        reloaded.refresh(force=True)
+        reloaded.metadata(path)
+        assert reloaded.stats["metadata_reads"] == 1
+
+
+class TestCrashDumpDiscovery:
+    """Test discovery lookups served from the catalog."""
+
+    def test_lookup_by_name_is_not_limited_to_newest(self, tmp_path):
+        """Dumps older than the ten newest are still found by name."""
+        _dump(tmp_path, "oldest/vmcore.0", age=7200)
+        for index in range(1, 15):
+            _dump(tmp_path, f"d{index}/vmcore.{index}", age=60 * (15 - index))
+        discovery = CrashDumpDiscovery(str(tmp_path))
+        assert len(discovery.find_crash_dumps()) == 10
+        assert discovery.find_crash_dumps(max_dumps=1)[0].name == "vmcore.14"
+        assert discovery.get_crash_dump_by_name("vmcore.0").path == tmp_path / "oldest" / "vmcore.0"
+
+    def test_paths_and_globs_tell_same_named_dumps_apart(self, tmp_path):
+        """Relative paths, absolute paths and globs select among many vmcores."""
+        _dump(tmp_path, "127.0.0.1-2026-10-01/vmcore", age=300)
+        _dump(tmp_path, "127.0.0.1-2026-10-02/vmcore", age=200)
+        _dump(tmp_path, "10.0.0.5-2026-10-03/vmcore", age=100)
+        _dump(tmp_path, "10.0.0.5-2026-10-03/vmcore-dmesg.txt")
+        discovery = CrashDumpDiscovery(str(tmp_path))
+
+        assert discovery.get_crash_dump_by_name("vmcore").path == tmp_path / "10.0.0.5-2026-10-03" / "vmcore"
+        dump = discovery.get_crash_dump_by_name("127.0.0.1-2026-10-01/vmcore")
+        assert dump.path == tmp_path / "127.0.0.1-2026-10-01" / "vmcore"
+        assert discovery.search_crash_dumps(str(dump.path)) == [dump]
+        assert discovery.search_crash_dumps("2026-10-01/vmcore") == []
+        assert [d.path.parent.name for d in discovery.search_crash_dumps("127.0.0.1-*/vmcore")] == [
+            "127.0.0.1-2026-10-02", "127.0.0.1-2026-10-01"
+        ]
+        assert [d.name for d in discovery.search_crash_dumps("vmcore-*")] == ["vmcore-dmesg.txt"]
+        assert len(discovery.catalog.find_by_prefix("vm")) == 4
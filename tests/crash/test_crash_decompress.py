@@ -0,0 +1,140 @@
+"""Tests for decompressed copies of compressed crash dumps."""
+
+import asyncio
+import bz2
+import gc
+import gzip
+import lzma
+import os
+import struct
+
+from dynamic_mcp.crash_decompress import CrashDumpDecompressor
+from dynamic_mcp.crash_discovery import CrashDump
+from dynamic_mcp.crash_session import CrashSessionManager
+from dynamic_mcp.kernel_detection import KernelFile
+
+
+def _dump(path, data: bytes) -> CrashDump:
+    path.write_bytes(data)
+    return CrashDump(path.name, path, len(data), None)
+
+
+def _flattened(dump: bytes, record_size=4096) -> bytes:
+    header = (b"makedumpfile\0".ljust(16, b"\0") + struct.pack(">qq", 1, 1)).ljust(4096, b"\0")
+    # Records out of order, with the second block left as a hole
+    offsets = [offset for offset in range(0, len(dump), record_size) if offset != record_size][::-1]
+    records = b"".join(
+        struct.pack(">qq", offset, len(dump[offset:offset + record_size])) + dump[offset:offset + record_size]
+        for offset in offsets
+    )
+    return header + records + struct.pack(">qq", -1, -1)
+
+
+class TestCrashDumpDecompressor:
+    """Test the decompression cache."""
+
+    def test_compressed_dumps_are_decompressed_once(self, tmp_path):
+        """gz/xz/bz2 dumps get one copy each, shared by concurrent and later callers."""
+        data = os.urandom(64 * 1024)
+        dumps = [
+            _dump(tmp_path / "vmcore.gz", gzip.compress(data)),
+            _dump(tmp_path / "vmcore.xz", lzma.compress(data)),
+            _dump(tmp_path / "vmcore.bz2", bz2.compress(data)),
+        ]
+        plain = _dump(tmp_path / "vmcore", data)
+        decompressor = CrashDumpDecompressor(str(tmp_path / "cache"))
+
+        async def run_test():
+            first = await asyncio.gather(*(decompressor.prepare(dump) for dump in dumps * 3))
+            again = [await decompressor.prepare(dump) for dump in dumps]
+            return first, again, await decompressor.prepare(plain)
+
+        try:
+            first, again, unchanged = asyncio.run(run_test())
+        finally:
+            decompressor.close()
+        assert unchanged is plain
+        assert len({copy.path for copy in first}) == 3
+        assert [copy.path for copy in again] == [copy.path for copy in first[:3]]
+        assert all(copy.path.read_bytes() == data and copy.path.name == "vmcore" for copy in again)
+        assert [copy.name for copy in again] == ["vmcore.gz", "vmcore.xz", "vmcore.bz2"]
+        assert decompressor.stats["decompressed"] == 3
+        assert decompressor.stats["hits"] == 3
+
+    def test_flattened_dumps_are_reassembled(self, tmp_path):
+        """Flattened records land at their offsets, also inside a compressed file."""
+        data = os.urandom(5 * 4096)
+        expected = data[:4096] + b"\0" * 4096 + data[8192:]
+        flat = _dump(tmp_path / "vmcore.flat", _flattened(data))
+        flat_gz = _dump(tmp_path / "vmcore.flat.gz", gzip.compress(_flattened(data)))
+        truncated = _dump(tmp_path / "vmcore-truncated.flat", _flattened(data)[:6000])
+        decompressor = CrashDumpDecompressor()
+
+        async def run_test():
+            copies = [await decompressor.prepare(dump) for dump in (flat, flat_gz)]
+            try:
+                await decompressor.prepare(truncated)
+            except RuntimeError as e:
+                return copies, str(e)
+
+        try:
+            copies, error = asyncio.run(run_test())
+            assert [copy.path.read_bytes() for copy in copies] == [expected, expected]
+            assert "Cannot decompress" in error and "early" in error
+            assert decompressor.stats["failures"] == 1
+            assert list(decompressor.cache_dir.glob("*/*.tmp")) == []
+        finally:
+            decompressor.close()
+        assert not decompressor.cache_dir.exists()
+
+    def test_failure_with_every_caller_cancelled_is_retrieved(self, tmp_path):
+        """A failed decompression nobody waits for any more does not leak an unretrieved error."""
+        truncated = _dump(tmp_path / "vmcore.gz", gzip.compress(os.urandom(64 * 1024))[:1000])
+        decompressor = CrashDumpDecompressor(str(tmp_path / "cache"))
+        unhandled = []
+
+        async def run_test():
+            asyncio.get_running_loop().set_exception_handler(lambda loop, context: unhandled.append(context))
+            caller = asyncio.ensure_future(decompressor.prepare(truncated))
+            while not decompressor._pending:
+                await asyncio.sleep(0.01)
+            pending = next(iter(decompressor._pending.values()))
+            caller.cancel()
+            await asyncio.wait([pending], timeout=30)
+            del pending
+            gc.collect()
+
+        try:
+            asyncio.run(run_test())
+        finally:
+            decompressor.close()
+        assert decompressor.stats["failures"] == 1
+        assert unhandled == []
+
+    def test_session_uses_copy_and_lru_evicts(self, tmp_path, fake_crash):
+        """crash opens the copy; the least recently used copy is evicted first."""
+        _, kernel = fake_crash
+        dumps = [_dump(tmp_path / f"vmcore-{index}.gz", gzip.compress(os.urandom(64 * 1024)))
+                 for index in range(3)]
+        decompressor = CrashDumpDecompressor(str(tmp_path / "cache"), max_bytes=150 * 1024)
+        manager = CrashSessionManager(max_sessions=2)
+
+        async def run_test():
+            first = await decompressor.prepare(dumps[0])
+            assert await manager.start_session_async(first, KernelFile("vmlinux", kernel, "unknown", 12), timeout=10)
+            session_path = manager.active_session.dump_path
+            second = await decompressor.prepare(dumps[1])
+            # Make the second copy the least recently used
+            os.utime(second.path, (1, 1))
+            third = await decompressor.prepare(dumps[2])
+            manager.close_all_sessions()
+            return first, second, third, session_path
+
+        try:
+            first, second, third, session_path = asyncio.run(run_test())
+        finally:
+            decompressor.close()
+        assert session_path == str(first.path)
+        assert first.path.exists() and third.path.exists()
+        assert not second.path.exists()
+        assert decompressor.stats["evictions"] == 1
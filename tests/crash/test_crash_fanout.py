@@ -0,0 +1,121 @@
+"""Tests for fanning crash commands out over replica sessions."""
+
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+from dynamic_mcp.crash_fanout import parse_cpu_count, parse_pids, parse_slab_caches, plan_fanout
+from dynamic_mcp.crash_session import CrashSession, CrashSessionManager
+
+
+def _start(manager, fake_crash):
+    dump, kernel = fake_crash
+    return manager.start_session_async(
+        SimpleNamespace(name=dump.name, path=dump),
+        SimpleNamespace(name=kernel.name, path=kernel),
+        timeout=10
+    )
+
+
+class TestFanoutPlanning:
+    """Test parsing probe output into shard commands."""
+
+    def test_parsers(self):
+        """CPU count, PIDs and slab names are read from crash output."""
+        assert parse_cpu_count("    DUMPFILE: vmcore\n        CPUS: 8 [OFFLINE: 2]\n") == 8
+        ps = (
+            "   PID    PPID  CPU       TASK        ST  %MEM     VSZ    RSS  COMM\n"
+            ">     0      0   0  ffffffff81a13440  RU   0.0       0      0  [swapper/0]\n"
+            ">     0      0   1  ffff88003e890000  RU   0.0       0      0  [swapper/1]\n"
+            "      1      0   1  ffff88003e940000  IN   0.1  193700   6804  systemd\n"
+        )
+        assert parse_pids(ps) == [0, 1]
+        kmem = (
+            "CACHE             OBJSIZE  ALLOCATED     TOTAL  SLABS  SSIZE  NAME\n"
+            "ffff88803e4c8e00      192       2310      2310     55     8k  kmalloc-192\n"
+        )
+        assert parse_slab_caches(kmem) == ["kmalloc-192"]
+
+    def test_pid_ranges_cover_every_pid(self):
+        """PID shards are contiguous and together cover the task list."""
+        ps = "".join(f"  {pid}  1  0  ffff  IN  0.0  0  0  task\n" for pid in range(1, 11))
+        commands = plan_fanout("bt_per_pid", ps, 3)
+        assert commands == ["bt 1 2 3 4", "bt 5 6 7", "bt 8 9 10"]
+
+
+class TestCrashFanout:
+    """Test CrashSessionManager.execute_fanout_async."""
+
+    def test_shards_run_in_parallel_and_merge_in_order(self, fake_crash, monkeypatch):
+        """Replicas share the shards and results keep command order."""
+        monkeypatch.setenv("FAKE_CRASH_BT_SECONDS", "0.3")
+        manager = CrashSessionManager()
+        commands = [f"bt -c {cpu}" for cpu in range(8)]
+
+        async def run_test():
+            await _start(manager, fake_crash)
+            # Start the replicas before timing the sweep
+            await manager.execute_fanout_async(["sys"] * 4, replicas=4)
+            started = time.monotonic()
+            results, used, _ = await manager.execute_fanout_async(commands, replicas=4)
+            elapsed = time.monotonic() - started
+            replicas = len(manager.active_session.replicas)
+            manager.close_all_sessions()
+            return results, used, elapsed, replicas
+
+        results, used, elapsed, replicas = asyncio.run(run_test())
+        assert used == 4
+        assert replicas == 3
+        assert [result["command"] for result in results] == commands
+        assert all(f"CPU: {cpu}" in result["output"] for cpu, result in enumerate(results))
+        # Serially this takes 8 * 0.3s
+        assert elapsed < 1.6
+
+    def test_close_waits_for_replica_commands(self, fake_crash, monkeypatch):
+        """Closing a session lets shards already running on its replicas finish."""
+        monkeypatch.setenv("FAKE_CRASH_BT_SECONDS", "0.5")
+        manager = CrashSessionManager()
+        commands = [f"bt -c {cpu}" for cpu in range(4)]
+        closed_on = {}
+        close = CrashSession.close
+
+        def recording_close(session):
+            closed_on.setdefault(session.session_id, threading.current_thread().name)
+            close(session)
+
+        monkeypatch.setattr(CrashSession, "close", recording_close)
+
+        async def run_test():
+            await _start(manager, fake_crash)
+            await manager.execute_fanout_async(["sys"] * 4, replicas=4)
+            replicas = list(manager.active_session.replicas)
+            fanout = asyncio.ensure_future(manager.execute_fanout_async(commands, replicas=4))
+            await asyncio.sleep(0.2)
+            await manager.close_session_async()
+            results, used, _ = await fanout
+            return results, used, replicas
+
+        results, used, replicas = asyncio.run(run_test())
+        assert used == 4
+        assert [result["return_code"] for result in results] == [0] * 4
+        assert not any(replica.is_active() for replica in replicas)
+        # Each replica is closed by its own worker, queued behind its shard
+        assert all(closed_on[replica.session_id].startswith(f"crash-worker-{replica.session_id}")
+                   for replica in replicas)
+
+    def test_stateful_commands_are_refused(self, fake_crash):
+        """Fan-out never runs commands that change session state."""
+        manager = CrashSessionManager()
+
+        async def run_test():
+            await _start(manager, fake_crash)
+            outcome = await manager.execute_fanout_async(["bt -c 0", "set 1"], replicas=2)
+            replicas = len(manager.active_session.replicas)
+            manager.close_all_sessions()
+            return outcome, replicas
+
+        (results, used, error), replicas = asyncio.run(run_test())
+        assert results is None
+        assert "set 1" in error
+        assert replicas == 0
@@ -0,0 +1,208 @@
+"""Tests for crash output storage and filtering."""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from dynamic_mcp.crash_output import (
+    LINES_PER_CHECKPOINT, SPILL_BATCH_CHARS, CrashOutputStore, OutputCollector, OutputFilter,
+    StoredOutput
+)
+
+
+def _stored(store, lines):
+    output = store.create("kmem -S")
+    for start in range(0, lines, 700):
+        output.write("".join(f"line {i}\n" for i in range(start, min(lines, start + 700))))
+    output.finish()
+    return output
+
+
+class TestStoredOutput:
+    """Test paging, line ranges and grep over a stored output."""
+
+    def test_line_ranges_across_checkpoints(self, tmp_path):
+        """Line lookups are exact on both sides of a checkpoint."""
+        store = CrashOutputStore(str(tmp_path))
+        output = _stored(store, 5000)
+        assert output.lines == 5000
+        text, next_line = output.read_lines(LINES_PER_CHECKPOINT, LINES_PER_CHECKPOINT + 2)
+        assert text.splitlines() == [f"line {i}" for i in range(1023, 1026)]
+        assert next_line == LINES_PER_CHECKPOINT + 3
+        text, next_line = output.read_lines(4999, 6000)
+        assert text == "line 4998\nline 4999\n"
+        assert next_line is None
+        store.close()
+
+    def test_pages_end_on_line_boundaries(self, tmp_path):
+        """Reading page after page reproduces the output exactly."""
+        store = CrashOutputStore(str(tmp_path))
+        output = _stored(store, 3000)
+        pages = []
+        offset = 0
+        while offset is not None:
+            text, offset = output.read_page(offset, 1000)
+            assert text.endswith("\n")
+            pages.append(text)
+        assert "".join(pages) == "".join(f"line {i}\n" for i in range(3000))
+        store.close()
+
+    def test_grep_resumes(self, tmp_path):
+        """Matches carry line numbers and a resume point."""
+        store = CrashOutputStore(str(tmp_path))
+        output = _stored(store, 3000)
+        matches, resume = output.grep(r"^line \d*7$", max_matches=2)
+        assert matches == [(8, "line 7"), (18, "line 17")]
+        matches, resume = output.grep(r"^line 29\d\d$", start=resume, max_matches=1000)
+        assert len(matches) == 100
+        assert resume is None
+        store.close()
+
+
+class TestCrashOutputStore:
+    """Test eviction and the collector."""
+
+    def test_expired_outputs_are_deleted(self, tmp_path):
+        """Outputs not read within the TTL are removed from disk."""
+        store = CrashOutputStore(str(tmp_path), ttl=60)
+        output = _stored(store, 10)
+        output.last_access = time.time() - 120
+        assert store.get(output.handle) is None
+        assert not output.path.exists()
+        assert store.evictions == 1
+
+    def test_size_limit_drops_least_recently_read(self, tmp_path):
+        """The store stays under its byte budget."""
+        store = CrashOutputStore(str(tmp_path), max_bytes=20000)
+        first = _stored(store, 1000)
+        second = _stored(store, 1000)
+        first.last_access = second.last_access - 1
+        _stored(store, 1000)
+        store.evict()
+        assert store.get(first.handle) is None
+        assert store.get(second.handle) is not None
+        assert store.total_bytes() <= 20000
+
+    def test_collector_spills_past_one_page(self, tmp_path):
+        """Small outputs stay inline; large ones are stored."""
+        store = CrashOutputStore(str(tmp_path))
+        small = OutputCollector(store, "sys", page_bytes=1024)
+        small.write("short output\n")
+        assert small.finish() == ("short output\n", None)
+
+        large = OutputCollector(store, "kmem -S", page_bytes=1024)
+        for i in range(1000):
+            large.write(f"line {i}\n")
+        page, output = large.finish()
+        assert len(page) <= 1024
+        assert page.startswith("line 0\n")
+        assert output.lines == 1000
+        assert store.get(output.handle) is output
+        store.close()
+        assert not output.path.exists()
+
+    def test_async_collector_writes_in_batches_off_the_loop(self, tmp_path, monkeypatch):
+        """Spilled chunks are written in batches by a worker thread."""
+        store = CrashOutputStore(str(tmp_path))
+        writers = []
+        write = StoredOutput.write
+
+        def record_write(output, text):
+            writers.append(threading.current_thread())
+            write(output, text)
+
+        monkeypatch.setattr(StoredOutput, "write", record_write)
+        line = "x" * 99 + "\n"
+        count = 3 * SPILL_BATCH_CHARS // len(line)
+
+        async def run_test():
+            collector = OutputCollector(store, "kmem -S", page_bytes=1024)
+            for _ in range(count):
+                await collector.write_async(line)
+            return threading.current_thread(), await collector.finish_async()
+
+        loop_thread, (page, output) = asyncio.run(run_test())
+        assert page.startswith(line)
+        assert output.lines == count
+        assert output.size == count * len(line)
+        assert 3 <= len(writers) <= 5
+        assert loop_thread not in writers
+        store.close()
+
+    def test_abort_waits_for_a_running_flush(self, tmp_path):
+        """A caller cancelled mid-flush still discards the output once it is written."""
+        store = CrashOutputStore(str(tmp_path))
+        release = threading.Event()
+        create = store.create
+
+        def slow_create(*args, **kwargs):
+            release.wait(5)
+            return create(*args, **kwargs)
+
+        store.create = slow_create
+
+        async def run_test():
+            collector = OutputCollector(store, "kmem -S", page_bytes=16)
+            task = asyncio.ensure_future(collector.write_async("line\n" * 10))
+            await asyncio.sleep(0.05)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+            collector.abort()
+            release.set()
+            await collector._flushing
+            await asyncio.sleep(0)
+            return collector
+
+        collector = asyncio.run(run_test())
+        assert collector.output is None
+        assert store.outputs == {}
+        assert list(tmp_path.iterdir()) == []
+
+
+def _feed(output_filter, text, chunk_size=7):
+    kept = []
+    for start in range(0, len(text), chunk_size):
+        kept.append(output_filter.feed(text[start:start + chunk_size]))
+        if output_filter.done:
+            break
+    kept.append(output_filter.flush())
+    return "".join(kept)
+
+
+class TestOutputFilter:
+    """Test line filtering across chunk boundaries."""
+
+    TEXT = "".join(f"PID: {i}  COMMAND: {'kworker' if i % 3 else 'bash'}\n" for i in range(30))
+
+    def test_regex_matches_lines_split_across_chunks(self):
+        """Lines are matched whole even when chunks cut them."""
+        output_filter = OutputFilter(pattern=r"bash$")
+        kept = _feed(output_filter, self.TEXT)
+        assert kept.splitlines() == [f"PID: {i}  COMMAND: bash" for i in range(0, 30, 3)]
+        assert output_filter.describe() == "[Filtered: 10 of 30 lines matched]"
+
+    def test_head_stops_early_and_tail_keeps_last(self):
+        """head is done after N lines; tail releases the last N at the end."""
+        head = OutputFilter(head=2)
+        assert _feed(head, self.TEXT) == "PID: 0  COMMAND: bash\nPID: 1  COMMAND: kworker\n"
+        assert head.lines_read == 2
+        tail = OutputFilter(pattern="bash", tail=2)
+        assert _feed(tail, self.TEXT) == "PID: 24  COMMAND: bash\nPID: 27  COMMAND: bash\n"
+
+    def test_max_bytes_truncates_on_line_boundary(self):
+        """Output is cut at a whole line within the byte budget."""
+        output_filter = OutputFilter(max_bytes=50)
+        kept = _feed(output_filter, self.TEXT)
+        assert len(kept) <= 50
+        assert kept.endswith("\n")
+        assert output_filter.truncated
+
+    def test_invalid_combinations(self):
+        """head with tail and negative limits are rejected."""
+        with pytest.raises(ValueError):
+            OutputFilter(head=1, tail=1)
+        with pytest.raises(ValueError):
+            OutputFilter(max_bytes=-1)
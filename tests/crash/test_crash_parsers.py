@@ -0,0 +1,116 @@
+"""Tests for the structured crash output parsers."""
+
+from dynamic_mcp.crash_parsers import (
+    BtParser, KmemInfoParser, LogParser, ModParser, PsParser, SysParser, get_parser
+)
+
+
+def _parse(parser, text, chunk_size=5):
+    for start in range(0, len(text), chunk_size):
+        parser.feed_text(text[start:start + chunk_size])
+    return parser.result()
+
+
+PS = """\
+   PID    PPID  CPU       TASK        ST  %MEM     VSZ    RSS  COMM
+>     0      0   0  ffffffff81a13440  RU   0.0       0      0  [swapper/0]
+      1      0   1  ffff88003e940000  IN   0.1  193700   6804  systemd
+   1234      1   2  ffff88003f2d8000  UN   1.5 2003456 120044  my app
+"""
+
+BT = """\
+PID: 1234   TASK: ffff88003f2d8000  CPU: 2   COMMAND: "my app"
+ #0 [ffffc90000ab3d48] __schedule at ffffffff81a8c6b2
+ #1 [ffffc90000ab3dd8] schedule at ffffffff81a8cb3a
+ #2 [ffffc90000ab3df0] xfs_buf_lock at ffffffffc05a1234 [xfs]
+    RIP: 00007f1e2b5c0a4b  RSP: 00007ffd2e1c7a58  RFLAGS: 00000246
+
+PID: 1      TASK: ffff88003e940000  CPU: 1   COMMAND: "systemd"
+ #0 [ffffc90000013e28] __schedule at ffffffff81a8c6b2
+"""
+
+KMEM_I = """\
+                 PAGES        TOTAL      PERCENTAGE
+    TOTAL MEM  1979554       7.6 GB         ----
+         FREE    77233     301.7 MB    3% of TOTAL MEM
+         USED  1902321       7.3 GB   96% of TOTAL MEM
+   TOTAL SWAP  1048575         4 GB         ----
+"""
+
+MOD = """\
+     MODULE       NAME                      TEXT_BASE         SIZE  OBJECT FILE
+ffffffffc0002000  libata               ffffffffc0002000    262144  (not loaded)  [CONFIG_KALLSYMS]
+ffffffffa0010000  dm_mod    123456  /lib/modules/dm_mod.ko
+"""
+
+SYS = """\
+      KERNEL: /usr/lib/debug/vmlinux
+    DUMPFILE: /var/crash/vmcore
+              [PARTIAL DUMP]
+        CPUS: 8 [OFFLINE: 2]
+     RELEASE: 4.18.0-553.el8.x86_64
+       PANIC: "Kernel panic - not syncing: sysrq triggered crash"
+"""
+
+LOG = """\
+[    0.000000] Linux version 4.18.0-553.el8.x86_64
+[ 1234.567890] BUG: unable to handle kernel NULL pointer dereference at 0000000000000008
+[ 1234.567900] RIP: 0010:xfs_buf_lock+0x12/0x80 [xfs]
+continuation without timestamp
+"""
+
+
+class TestCrashParsers:
+    """Test each parser on sample output fed in small chunks."""
+
+    def test_ps(self):
+        """Task rows keep the full command name and the active marker."""
+        result = _parse(PsParser(), PS)
+        assert result["count"] == 3
+        assert result["tasks"][0][-1] is True
+        assert result["tasks"][2] == [1234, 1, 2, "ffff88003f2d8000", "UN", 1.5, 2003456, 120044, "my app", False]
+
+    def test_bt(self):
+        """Frames are grouped per task, with the module when present."""
+        result = _parse(BtParser(), BT)
+        first, second = result["tasks"]
+        assert (first["pid"], first["cpu"], first["command"]) == (1234, 2, "my app")
+        assert first["frames"][2] == [2, "xfs_buf_lock", "ffffffffc05a1234", "ffffc90000ab3df0", "xfs"]
+        assert len(second["frames"]) == 1
+
+    def test_kmem_i(self):
+        """Summary rows become keyed entries with percentages."""
+        result = _parse(KmemInfoParser(), KMEM_I)
+        assert result["total_mem"] == {"pages": 1979554, "total": "7.6 GB"}
+        assert result["free"]["percent"] == 3
+        assert "total_swap" in result
+
+    def test_mod(self):
+        """Both mod layouts give name, address, size and object file."""
+        result = _parse(ModParser(), MOD)
+        assert result["modules"][0] == ["libata", "ffffffffc0002000", 262144, "(not loaded) [CONFIG_KALLSYMS]"]
+        assert result["modules"][1] == ["dm_mod", "ffffffffa0010000", 123456, "/lib/modules/dm_mod.ko"]
+
+    def test_sys(self):
+        """Fields are keyed, continuation lines appended, panic unquoted."""
+        result = _parse(SysParser(), SYS)
+        assert result["dumpfile"] == "/var/crash/vmcore [PARTIAL DUMP]"
+        assert result["cpus"] == 8
+        assert result["panic"] == "Kernel panic - not syncing: sysrq triggered crash"
+
+    def test_log(self):
+        """Entries carry timestamps and oops lines are highlighted."""
+        result = _parse(LogParser(), LOG)
+        assert result["count"] == 4
+        assert result["entries"][1][0] == 1234.56789
+        assert result["entries"][3] == [None, None, "continuation without timestamp"]
+        assert [index for index, _ in result["highlights"]] == [1, 2]
+
+    def test_registry(self):
+        """Commands map to parsers unless a flag changes the format."""
+        assert isinstance(get_parser("ps"), PsParser)
+        assert isinstance(get_parser("bt -a"), BtParser)
+        assert isinstance(get_parser("kmem  -i"), KmemInfoParser)
+        assert get_parser("kmem -s") is None
+        assert get_parser("sys -c") is None
+        assert get_parser("struct task_struct") is None
@@ -0,0 +1,64 @@
+"""Tests for background pre-warming of crash sessions."""
+
+import asyncio
+
+from dynamic_mcp.crash_discovery import CrashDumpDiscovery
+from dynamic_mcp.crash_prewarm import CrashSessionPrewarmer
+from dynamic_mcp.crash_session import CrashSessionManager
+from dynamic_mcp.kernel_detection import KernelDetection
+
+
+class TestCrashSessionPrewarmer:
+    """Test pre-warming sessions for discovered dumps."""
+
+    def _setup(self, fake_crash):
+        dump, kernel = fake_crash
+        root = dump.parent.parent
+        discovery = CrashDumpDiscovery(str(root))
+        manager = CrashSessionManager(max_sessions=4)
+        prewarmer = CrashSessionPrewarmer(discovery, manager, KernelDetection(str(root / "boot")), max_concurrent=2)
+        return discovery, manager, prewarmer
+
+    def test_latest_dump_is_prewarmed_and_hit(self, fake_crash):
+        """The first query after startup hits the pre-warmed session."""
+        discovery, manager, prewarmer = self._setup(fake_crash)
+
+        async def run_test():
+            await prewarmer.scan_once()
+            await asyncio.gather(*prewarmer._tasks)
+            prewarmed = manager.stats["prewarmed"]
+
+            dump = discovery.get_latest_crash_dump()
+            kernel = KernelDetection("/nonexistent", str(dump.path)).find_matching_kernel(dump)
+            assert await manager.start_session_async(dump, kernel, timeout=10)
+            manager.close_all_sessions()
+            return prewarmed, dict(manager.stats)
+
+        prewarmed, stats = asyncio.run(run_test())
+        assert prewarmed == 1
+        assert stats["warm_hits"] == 1
+        assert stats["cold_starts"] == 0
+
+    def test_new_dump_prewarmed_once_settled(self, fake_crash):
+        """A new dump is pre-warmed only after its size stops changing."""
+        dump, _ = fake_crash
+        discovery, manager, prewarmer = self._setup(fake_crash)
+        new_dump = dump.parent / "vmcore.new"
+
+        async def run_test():
+            await prewarmer.scan_once()
+            await asyncio.gather(*prewarmer._tasks)
+
+            new_dump.write_bytes(b"partial")
+            await prewarmer.scan_once()
+            after_first_scan = len(prewarmer._tasks)
+
+            await prewarmer.scan_once()
+            await asyncio.gather(*prewarmer._tasks)
+            keys = [key[0] for key in manager.sessions]
+            manager.close_all_sessions()
+            return after_first_scan, keys
+
+        after_first_scan, keys = asyncio.run(run_test())
+        assert after_first_scan == 0
+        assert str(new_dump) in keys
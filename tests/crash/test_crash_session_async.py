@@ -0,0 +1,82 @@
+"""Tests for running crash commands off the event loop."""
+
+import asyncio
+import time
+from types import SimpleNamespace
+
+from dynamic_mcp.crash_session import CrashSessionManager
+
+
+def _dump_and_kernel(dump, kernel):
+    return (
+        SimpleNamespace(name=dump.name, path=dump),
+        SimpleNamespace(name=kernel.name, path=kernel),
+    )
+
+
+class TestCrashSessionAsync:
+    """Test the async execution layer around CrashSession."""
+
+    def test_execute_command_async(self, fake_crash):
+        """Commands run through the worker thread return normal results."""
+        crash_dump, kernel_file = _dump_and_kernel(*fake_crash)
+        manager = CrashSessionManager()
+
+        async def run_test():
+            assert await manager.start_session_async(crash_dump, kernel_file, timeout=10)
+            try:
+                return await manager.execute_command_async("echo hello", timeout=10)
+            finally:
+                await manager.close_session_async()
+
+        output, error, return_code = asyncio.run(run_test())
+        assert return_code == 0
+        assert output == "hello"
+        assert not manager.is_session_active()
+
+    def test_slow_command_does_not_block_event_loop(self, fake_crash, monkeypatch):
+        """The loop keeps ticking while a slow crash command is running."""
+        monkeypatch.setenv("FAKE_CRASH_SLOW_SECONDS", "1")
+        crash_dump, kernel_file = _dump_and_kernel(*fake_crash)
+        manager = CrashSessionManager()
+
+        async def run_test():
+            assert await manager.start_session_async(crash_dump, kernel_file, timeout=10)
+            try:
+                command = asyncio.ensure_future(manager.execute_command_async("foreach bt", timeout=10))
+                max_gap = 0.0
+                last = time.monotonic()
+                while not command.done():
+                    await asyncio.sleep(0.01)
+                    now = time.monotonic()
+                    max_gap = max(max_gap, now - last)
+                    last = now
+                return await command, max_gap
+            finally:
+                await manager.close_session_async()
+
+        (output, error, return_code), max_gap = asyncio.run(run_test())
+        assert return_code == 0
+        assert "systemd" in output
+        assert max_gap < 0.5
+
+    def test_concurrent_starts_reuse_session(self, fake_crash):
+        """Concurrent starts for the same dump spawn crash only once."""
+        crash_dump, kernel_file = _dump_and_kernel(*fake_crash)
+        manager = CrashSessionManager()
+
+        async def run_test():
+            results = await asyncio.gather(
+                manager.start_session_async(crash_dump, kernel_file, timeout=10),
+                manager.start_session_async(crash_dump, kernel_file, timeout=10),
+            )
+            outputs = await asyncio.gather(
+                manager.execute_command_async("echo one", timeout=10),
+                manager.execute_command_async("echo two", timeout=10),
+            )
+            await manager.close_session_async()
+            return results, outputs
+
+        results, outputs = asyncio.run(run_test())
+        assert results == [True, True]
+        assert [output for output, _, _ in outputs] == ["one", "two"]
@@ -0,0 +1,123 @@
+"""Tests for the crash session pool."""
+
+import asyncio
+from types import SimpleNamespace
+
+from dynamic_mcp.crash_session import CrashSession, CrashSessionManager
+
+
+def _dumps(fake_crash, count):
+    """Create ``count`` distinct dumps sharing the fake kernel."""
+    dump, kernel = fake_crash
+    kernel_file = SimpleNamespace(name=kernel.name, path=kernel)
+    dumps = []
+    for i in range(count):
+        path = dump.parent / f"vmcore.{i}"
+        path.write_bytes(b"fake vmcore")
+        dumps.append(SimpleNamespace(name=path.name, path=path))
+    return dumps, kernel_file
+
+
+class TestCrashSessionPool:
+    """Test pooling, eviction and targeting of crash sessions."""
+
+    def test_switching_dumps_reuses_sessions(self, fake_crash):
+        """Going back to a previous dump reuses its crash process."""
+        (first, second), kernel_file = _dumps(fake_crash, 2)
+        manager = CrashSessionManager(max_sessions=2)
+
+        async def run_test():
+            assert await manager.start_session_async(first, kernel_file, timeout=10)
+            first_id = manager.active_session.session_id
+            assert await manager.start_session_async(second, kernel_file, timeout=10)
+            assert await manager.start_session_async(first, kernel_file, timeout=10)
+            reused_id = manager.active_session.session_id
+            count = len(manager.sessions)
+            manager.close_all_sessions()
+            return first_id, reused_id, count
+
+        first_id, reused_id, count = asyncio.run(run_test())
+        assert first_id == reused_id
+        assert count == 2
+        assert not manager.sessions
+
+    def test_lru_eviction(self, fake_crash):
+        """The least recently used session is evicted when the pool is full."""
+        (first, second, third), kernel_file = _dumps(fake_crash, 3)
+        manager = CrashSessionManager(max_sessions=2)
+
+        async def run_test():
+            await manager.start_session_async(first, kernel_file, timeout=10)
+            await manager.start_session_async(second, kernel_file, timeout=10)
+            # Touch the first dump so the second becomes least recently used
+            await manager.start_session_async(first, kernel_file, timeout=10)
+            await manager.start_session_async(third, kernel_file, timeout=10)
+            paths = [key[0] for key in manager.sessions]
+            manager.close_all_sessions()
+            return paths
+
+        paths = asyncio.run(run_test())
+        assert paths == [str(first.path), str(third.path)]
+
+    def test_failed_start_keeps_the_pool(self, fake_crash, monkeypatch):
+        """A full pool only evicts once the new session is up."""
+        (first, broken), kernel_file = _dumps(fake_crash, 2)
+        manager = CrashSessionManager(max_sessions=1)
+        start = CrashSession.start
+        monkeypatch.setattr(CrashSession, "start",
+                            lambda self, timeout=180: self.dump_path != str(broken.path) and start(self, timeout))
+
+        async def run_test():
+            await manager.start_session_async(first, kernel_file, timeout=10)
+            started = await manager.start_session_async(broken, kernel_file, timeout=10)
+            paths = [key[0] for key in manager.sessions]
+            alive = manager.active_session.is_active()
+            manager.close_all_sessions()
+            return started, paths, alive
+
+        started, paths, alive = asyncio.run(run_test())
+        assert not started
+        assert paths == [str(first.path)]
+        assert alive
+
+    def test_idle_and_memory_eviction(self, fake_crash, monkeypatch):
+        """Idle sessions and sessions over the RSS budget are closed."""
+        (first, second), kernel_file = _dumps(fake_crash, 2)
+        manager = CrashSessionManager(max_sessions=4, idle_timeout=60, max_rss_mb=100)
+        monkeypatch.setattr(CrashSession, "get_rss", lambda self: 80 * 1024 * 1024)
+
+        async def run_test():
+            await manager.start_session_async(first, kernel_file, timeout=10)
+            await manager.start_session_async(second, kernel_file, timeout=10)
+            # 2 x 80 MB exceeds the 100 MB budget, so the older one went
+            after_memory = [key[0] for key in manager.sessions]
+
+            manager.active_session.last_used -= 120
+            evicted = await manager.evict_idle_sessions()
+            return after_memory, evicted
+
+        after_memory, evicted = asyncio.run(run_test())
+        assert after_memory == [str(second.path)]
+        assert evicted == 1
+        assert not manager.sessions
+
+    def test_execute_in_named_session(self, fake_crash):
+        """Commands can target a session that is not the current one."""
+        (first, second), kernel_file = _dumps(fake_crash, 2)
+        manager = CrashSessionManager(max_sessions=2)
+
+        async def run_test():
+            await manager.start_session_async(first, kernel_file, timeout=10)
+            first_id = manager.active_session.session_id
+            await manager.start_session_async(second, kernel_file, timeout=10)
+            result = await manager.execute_command_async("echo hi", timeout=10, session_id=first_id)
+            current = manager.active_session.session_id
+            missing = await manager.execute_command_async("echo hi", timeout=10, session_id="nope")
+            manager.close_all_sessions()
+            return first_id, result, current, missing
+
+        first_id, result, current, missing = asyncio.run(run_test())
+        assert result == ("hi", "", 0)
+        assert current == first_id
+        assert missing[2] == 1
+        assert "nope" in missing[1]
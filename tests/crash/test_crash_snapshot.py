@@ -0,0 +1,120 @@
+"""Tests for crash session snapshots."""
+
+import asyncio
+import threading
+from types import SimpleNamespace
+
+from dynamic_mcp.crash_cache import CrashResultCache
+from dynamic_mcp.crash_session import CrashSessionManager
+from dynamic_mcp.crash_snapshot import CrashSessionSnapshots
+
+
+def _manager(snapshot_dir):
+    """A manager as a freshly (re)started server would build it."""
+    cache = CrashResultCache()
+    return CrashSessionManager(result_cache=cache, snapshots=CrashSessionSnapshots(str(snapshot_dir), cache))
+
+
+def _pair(dump, kernel):
+    return SimpleNamespace(name=dump.name, path=dump), SimpleNamespace(name=kernel.name, path=kernel)
+
+
+class TestCrashSessionSnapshots:
+    """Test saving session results and restoring them after a restart."""
+
+    def test_restart_answers_from_snapshot_without_crash(self, tmp_path, fake_crash):
+        """Saved results are served by a restored session; crash starts on the first miss."""
+        dump, kernel = fake_crash
+        first = _manager(tmp_path / "snapshots")
+
+        async def before_restart():
+            await first.start_session_async(*_pair(dump, kernel), timeout=10)
+            results = [await first.execute_command_async(command, timeout=10) for command in ("sys", "ps")]
+            await first.close_session_async()
+            return results
+
+        async def after_restart(manager):
+            assert await manager.start_session_async(*_pair(dump, kernel), timeout=10)
+            session = manager.active_session
+            restored = [await manager.execute_command_async(command, timeout=10) for command in ("sys", " ps ")]
+            deferred = session.deferred and session.process is None
+            miss = await manager.execute_command_async("echo hello", timeout=10)
+            started = session.process is not None
+            manager.close_all_sessions()
+            return restored, deferred, miss, started
+
+        saved = asyncio.run(before_restart())
+        second = _manager(tmp_path / "snapshots")
+        restored, deferred, miss, started = asyncio.run(after_restart(second))
+        assert restored == saved
+        assert deferred
+        assert miss == ("hello", "", 0)
+        assert started
+        assert second.stats["restored"] == 1
+        assert second.stats["snapshot_hits"] == 2
+        assert second.stats["cold_starts"] == 0
+
+        # The miss was added to the snapshot
+        third = _manager(tmp_path / "snapshots")
+        assert third.start_session(*_pair(dump, kernel), timeout=10)
+        assert list(third.active_session.results) == ["sys", "ps", "echo hello"]
+        third.close_all_sessions()
+
+    def test_stateful_results_and_changed_dumps_are_not_restored(self, tmp_path, fake_crash):
+        """Output after a context change is not saved; a rewritten dump gets no snapshot."""
+        dump, kernel = fake_crash
+        manager = _manager(tmp_path / "snapshots")
+
+        async def run_session(manager):
+            await manager.start_session_async(*_pair(dump, kernel), timeout=10)
+            await manager.execute_command_async("sys", timeout=10)
+            await manager.execute_command_async("set 1", timeout=10)
+            await manager.execute_command_async("ps", timeout=10)
+            session = manager.active_session
+            manager.close_all_sessions()
+            return session
+
+        asyncio.run(run_session(manager))
+        restarted = _manager(tmp_path / "snapshots")
+        assert restarted.start_session(*_pair(dump, kernel), timeout=10)
+        assert list(restarted.active_session.results) == ["sys"]
+        restarted.close_all_sessions()
+
+        dump.write_bytes(b"another fake vmcore")
+        rewritten = _manager(tmp_path / "snapshots")
+        asyncio.run(run_session(rewritten))
+        assert rewritten.stats["restored"] == 0
+        assert rewritten.stats["cold_starts"] == 1
+
+    def test_eviction_saves_in_the_background(self, tmp_path, fake_crash):
+        """An evicted session's snapshot is written off the event loop and read back by the next start."""
+        dump, kernel = fake_crash
+        manager = _manager(tmp_path / "snapshots")
+        manager.max_sessions = 1
+        save = manager.snapshots.save
+        release = threading.Event()
+
+        def slow_save(*args):
+            release.wait(5)
+            return save(*args)
+
+        manager.snapshots.save = slow_save
+        other = dump.with_name("vmcore.other")
+        other.write_bytes(dump.read_bytes())
+
+        async def run_test():
+            await manager.start_session_async(*_pair(dump, kernel), timeout=10)
+            await manager.execute_command_async("sys", timeout=10)
+            # Starting another dump evicts the first while its save is held up
+            await manager.start_session_async(*_pair(other, kernel), timeout=10)
+            pending = manager.snapshots.get_stats()["saved"]
+            release.set()
+            await manager.start_session_async(*_pair(dump, kernel), timeout=10)
+            results = list(manager.active_session.results)
+            manager.close_all_sessions()
+            return pending, results
+
+        pending, results = asyncio.run(run_test())
+        assert pending == 0
+        assert results == ["sys"]
+        assert manager.stats["restored"] == 1
@@ -0,0 +1,131 @@
+"""Tests for streaming crash command output."""
+
+import asyncio
+from types import SimpleNamespace
+
+from dynamic_mcp.crash_cache import CrashResultCache
+from dynamic_mcp.crash_session import CrashCommandStream, CrashSessionManager
+
+
+def _start(manager, fake_crash):
+    dump, kernel = fake_crash
+    return manager.start_session_async(
+        SimpleNamespace(name=dump.name, path=dump),
+        SimpleNamespace(name=kernel.name, path=kernel),
+        timeout=10
+    )
+
+
+class TestCrashStreaming:
+    """Test CrashSession.stream_command and the manager wrapper."""
+
+    def test_stream_matches_buffered_output(self, fake_crash):
+        """Streamed output equals the buffered result."""
+        manager = CrashSessionManager()
+
+        async def run_test():
+            await _start(manager, fake_crash)
+            stream, _ = await manager.stream_command_async("sys", timeout=10)
+            streamed = await stream.read_all()
+            buffered = await manager.execute_command_async("echo buffered", timeout=10)
+            manager.close_all_sessions()
+            return stream, streamed, buffered
+
+        stream, streamed, buffered = asyncio.run(run_test())
+        assert stream.return_code == 0
+        assert streamed.strip().startswith("KERNEL: vmlinux")
+        assert "\r" not in streamed
+        assert "crash>" not in streamed
+        assert buffered == ("buffered", "", 0)
+
+    def test_large_output_arrives_in_chunks(self, fake_crash, monkeypatch):
+        """Large output is delivered in many bounded chunks."""
+        monkeypatch.setenv("FAKE_CRASH_LINES", "50000")
+        manager = CrashSessionManager()
+
+        async def run_test():
+            await _start(manager, fake_crash)
+            stream, _ = await manager.stream_command_async("kmem -S", timeout=30, chunk_size=4096)
+            chunks = 0
+            lines = 0
+            largest = 0
+            async for chunk in stream:
+                chunks += 1
+                lines += chunk.count("\n")
+                largest = max(largest, len(chunk))
+            manager.close_all_sessions()
+            return stream, chunks, lines, largest
+
+        stream, chunks, lines, largest = asyncio.run(run_test())
+        assert stream.return_code == 0
+        # Stripped like buffered output, so the last line has no newline
+        assert lines == 49999
+        assert chunks > 10
+        assert largest <= 4096 + 16
+        assert stream.time_to_first_byte is not None
+        assert manager.stream_stats["streams"] == 1
+
+    def test_abandoned_stream_keeps_session_usable(self, fake_crash, monkeypatch):
+        """A consumer that stops early does not desync the pty."""
+        monkeypatch.setenv("FAKE_CRASH_LINES", "20000")
+        manager = CrashSessionManager()
+
+        async def run_test():
+            await _start(manager, fake_crash)
+            stream, _ = await manager.stream_command_async("kmem -S", timeout=30, chunk_size=1024)
+            async for _ in stream:
+                break
+            result = await manager.execute_command_async("echo after", timeout=30)
+            manager.close_all_sessions()
+            return result
+
+        assert asyncio.run(run_test()) == ("after", "", 0)
+
+    def test_stream_reports_crash_errors(self, fake_crash):
+        """A crash error message sets a failing return code."""
+        manager = CrashSessionManager()
+
+        async def run_test():
+            await _start(manager, fake_crash)
+            stream, _ = await manager.stream_command_async("bogus", timeout=10)
+            output = await stream.read_all()
+            manager.close_all_sessions()
+            return stream, output
+
+        stream, output = asyncio.run(run_test())
+        assert stream.return_code == 1
+        assert "command not found" in stream.error
+
+    def test_cache_hit_streams_the_same_text(self, fake_crash):
+        """A cached stream returns exactly what the live stream did, and the buffered result."""
+        manager = CrashSessionManager(result_cache=CrashResultCache())
+
+        async def run_test():
+            await _start(manager, fake_crash)
+            live, _ = await manager.stream_command_async("sys", timeout=10)
+            live_text = await live.read_all()
+            cached, _ = await manager.stream_command_async("sys", timeout=10)
+            cached_text = await cached.read_all()
+            buffered = await manager.execute_command_async("sys", timeout=10)
+            manager.close_all_sessions()
+            return live_text, cached_text, buffered
+
+        live_text, cached_text, buffered = asyncio.run(run_test())
+        assert manager.result_cache.hits == 2
+        assert cached_text == live_text == buffered[0]
+        assert live_text.startswith("KERNEL: vmlinux")
+
+    def test_abandoned_cached_stream_stops_feeding(self):
+        """Breaking out of a stream of cached text does not leave its feeder blocked."""
+
+        async def run_test():
+            stream = CrashCommandStream.from_text("kmem -S", "line\n" * 10000, chunk_size=64, max_pending_chunks=2)
+            async for _ in stream:
+                break
+            # The generator is closed by the loop once the loop drops it
+            await asyncio.wait([stream._feeder], timeout=1)
+            return stream, stream._feeder.done()
+
+        stream, feeder_done = asyncio.run(run_test())
+        assert stream.cancelled
+        assert feeder_done
@@ -0,0 +1,92 @@
+"""Tests for the inotify crash dump watcher."""
+
+import asyncio
+
+import pytest
+
+from dynamic_mcp.crash_discovery import CrashDumpCatalog
+from dynamic_mcp.crash_watcher import CrashDumpWatcher, inotify_available
+
+
+pytestmark = pytest.mark.skipif(not inotify_available(), reason="inotify is not available")
+
+
+def _catalog(root):
+    return CrashDumpCatalog(root, ["vmcore*", "core*", "crash*", "dump*"])
+
+
+async def _until(condition, timeout=5.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline
+        await asyncio.sleep(0.02)
+
+
+class TestCrashDumpWatcher:
+    """Test live catalog updates from directory events."""
+
+    def test_new_dump_is_indexed_and_completed(self, tmp_path):
+        """A dump written into a watched directory shows up without polling."""
+        (tmp_path / "old").mkdir()
+        catalog = _catalog(tmp_path)
+        completed = []
+        changes = []
+
+        async def run_test():
+            watcher = CrashDumpWatcher(catalog, on_change=lambda: changes.append(1),
+                                       on_dump_complete=completed.append, debounce=0.05)
+            assert await watcher.start()
+            assert catalog.live
+            with open(tmp_path / "old" / "vmcore", "wb") as dump:
+                dump.write(b"x" * 4096)
+                dump.flush()
+                await _until(lambda: str(tmp_path / "old" / "vmcore") in catalog.dumps)
+                assert not completed
+                dump.write(b"y" * 4096)
+            await _until(lambda: completed)
+            await _until(lambda: changes)
+            rescans = catalog.stats["directory_rescans"]
+            # Nothing changed, so a refresh touches no directory
+            catalog.refresh(force=True)
+            assert catalog.stats["directory_rescans"] == rescans
+            watcher.close()
+            return watcher
+
+        watcher = asyncio.run(run_test())
+        assert [dump.size for dump in completed] == [8192]
+        assert changes == [1]
+        assert not catalog.live
+        assert watcher.stats["completed_dumps"] == 1
+
+    def test_new_directories_are_watched_and_removals_dropped(self, tmp_path):
+        """Subdirectories created later are followed; deleted dumps disappear."""
+        catalog = _catalog(tmp_path)
+
+        async def run_test():
+            watcher = CrashDumpWatcher(catalog)
+            assert await watcher.start()
+            (tmp_path / "127.0.0.1-2026-10-17").mkdir()
+            await _until(lambda: str(tmp_path / "127.0.0.1-2026-10-17") in catalog.directories())
+            (tmp_path / "127.0.0.1-2026-10-17" / "vmcore-incomplete").write_bytes(b"dump")
+            (tmp_path / "127.0.0.1-2026-10-17" / "vmcore-incomplete").rename(
+                tmp_path / "127.0.0.1-2026-10-17" / "vmcore")
+            await _until(lambda: [dump.name for dump in catalog.all()] == ["vmcore"])
+            (tmp_path / "127.0.0.1-2026-10-17" / "vmcore").unlink()
+            await _until(lambda: not catalog.dumps)
+            assert watcher.get_stats()["watches"] == 2
+            watcher.close()
+
+        asyncio.run(run_test())
+
+    def test_missing_root_falls_back_to_polling(self, tmp_path):
+        """Without a directory to watch the catalog keeps polling."""
+        catalog = _catalog(tmp_path / "missing")
+
+        async def run_test():
+            watcher = CrashDumpWatcher(catalog)
+            assert not await watcher.start()
+            return watcher
+
+        watcher = asyncio.run(run_test())
+        assert not catalog.live
+        assert watcher.get_stats()["mode"] == "polling"
@@ -0,0 +1,152 @@
+"""Tests for fetching kernel debuginfo from debuginfod servers."""
+
+import asyncio
+import os
+import struct
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from dynamic_mcp.debuginfod import DebuginfodClient
+from dynamic_mcp.dump_metadata import DumpMetadata
+from dynamic_mcp.kernel_detection import KernelDetection
+
+
+pytest.importorskip("aiohttp")
+
+BUILD_A = "aa" * 20
+BUILD_B = "bb" * 20
+BUILD_C = "cc" * 20
+
+
+def _vmlinux(build_id: str, size: int = 256 * 1024) -> bytes:
+    """Minimal ELF file whose PT_NOTE holds a GNU build-id note, padded to size."""
+    desc = bytes.fromhex(build_id)
+    note = struct.pack("<III", 4, len(desc), 3) + b"GNU\0" + desc
+    ident = b"\x7fELF" + bytes([2, 1, 1]) + b"\0" * 9
+    ehdr = ident + struct.pack("<HHIQQQIHHHHHH", 2, 62, 1, 0, 64, 0, 0, 64, 56, 1, 0, 0, 0)
+    phdr = struct.pack("<IIQQQQQQ", 4, 4, 120, 0, 0, len(note), len(note), 4)
+    return (ehdr + phdr + note).ljust(size, b"\x90")
+
+
+class _Debuginfod:
+    """Stand-in debuginfod server supporting range requests."""
+
+    def __init__(self, files):
+        self.files = files
+        self.requests = []
+        self.truncate_next = False
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                server.requests.append((self.path, self.headers.get("Range")))
+                build_id = self.path.split("/")[2]
+                data = server.files.get(build_id)
+                if data is None or not self.path.endswith("/debuginfo"):
+                    self.send_error(404)
+                    return
+                start = 0
+                if self.headers.get("Range"):
+                    start = int(self.headers["Range"].split("=")[1].rstrip("-"))
+                    self.send_response(206)
+                    self.send_header("Content-Range", f"bytes {start}-{len(data) - 1}/{len(data)}")
+                else:
+                    self.send_response(200)
+                self.send_header("Content-Length", str(len(data) - start))
+                self.end_headers()
+                body = data[start:]
+                if server.truncate_next:
+                    # Drop the connection half way through, once the client has read that half
+                    server.truncate_next = False
+                    self.wfile.write(body[:len(body) // 2])
+                    self.wfile.flush()
+                    time.sleep(0.3)
+                    self.close_connection = True
+                    return
+                time.sleep(0.05)
+                self.wfile.write(body)
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+@pytest.fixture
+def debuginfod():
+    server = _Debuginfod({BUILD_A: _vmlinux(BUILD_A), BUILD_B: _vmlinux(BUILD_B), BUILD_C: _vmlinux(BUILD_C)})
+    yield server
+    server.close()
+
+
+class TestDebuginfodClient:
+    """Test downloads into the content-addressed cache."""
+
+    def test_concurrent_fetches_share_one_download(self, tmp_path, debuginfod):
+        """Parallel requests for a build-id download it once; later ones hit the cache."""
+        client = DebuginfodClient(["http://127.0.0.1:1", debuginfod.url], str(tmp_path / "cache"))
+
+        async def run_test():
+            paths = await asyncio.gather(*(client.fetch(BUILD_A) for _ in range(5)))
+            return paths, await client.fetch(BUILD_A.upper()), await client.fetch("dd" * 20)
+
+        paths, cached, missing = asyncio.run(run_test())
+        assert set(paths) == {tmp_path / "cache" / BUILD_A / "debuginfo"}
+        assert cached == paths[0]
+        assert paths[0].read_bytes() == debuginfod.files[BUILD_A]
+        assert missing is None
+        assert [path for path, _ in debuginfod.requests].count(f"/buildid/{BUILD_A}/debuginfo") == 1
+        assert client.stats["downloads"] == 1
+
+    def test_interrupted_download_resumes(self, tmp_path, debuginfod):
+        """A dropped transfer is continued with a range request, and wrong builds are rejected."""
+        client = DebuginfodClient([debuginfod.url], str(tmp_path / "cache"))
+        debuginfod.truncate_next = True
+        # The server answers for BUILD_C with a file of another build
+        debuginfod.files[BUILD_C] = _vmlinux(BUILD_B)
+
+        async def run_test():
+            first = await client.fetch(BUILD_A)
+            return first, await client.fetch(BUILD_A), await client.fetch(BUILD_C)
+
+        first, second, wrong = asyncio.run(run_test())
+        assert first is None
+        assert second.read_bytes() == debuginfod.files[BUILD_A]
+        half = len(debuginfod.files[BUILD_A]) // 2
+        assert debuginfod.requests[1] == (f"/buildid/{BUILD_A}/debuginfo", f"bytes={half}-")
+        assert client.stats["resumed"] == 1
+        assert wrong is None
+        assert not (tmp_path / "cache" / BUILD_C / "debuginfo").exists()
+
+    def test_lru_eviction_and_kernel_detection(self, tmp_path, debuginfod):
+        """The least recently used build is evicted; cached builds match without the network."""
+        size = len(debuginfod.files[BUILD_A])
+        client = DebuginfodClient([debuginfod.url], str(tmp_path / "cache"), max_bytes=int(2.5 * size))
+        detection = KernelDetection(str(tmp_path / "boot"), debuginfod=client)
+        metadata = DumpMetadata("elf", release="5.14.0-427.el9.x86_64", build_id=BUILD_A)
+
+        async def run_test():
+            kernel = await detection.fetch_kernel(metadata)
+            await client.fetch(BUILD_B)
+            # Make BUILD_A the most recently used
+            os.utime(client.cached_path(BUILD_B), (1, 1))
+            assert detection.find_matching_kernel(None, metadata).path == kernel.path
+            await client.fetch(BUILD_C)
+            return kernel
+
+        kernel = asyncio.run(run_test())
+        assert kernel.build_id == BUILD_A
+        assert kernel.version == "5.14.0-427.el9.x86_64"
+        assert client.cached_path(BUILD_A).exists()
+        assert not client.cached_path(BUILD_B).exists()
+        assert client.cached_path(BUILD_C).exists()
+        assert client.stats["evictions"] == 1
@@ -0,0 +1,102 @@
+"""Tests for reading metadata from crash dump headers."""
+
+import struct
+
+from dynamic_mcp.dump_metadata import (
+    DISK_DUMP_HEADER, KDUMP_SUB_HEADER, read_dump_metadata
+)
+
+
+VMCOREINFO = (
+    "OSRELEASE=5.14.0-427.el9.x86_64\n"
+    "BUILD-ID=0123456789ABCDEF0123456789abcdef01234567\n"
+    "PAGESIZE=4096\n"
+    "CRASHTIME=1760684400\n"
+)
+
+
+def _note(name: bytes, note_type: int, desc: bytes) -> bytes:
+    def pad(data):
+        return data + b"\0" * (-len(data) % 4)
+    return struct.pack("<III", len(name) + 1, len(desc), note_type) + pad(name + b"\0") + pad(desc)
+
+
+def _elf_vmcore(cpus=2) -> bytes:
+    notes = b"".join(_note(b"CORE", 1, b"\0" * 336) for _ in range(cpus))
+    notes += _note(b"VMCOREINFO", 0, VMCOREINFO.encode())
+    ehdr_size, phdr_size = 64, 56
+    ident = b"\x7fELF" + bytes([2, 1, 1]) + b"\0" * 9
+    ehdr = ident + struct.pack("<HHIQQQIHHHHHH", 4, 62, 1, 0, ehdr_size, 0, 0, ehdr_size, phdr_size, 2, 0, 0, 0)
+    note_offset = ehdr_size + 2 * phdr_size
+    phdrs = struct.pack("<IIQQQQQQ", 4, 0, note_offset, 0, 0, len(notes), len(notes), 0)
+    phdrs += struct.pack("<IIQQQQQQ", 1, 7, note_offset + len(notes), 0, 0, 4096, 4096, 4096)
+    return ehdr + phdrs + notes + b"\0" * 4096
+
+
+def _kdump_vmcore(block_size=4096) -> bytes:
+    utsname = b"".join(field.ljust(65, b"\0") for field in (
+        b"Linux", b"node1", b"4.18.0-553.el8.x86_64", b"#1 SMP Thu May 2 2024", b"x86_64", b"(none)"
+    ))
+    header = struct.pack("<" + DISK_DUMP_HEADER, b"KDUMP   ", 6, utsname, 1714600000, 0,
+                         0, block_size, 1, 1, 0, 0, 0, 0, 0, 8)
+    info = VMCOREINFO.replace("OSRELEASE=5.14.0-427.el9.x86_64", "OSRELEASE=4.18.0-553.el8.x86_64")
+    info = info.replace("CRASHTIME=1760684400\n", "").encode()
+    offset_info = 2 * block_size
+    sub_header = struct.pack("<" + KDUMP_SUB_HEADER, 0, 31, 0, 0, 0, offset_info, len(info), 0, 0)
+    return (header.ljust(block_size, b"\0") + sub_header.ljust(block_size, b"\0")
+            + info.ljust(block_size, b"\0"))
+
+
+def _flattened(dump: bytes, record_size=4096) -> bytes:
+    header = (b"makedumpfile\0".ljust(16, b"\0") + struct.pack(">qq", 1, 1)).ljust(4096, b"\0")
+    records = b"".join(
+        struct.pack(">qq", offset, len(dump[offset:offset + record_size])) + dump[offset:offset + record_size]
+        for offset in range(0, len(dump), record_size)
+    )
+    return header + records + struct.pack(">qq", -1, -1)
+
+
+class TestReadDumpMetadata:
+    """Test header parsing for each dump format."""
+
+    def test_elf_vmcore(self, tmp_path):
+        """Release, build-id and crash time come from the VMCOREINFO note."""
+        path = tmp_path / "vmcore"
+        path.write_bytes(_elf_vmcore(cpus=3))
+        metadata = read_dump_metadata(path)
+        assert metadata.format == "elf"
+        assert metadata.release == "5.14.0-427.el9.x86_64"
+        assert metadata.build_id == "0123456789abcdef0123456789abcdef01234567"
+        assert metadata.crash_time == 1760684400
+        assert metadata.machine == "x86_64"
+        assert metadata.cpus == 3
+
+    def test_kdump_compressed_and_flattened(self, tmp_path):
+        """diskdump headers are read directly and through flattened records."""
+        dump = _kdump_vmcore()
+        (tmp_path / "vmcore").write_bytes(dump)
+        (tmp_path / "vmcore.flat").write_bytes(_flattened(dump))
+        for name, dump_format in (("vmcore", "kdump"), ("vmcore.flat", "flattened")):
+            metadata = read_dump_metadata(tmp_path / name)
+            assert metadata.format == dump_format
+            assert metadata.release == "4.18.0-553.el8.x86_64"
+            assert metadata.version == "#1 SMP Thu May 2 2024"
+            assert metadata.build_id == "0123456789abcdef0123456789abcdef01234567"
+            assert metadata.crash_time == 1714600000
+            assert metadata.cpus == 8
+
+    def test_panic_from_vmcore_dmesg_and_unknown_files(self, tmp_path):
+        """Unrecognized dumps still get the panic line kdump saved beside them."""
+        (tmp_path / "vmcore").write_bytes(b"not a dump")
+        (tmp_path / "vmcore-dmesg.txt").write_text(
+            "[  10.0] sysrq: Trigger a crash\n"
+            "[  10.1] Kernel panic - not syncing: sysrq triggered crash\n"
+            "[  10.2] CPU: 1 PID: 1 Comm: bash\n"
+        )
+        (tmp_path / "empty").mkdir()
+        (tmp_path / "empty" / "vmcore").write_bytes(b"")
+        metadata = read_dump_metadata(tmp_path / "vmcore")
+        assert metadata.format == "unknown"
+        assert metadata.release is None
+        assert metadata.panic == "Kernel panic - not syncing: sysrq triggered crash"
+        assert read_dump_metadata(tmp_path / "empty" / "vmcore").panic is None
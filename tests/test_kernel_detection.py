@@ -1,13 +1,16 @@
 """Tests for kernel detection functionality."""
 
 import os
+import struct
 import tempfile
+import time
 from pathlib import Path
 from unittest.mock import patch, MagicMock
 
 import pytest
 
-from dynamic_mcp.kernel_detection import KernelDetection, KernelFile
+from dynamic_mcp.dump_metadata import DumpMetadata
+from dynamic_mcp.kernel_detection import KernelDetection, KernelFile, KernelIndex
 
 
 class TestVmlinuxInDumpDirectory:
@@ -84,3 +87,94 @@ class TestVmlinuxInDumpDirectory:
                 assert kernel.name == "vmlinux"
                 assert kernel.path == vmlinux_path
 
+
+
+def _vmlinux(path: Path, build_id: str):
+    """Minimal ELF file whose PT_NOTE holds a GNU build-id note."""
+    desc = bytes.fromhex(build_id)
+    note = struct.pack("<III", 4, len(desc), 3) + b"GNU\0" + desc
+    ident = b"\x7fELF" + bytes([2, 1, 1]) + b"\0" * 9
+    ehdr = ident + struct.pack("<HHIQQQIHHHHHH", 2, 62, 1, 0, 64, 0, 0, 64, 56, 1, 0, 0, 0)
+    phdr = struct.pack("<IIQQQQQQ", 4, 4, 120, 0, 0, len(note), len(note), 4)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(ehdr + phdr + note)
+
+
+class TestKernelIndex:
+    """Test kernel selection from the dump's header metadata."""
+
+    BUILD_427 = "aa" * 20
+    BUILD_362 = "bb" * 20
+
+    def _index(self, tmp_path):
+        modules = tmp_path / "debug" / "lib" / "modules"
+        _vmlinux(modules / "5.14.0-362.el9.x86_64" / "vmlinux", self.BUILD_362)
+        _vmlinux(modules / "5.14.0-427.el9.x86_64" / "vmlinux", self.BUILD_427)
+        # Deeper than KERNEL_SEARCH_DEPTH below the root: not walked
+        _vmlinux(modules / "5.14.0-427.el9.x86_64" / "kernel" / "fs" / "ext4" / "vmlinux", "cc" * 20)
+        (tmp_path / "boot").mkdir()
+        (tmp_path / "boot" / "vmlinuz-4.18.0-553.el8.x86_64").write_bytes(b"bzImage")
+        return KernelIndex([modules, tmp_path / "boot"], db_path=str(tmp_path / "kernels.db"))
+
+    def test_build_id_then_release_lookup(self, tmp_path):
+        """Kernels are found by build-id, or by release when no build-id is known."""
+        kd = KernelDetection(str(tmp_path / "boot"), index=self._index(tmp_path))
+        kernel = kd.find_matching_kernel(None, DumpMetadata("elf", release="5.14.0-427.el9.x86_64",
+                                                            build_id=self.BUILD_427))
+        assert kernel.version == "5.14.0-427.el9.x86_64"
+        assert kernel.build_id == self.BUILD_427
+        kernel = kd.find_matching_kernel(None, DumpMetadata("kdump", release="4.18.0-553.el8.x86_64"))
+        assert kernel.name == "vmlinuz-4.18.0-553.el8.x86_64"
+        assert len(kd.index.kernels()) == 3
+        # No release in the header: previous behaviour
+        assert kd.find_matching_kernel(None, DumpMetadata("unknown")) is not None
+
+    def test_wrong_build_of_a_release_is_not_used(self, tmp_path):
+        """A known release or build-id without a matching kernel returns None."""
+        kd = KernelDetection(str(tmp_path / "boot"), index=self._index(tmp_path))
+        assert kd.find_matching_kernel(None, DumpMetadata("elf", release="5.14.0-427.el9.x86_64",
+                                                          build_id="dd" * 20)) is None
+        assert kd.find_matching_kernel(None, DumpMetadata("kdump", release="6.1.0")) is None
+
+    def test_index_persists_build_ids(self, tmp_path):
+        """A new index over the same database does not read the ELF notes again."""
+        self._index(tmp_path).refresh()
+        index = KernelIndex([tmp_path / "debug" / "lib" / "modules", tmp_path / "boot"],
+                            db_path=str(tmp_path / "kernels.db"))
+        assert index.lookup(self.BUILD_362).version == "5.14.0-362.el9.x86_64"
+        assert sum(catalog.stats["metadata_reads"] for catalog in index.catalogs) == 0
+
+    def test_nested_kernel_path_reads_only_build_ids(self, tmp_path):
+        """Kernels a few directories below KERNEL_PATH are found without reading dump metadata."""
+        kernels = tmp_path / "kernels"
+        _vmlinux(kernels / "rhel9" / "5.14.0-427.el9.x86_64" / "vmlinux", self.BUILD_427)
+        index = KernelIndex([kernels])
+        with patch("dynamic_mcp.dump_metadata._panic_from_dmesg") as panic:
+            assert index.lookup(self.BUILD_427).path == kernels / "rhel9" / "5.14.0-427.el9.x86_64" / "vmlinux"
+        panic.assert_not_called()
+
+    def test_repeated_starts_use_cached_candidates(self, tmp_path):
+        """One detection serves many dumps; directories are rescanned only when they change."""
+        kd = KernelDetection(str(tmp_path / "boot"), index=self._index(tmp_path))
+        dump_dir = tmp_path / "crash" / "127.0.0.1-2026-10-17"
+        dump_dir.mkdir(parents=True)
+        (dump_dir / "vmcore").write_bytes(b"dump")
+        dump = type("Dump", (), {"path": dump_dir / "vmcore"})()
+        # Old enough that the index does not rescan them as possibly racy
+        for directory in [tmp_path, *(path for path in tmp_path.rglob("*") if path.is_dir())]:
+            os.utime(directory, (time.time() - 3600, time.time() - 3600))
+        metadata = DumpMetadata("kdump", release="4.18.0-553.el8.x86_64")
+
+        assert kd.find_matching_kernel(dump, metadata).name == "vmlinuz-4.18.0-553.el8.x86_64"
+        root_rescans = [catalog.stats["directory_rescans"] for catalog in kd.index.catalogs]
+        for _ in range(3):
+            kd.find_matching_kernel(dump, metadata)
+            kd.find_kernel_files()
+        assert [catalog.stats["directory_rescans"] for catalog in kd.index.catalogs] == root_rescans
+        assert kd.index.stats == {"dump_directory_scans": 1, "dump_directory_hits": 3}
+
+        # A vmlinux saved next to the dump later is picked up
+        _vmlinux(dump_dir / "vmlinux", "ee" * 20)
+        kernel = kd.find_matching_kernel(dump, metadata)
+        assert kernel.path == dump_dir / "vmlinux"
+        assert kd.index.stats["dump_directory_scans"] == 2